@@ -1,47 +1,142 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse, Response, PlainTextResponse
+import time
+_import_started = time.perf_counter()
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, JSONResponse, Response, PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from pathlib import Path
 import io
+import asyncio
 import yaml
 import os
 import threading
-import time
-from typing import Optional, Dict, Any
+import multiprocessing
+import atexit
+import importlib
+from contextlib import asynccontextmanager
+from multiprocessing import shared_memory
+from typing import Optional, Dict, Any, Mapping, List, Callable
+from types import MappingProxyType
 from fastapi.middleware.cors import CORSMiddleware
 import requests
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict, deque
 import subprocess
 import shutil
+import socket
+import queue
+import bisect
+import hashlib
+import json
+import logging
+import sqlite3
+import uuid
+from concurrent.futures import Future
 from urllib.parse import urlparse
 try:
-    import mediapipe as mp  # type: ignore
-except Exception:
-    mp = None  # type: ignore
-
-try:
-    import cv2  # type: ignore
     import numpy as np  # type: ignore
 except Exception:
-    cv2 = None  # type: ignore
     np = None  # type: ignore
 
-try:
-    import onnxruntime as ort  # type: ignore
-except Exception:
-    ort = None  # type: ignore
+_log = logging.getLogger('carenest.enterprise')
 
-try:
-    from ultralytics import YOLO  # type: ignore
-except Exception:
-    YOLO = None  # type: ignore
+# (phase, seconds) of this module's own import, for /api/startup/imports
+_import_phases: List[tuple] = []
+_import_mark = [_import_started]
+
+
+def _mark_import(phase: str) -> None:
+    now = time.perf_counter()
+    _import_phases.append((phase, round(now - _import_mark[0], 4)))
+    _import_mark[0] = now
+
+
+_mark_import('framework imports')
+
+
+class _LazyModule:
+    """Optional heavy dependency that is imported the first time it is used.
+
+    Attribute access, calling (for `YOLO(...)`) and truth tests (`if mp:`)
+    trigger the real import, once, under a lock; a failed import makes the
+    proxy falsy, like the `= None` fallback of the other optional imports.
+    How long the import took and which thread paid for it are kept for the
+    startup report.
+    """
+
+    _UNSET = object()
+
+    def __init__(self, module: str, attr: Optional[str] = None):
+        self._module = module
+        self._attr = attr
+        self._target: Any = self._UNSET
+        self._lock = threading.Lock()
+        self._info: Dict[str, Any] = {}
+
+    def _load(self) -> Any:
+        if self._target is self._UNSET:
+            with self._lock:
+                if self._target is self._UNSET:
+                    started = time.perf_counter()
+                    try:
+                        target = importlib.import_module(self._module)
+                        if self._attr:
+                            target = getattr(target, self._attr)
+                        error = None
+                    except Exception as e:
+                        target, error = None, f"{type(e).__name__}: {e}"
+                    self._info = {
+                        "sec": round(time.perf_counter() - started, 4),
+                        "ok": target is not None,
+                        "error": error,
+                        "thread": threading.current_thread().name,
+                        "at": time.time(),
+                    }
+                    self._target = target
+        return self._target
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not self._UNSET
+
+    def info(self) -> Dict[str, Any]:
+        return {"module": self._module, "loaded": self.loaded, **self._info}
+
+    def __bool__(self) -> bool:
+        return self._load() is not None
+
+    def __getattr__(self, name: str) -> Any:
+        target = self._load()
+        if target is None:
+            raise AttributeError(f"{self._module} is not available ({self._info.get('error')})")
+        return getattr(target, name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        target = self._load()
+        if target is None:
+            raise RuntimeError(f"{self._module} is not available ({self._info.get('error')})")
+        return target(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = ("loaded" if self._target is not None else "unavailable") if self.loaded else "not loaded"
+        return f"<lazy {self._module}{'.' + self._attr if self._attr else ''} ({state})>"
+
+
+mp = _LazyModule('mediapipe')
+cv2 = _LazyModule('cv2')
+ort = _LazyModule('onnxruntime')
+YOLO = _LazyModule('ultralytics', 'YOLO')
+_lazy_modules = {'cv2': cv2, 'mediapipe': mp, 'onnxruntime': ort, 'ultralytics': YOLO}
 
 
 BASE_DIR = Path(__file__).resolve().parent
+# spawned camera workers import this module too; they skip API-only background work
+_IS_CAMERA_WORKER = multiprocessing.current_process().name.startswith('carenest-camera-worker')
 
 
-def load_config() -> dict:
-    config_path = BASE_DIR / "config.yaml"
+def load_config(config_path: Optional[Path] = None) -> dict:
+    config_path = config_path or BASE_DIR / "config.yaml"
     data: dict = {}
     if config_path.exists():
         with open(config_path, "r", encoding="utf-8") as f:
@@ -53,7 +148,81 @@ def load_config() -> dict:
     return data
 
 
-app = FastAPI(title="CareNest Enterprise")
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class _ConfigStore:
+    """Read-only snapshot of config.yaml, re-parsed only when the file changes.
+
+    Hot paths call get(); the file is stat()ed at most once per check interval
+    and parsed only when its (inode, mtime, size) signature moves.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 1.0):
+        self._path = path
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Mapping[str, Any] = MappingProxyType({})
+        self._signature: Optional[tuple] = None
+        self._checked_at = 0.0
+        self.reload_count = 0
+        self.loaded_at: Optional[float] = None
+
+    def _file_signature(self) -> Optional[tuple]:
+        try:
+            st = self._path.stat()
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def get(self) -> Mapping[str, Any]:
+        if self.loaded_at is None or (time.monotonic() - self._checked_at) >= self._check_interval:
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload when the file signature changed (or always when forced)."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            signature = self._file_signature()
+            if not force and self.loaded_at is not None and signature == self._signature:
+                return False
+            try:
+                data = load_config(self._path)
+            except Exception:
+                # keep serving the last good snapshot on a broken edit
+                return False
+            self._snapshot = _freeze(data)
+            self._signature = signature
+            self.loaded_at = time.time()
+            self.reload_count += 1
+            return True
+
+
+_config_store = _ConfigStore(BASE_DIR / "config.yaml")
+
+
+def get_config() -> Mapping[str, Any]:
+    return _config_store.get()
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    stop = threading.Event()
+    if not _IS_CAMERA_WORKER:
+        _start_background(stop)
+    try:
+        yield
+    finally:
+        stop.set()
+
+
+app = FastAPI(title="CareNest Enterprise", lifespan=_lifespan)
 
 # CORS for web app (adjust origins as needed)
 app.add_middleware(
@@ -71,6 +240,7 @@ static_dir.mkdir(parents=True, exist_ok=True)
 templates_dir.mkdir(parents=True, exist_ok=True)
 
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+_mark_import('config and app')
 
 
 #########################
@@ -78,12 +248,146 @@ app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 #########################
 _process_start = time.time()
 _request_count = 0
+_request_count_lock = threading.Lock()
+
+_STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _label_value(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Histograms:
+    """Labelled Prometheus histograms that are cheap to record from hot loops.
+
+    Each thread records into its own shard (a plain dict, no lock); shards
+    are merged only when /metrics is scraped.
+    """
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self._local = threading.local()
+        self._shards: List[Dict[tuple, list]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[tuple, list]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, labels: tuple, value: float) -> None:
+        shard = self._shard()
+        h = shard.get(labels)
+        if h is None:
+            # per-bucket counts (last one is +Inf) followed by the sum
+            h = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        h[bisect.bisect_left(self.buckets, value)] += 1
+        h[-1] += value
+
+    def collect(self) -> Dict[tuple, list]:
+        with self._lock:
+            shards = list(self._shards)
+        merged: Dict[tuple, list] = {}
+        for shard in shards:
+            for _ in range(3):
+                try:
+                    items = list(shard.items())
+                    break
+                except RuntimeError:
+                    # shard grew a new label set mid-copy; retry
+                    continue
+            else:
+                continue
+            for labels, h in items:
+                self.merge_into(merged, labels, h)
+        return merged
+
+    @staticmethod
+    def merge_into(merged: Dict[tuple, list], labels: tuple, h: list) -> None:
+        acc = merged.get(labels)
+        if acc is None:
+            merged[labels] = list(h)
+        else:
+            for i, v in enumerate(h):
+                acc[i] += v
+
+    def render(self, name: str, help_text: str, label_names: tuple, data: Dict[tuple, list]) -> List[str]:
+        out = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, h in sorted(data.items()):
+            base = ",".join(f'{k}="{_label_value(v)}"' for k, v in zip(label_names, labels))
+            cumulative = 0
+            for le, count in zip(list(self.buckets) + ['+Inf'], h[:-1]):
+                cumulative += count
+                out.append(f'{name}_bucket{{{base},le="{le}"}} {cumulative}')
+            out.append(f"{name}_sum{{{base}}} {h[-1]:.6f}")
+            out.append(f"{name}_count{{{base}}} {cumulative}")
+        return out
+
+
+_stage_latency = _Histograms(_STAGE_BUCKETS)
+_http_latency = _Histograms(_HTTP_BUCKETS)
+
+
+def _observe_stage(cam_id: str, stage: str, started: float) -> None:
+    _stage_latency.observe((cam_id, stage), time.perf_counter() - started)
+
 
 @app.middleware("http")
 async def _metrics_middleware(request: Request, call_next):
     global _request_count
-    _request_count += 1
-    return await call_next(request)
+    with _request_count_lock:
+        _request_count += 1
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get('route')
+    # label by route template so /api/camera/{cam_id}/... stays one series
+    path = getattr(route, 'path', None) or 'unmatched'
+    _http_latency.observe((request.method, path, str(response.status_code)), time.perf_counter() - started)
+    return response
+
+
+def _camera_gauges() -> List[str]:
+    rows = []
+    gating = []
+    now = time.time()
+    for cam_id in list(_camera_state):
+        if _camera_pool is not None and _camera_pool.owns(cam_id):
+            # stats arrive every few seconds; the slot header has the current frame time
+            _refresh_camera(cam_id)
+            remote = _camera_pool.remote_stats(cam_id) or {}
+            capture, analysis, gates = remote.get('capture') or {}, remote.get('analysis') or {}, remote.get('gating') or {}
+        else:
+            grabber = _frame_grabbers.get(cam_id)
+            capture, analysis = (grabber.stats() if grabber else {}), _pipeline_stats.get(cam_id, {})
+            gates = _stage_gates[cam_id].stats() if cam_id in _stage_gates else {}
+        st = _camera_state.get(cam_id)
+        age = (now - st.last_frame_ts) if st and st.last_frame_ts else None
+        rows.append((cam_id, analysis.get('fps'), age, capture.get('framesDropped'), capture.get('reconnects')))
+        gating += [(cam_id, stage, g) for stage, g in gates.items()]
+    out = []
+    for metric, kind, help_text, idx in (
+        ("carenest_camera_fps", "gauge", "Effective analysed frames per second", 1),
+        ("carenest_camera_frame_age_seconds", "gauge", "Age of the newest analysed frame", 2),
+        ("carenest_camera_dropped_frames_total", "counter", "Captured frames never analysed", 3),
+        ("carenest_camera_reconnects_total", "counter", "Stream reconnects", 4),
+    ):
+        out.append(f"# HELP {metric} {help_text}")
+        out.append(f"# TYPE {metric} {kind}")
+        for row in rows:
+            if row[idx] is not None:
+                out.append(f'{metric}{{camera="{_label_value(row[0])}"}} {float(row[idx]):.3f}')
+    out.append("# HELP carenest_stage_gate_total Gated pipeline stages run or skipped")
+    out.append("# TYPE carenest_stage_gate_total counter")
+    for cam_id, stage, g in gating:
+        for decision, key in (("run", "runs"), ("skip", "skips")):
+            out.append(f'carenest_stage_gate_total{{camera="{_label_value(cam_id)}",stage="{stage}",decision="{decision}"}} {g[key]}')
+    return out
+
 
 @app.get("/metrics")
 def metrics():
@@ -96,12 +400,22 @@ def metrics():
     content.append("# HELP app_requests_total Total HTTP requests")
     content.append("# TYPE app_requests_total counter")
     content.append(f"app_requests_total {_request_count}")
+    content.append("# HELP app_config_reloads_total Times config.yaml was (re)parsed")
+    content.append("# TYPE app_config_reloads_total counter")
+    content.append(f"app_config_reloads_total {_config_store.reload_count}")
+    stages = _stage_latency.collect()
+    if _camera_pool is not None:
+        for labels, h in _camera_pool.remote_stage_latency().items():
+            _Histograms.merge_into(stages, labels, h)
+    content += _stage_latency.render("carenest_stage_seconds", "Camera pipeline stage latency", ("camera", "stage"), stages)
+    content += _camera_gauges()
+    content += _http_latency.render("http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"), _http_latency.collect())
     return PlainTextResponse("\n".join(content) + "\n")
 
 
 @app.get("/", response_class=HTMLResponse)
 def dashboard_home(request: Request):
-    cfg = load_config()
+    cfg = get_config()
     html = f"""
     <!DOCTYPE html>
     <html lang=\"gu\">
@@ -145,21 +459,215 @@ except Exception:
     gTTS = None  # type: ignore
 
 
+class _TtsCache:
+    """Rendered speech keyed by sha256(lang, text).
+
+    Lookups go memory LRU (bounded by bytes) → disk (storage/tts/<key>.mp3)
+    → gTTS. Requests never render when the node is offline
+    (privacy.no_internet), so only phrases already on disk can be played;
+    prewarm may still render the configured tts.prewarm phrases (fixed
+    operator text) so that the disk tier of a default install gets filled.
+    Concurrent requests for the same phrase share one render.
+    """
+
+    def __init__(self, root: Path, max_memory_bytes: int = 16 * 1024 * 1024, offline: bool = False):
+        self.root = root
+        self.max_memory_bytes = max(0, max_memory_bytes)
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._rendering: Dict[str, threading.Lock] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.renders = 0
+        self.misses = 0
+
+    @staticmethod
+    def settings(cfg: Mapping[str, Any]) -> Dict[str, Any]:
+        tc = cfg.get('tts', {}) or {}
+        return {
+            "max_memory_bytes": int(float(tc.get('cache_memory_mb', 16)) * 1024 * 1024),
+            "offline": bool(cfg.get('privacy', {}).get('no_internet', False)),
+        }
+
+    @classmethod
+    def from_config(cls, cfg: Optional[Mapping[str, Any]] = None) -> "_TtsCache":
+        return cls(Path(os.getenv('TTS_CACHE_DIR') or BASE_DIR / 'storage' / 'tts'), **cls.settings(cfg or get_config()))
+
+    def configure(self, max_memory_bytes: int, offline: bool) -> None:
+        """Apply reloaded settings in place, keeping what is already cached (within the new bound)."""
+        with self._lock:
+            self.max_memory_bytes = max(0, max_memory_bytes)
+            self.offline = offline
+            while self._memory and self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    @staticmethod
+    def key(text: str, lang: str) -> str:
+        return hashlib.sha256(f"{lang}\0{text}".encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _render(self, text: str, lang: str) -> bytes:
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buf)
+        return buf.getvalue()
+
+    def get(self, text: str, lang: str, allow_render: bool = False) -> tuple:
+        """(key, mp3 bytes); raises LookupError when not cached and rendering is unavailable.
+
+        allow_render renders a missing phrase even when the cache is offline.
+        """
+        key = self.key(text, lang)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return key, data
+            render_lock = self._rendering.setdefault(key, threading.Lock())
+        try:
+            with render_lock:
+                with self._lock:
+                    data = self._memory.get(key)
+                if data is not None:
+                    # rendered by the request we were waiting on
+                    self.memory_hits += 1
+                    return key, data
+                path = self.root / f"{key}.mp3"
+                try:
+                    data = path.read_bytes()
+                    self.disk_hits += 1
+                except OSError:
+                    if (self.offline and not allow_render) or gTTS is None:
+                        self.misses += 1
+                        raise LookupError("TTS not available" if gTTS is None else "offline; phrase not cached")
+                    data = self._render(text, lang)
+                    self.renders += 1
+                    self.root.mkdir(parents=True, exist_ok=True)
+                    tmp = path.with_suffix('.tmp')
+                    tmp.write_bytes(data)
+                    os.replace(tmp, path)
+                self._remember(key, data)
+                return key, data
+        finally:
+            with self._lock:
+                self._rendering.pop(key, None)
+
+    def prewarm(self, phrases: Any, default_lang: str = 'gu', render: bool = False) -> int:
+        """Load (or render, when online or `render`) each configured phrase; returns how many are ready."""
+        ready = 0
+        for item in phrases or []:
+            text, lang = (item, default_lang) if isinstance(item, str) else (item.get('text'), item.get('lang', default_lang))
+            if not text:
+                continue
+            try:
+                self.get(str(text), str(lang), allow_render=render)
+                ready += 1
+            except Exception:
+                pass
+        return ready
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            disk = sum(1 for _ in self.root.glob('*.mp3'))
+        except OSError:
+            disk = 0
+        return {
+            "offline": self.offline,
+            "memoryEntries": len(self._memory),
+            "memoryBytes": self._memory_bytes,
+            "diskEntries": disk,
+            "memoryHits": self.memory_hits,
+            "diskHits": self.disk_hits,
+            "renders": self.renders,
+            "misses": self.misses,
+        }
+
+
+_tts_cache: Optional[_TtsCache] = None
+_tts_cache_config: Optional[Mapping[str, Any]] = None
+_tts_cache_lock = threading.Lock()
+
+
+def _get_tts_cache() -> _TtsCache:
+    """The process-wide TTS cache, built on first use and re-tuned when config.yaml reloads."""
+    global _tts_cache, _tts_cache_config
+    cfg = get_config()
+    with _tts_cache_lock:
+        if _tts_cache is None:
+            _tts_cache = _TtsCache.from_config(cfg)
+        elif cfg is not _tts_cache_config:
+            # the store hands out a new snapshot object only after a reload
+            _tts_cache.configure(**_TtsCache.settings(cfg))
+        _tts_cache_config = cfg
+        return _tts_cache
+
+
+def _tts_reachable(host: str = 'translate.google.com', timeout: float = 3.0) -> bool:
+    """True when the gTTS backend accepts a connection."""
+    try:
+        socket.create_connection((host, 443), timeout=timeout).close()
+        return True
+    except OSError:
+        return False
+
+
+def _tts_prewarm() -> int:
+    tc = get_config().get('tts', {}) or {}
+    cache = _get_tts_cache()
+    phrases = tc.get('prewarm', [])
+    # the shipped config is offline, and nothing else ever fills storage/tts
+    render = bool(phrases) and cache.offline and gTTS is not None and _tts_reachable()
+    return cache.prewarm(phrases, default_lang=str(tc.get('lang', 'gu')), render=render)
+
+
 class TtsReq(BaseModel):
     text: str
     lang: str = "gu"
 
 
-@app.post('/api/tts')
-def tts(req: TtsReq):
-    if gTTS is None:
-        return JSONResponse({"error": "TTS not available"}, status_code=503)
+def _tts_response(text: str, lang: str, request: Request) -> Response:
     try:
-        buf = io.BytesIO()
-        gTTS(text=req.text, lang=req.lang).write_to_fp(buf)
-        return Response(content=buf.getvalue(), media_type='audio/mpeg')
+        key, data = _get_tts_cache().get(text, lang)
+    except LookupError as e:
+        return JSONResponse({"error": str(e)}, status_code=503)
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
+    # content-addressed: the same text always maps to the same bytes
+    etag = f'"{key[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type='audio/mpeg', headers=headers)
+
+
+@app.post('/api/tts')
+def tts(req: TtsReq, request: Request):
+    return _tts_response(req.text, req.lang, request)
+
+
+@app.get('/api/tts')
+def tts_get(text: str, request: Request, lang: str = "gu"):
+    return _tts_response(text, lang, request)
+
+
+@app.get('/api/tts/cache')
+def tts_cache_stats():
+    return _get_tts_cache().stats()
 
 
 class VoiceCmdReq(BaseModel):
@@ -212,7 +720,7 @@ def _build_autossh_command(cfg: dict) -> str:
 
 @app.get('/api/ssh-tunnel/cmd')
 def get_autossh_cmd():
-    cfg = load_config()
+    cfg = get_config()
     cmd = _build_autossh_command(cfg)
     if not cmd:
         return JSONResponse({"error": "ssh_tunnel disabled"}, status_code=400)
@@ -237,10 +745,24 @@ def health_check():
 
 @app.get("/api/system-status")
 def get_system_status():
-    cfg = load_config()
+    cfg = get_config()
     return {"uptime": "unknown", "env": cfg.get("system", {}).get("env")}
 
 
+@app.get("/api/config/status")
+def config_status():
+    return {
+        "reloads": _config_store.reload_count,
+        "loadedAt": _config_store.loaded_at,
+    }
+
+
+@app.post("/api/config/reload")
+def config_reload():
+    changed = _config_store.refresh(force=True)
+    return {"reloaded": changed, "reloads": _config_store.reload_count}
+
+
 @app.post("/api/alerts")
 def post_alert(alert: Alert):
     # stub: log or enqueue alert
@@ -255,443 +777,3065 @@ class TestEventReq(BaseModel):
 
 @app.post('/api/test-event')
 def emit_test_event(req: TestEventReq):
-    cfg = load_config()
-    api = str(cfg.get('api', {}).get('base_url') or os.getenv('API_URL', 'http://localhost:4000'))
-    ingest = str(cfg.get('api', {}).get('ingest_token') or os.getenv('INGEST_TOKEN', ''))
-    try:
-        r = requests.post(
-            f"{api}/alerts/events",
-            json={"cameraId": req.cameraId, "type": req.type, "details": req.details or {"source": "test"}},
-            headers={"x-ingest-token": ingest},
-            timeout=3,
-        )
-        return {"ok": r.ok, "status": r.status_code}
-    except Exception as e:
-        return JSONResponse({"error": str(e)}, status_code=500)
+    # journaled like any camera event: if the API is unreachable it is replayed later
+    event_id = _event_emitter.submit(req.cameraId, req.type, req.details or {"source": "test"})
+    if event_id is None:
+        return JSONResponse({"error": "event journal full"}, status_code=503)
+    delivered = _event_emitter.wait_delivered(event_id, timeout=3.0)
+    return {"ok": delivered, "queued": not delivered, "eventId": event_id}
 
-############################
-# RTSP ingest minimal stub #
-############################
+#############################
+# Shared batched inference  #
+#############################
 
-class CameraState(BaseModel):
-    url: str
-    last_frame_ts: Optional[float] = None
-    motion: bool = False
-    fall: bool = False
+class _BatchedInference:
+    """One model instance shared by every camera.
 
-_camera_threads: Dict[str, threading.Thread] = {}
-_camera_state: Dict[str, CameraState] = {}
-_stop_flags: Dict[str, bool] = {}
-_last_frames: Dict[str, Any] = {}
-_last_health: Dict[str, float] = {}
-_hls_procs: Dict[str, subprocess.Popen] = {}
+    Cameras submit single inputs; a worker thread collects them into a batch
+    that runs when it is full or when the oldest request has waited max_wait
+    seconds. Each caller gets its own result back through a Future.
+    """
 
-# Runtime toggles (can be changed via API)
-_toggles = {
-    'face_blur': True,
-    'pose_enabled': True,
-    'hands_enabled': True,
-    'yolo_enabled': os.getenv('YOLO_ENABLED', 'false').lower() in ('1', 'true', 'yes'),
-    'onnx_enabled': bool(os.getenv('FALL_ONNX_MODEL')),
-}
+    def __init__(self, name: str, run_batch: Callable[[List[Any]], List[Any]], max_batch: int = 8, max_wait: float = 0.02,
+                 model: Any = None):
+        self.name = name
+        self.model = model
+        self._run_batch = run_batch
+        self._max_batch = max(1, max_batch)
+        self._max_wait = max(0.0, max_wait)
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name=f"infer-{name}", daemon=True)
+        self._thread.start()
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.last_batch_size = 0
 
+    def submit(self, item: Any) -> Future:
+        fut: Future = Future()
+        self._queue.put((item, fut))
+        return fut
 
-def _process_stream(cam_id: str, url: str, fps: int = 10):
-    if cv2 is None:
-        return
-    cap = None
-    prev_gray = None
-    interval = 1.0 / max(fps, 1)
-    backoff = 1.0
-    pose = None
-    hands = None
-    onnx_session = None
-    onnx_input_name = None
-    onnx_last_fire = 0.0
-    onnx_debounce = 3.0
-    yolo_model = None
-    yolo_last_infer = 0.0
-    yolo_interval = 0.5  # seconds between YOLO inferences
-    yolo_person_conf = 0.0
-    if mp is not None and _toggles.get('pose_enabled'):
-        try:
-            pose = mp.solutions.pose.Pose(static_image_mode=False, model_complexity=0, enable_segmentation=False)
-        except Exception:
-            pose = None
-        try:
-            hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5)
-        except Exception:
-            hands = None
-    # Optional ONNX fall model
-    model_path = os.getenv('FALL_ONNX_MODEL')
-    if _toggles.get('onnx_enabled') and model_path and ort is not None and Path(model_path).exists():
-        try:
-            providers = ['CPUExecutionProvider']
-            onnx_session = ort.InferenceSession(model_path, providers=providers)
-            onnx_input_name = onnx_session.get_inputs()[0].name
-        except Exception:
-            onnx_session = None
+    def infer(self, item: Any, timeout: float = 5.0) -> Any:
+        return self.submit(item).result(timeout=timeout)
 
-    # Optional YOLO person detector (requires ultralytics + weights available)
-    yolo_weights = os.getenv('YOLO_MODEL', 'yolov8n.pt')
-    yolo_enabled = _toggles.get('yolo_enabled')
-    yolo_min_conf = float(os.getenv('YOLO_MIN_CONF', '0.25'))
-    if yolo_enabled and YOLO is not None:
-        try:
-            yolo_model = YOLO(yolo_weights)
-        except Exception:
-            yolo_model = None
-    frame_count = 0
-    motion_threshold = 12000  # pixels
-    fall_nose_hip_delta = 0.03  # normalized y distance threshold
-    fall_debounce_sec = 3.0
-    last_fall_ts = 0.0
-    while not _stop_flags.get(cam_id, False):
-        if cap is None or not cap.isOpened():
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._max_wait
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
             try:
-                cap = cv2.VideoCapture(url)
-            except Exception:
-                cap = None
-            if cap is None or not cap.isOpened():
-                time.sleep(backoff)
-                backoff = min(backoff * 2, 30.0)
-                continue
-            backoff = 1.0
-        ok, frame = cap.read()
-        now = time.time()
-        st = _camera_state.get(cam_id)
-        if not ok:
-            # try reopen stream
-            if cap is not None:
-                cap.release()
-            cap = None
-            time.sleep(backoff)
-            backoff = min(backoff * 2, 30.0)
-            continue
-        # Face blurring if enabled
-        try:
-            cfg = load_config()
-            blur_enabled = bool(cfg.get('privacy', {}).get('face_blur', False)) or _toggles.get('face_blur', False)
-        except Exception:
-            blur_enabled = _toggles.get('face_blur', False)
-        if blur_enabled and cv2 is not None:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            inputs = [item for item, _ in batch]
             try:
-                gray_face = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                # Use default haarcascade if available in cv2 data
-                cascade_path = getattr(cv2, 'data', None)
-                if cascade_path and hasattr(cascade_path, 'haarcascades'):
-                    cascade_file = cascade_path.haarcascades + 'haarcascade_frontalface_default.xml'
-                else:
-                    cascade_file = (Path(cv2.__file__).resolve().parent / 'data' / 'haarcascade_frontalface_default.xml').as_posix()  # type: ignore
-                face_cascade = cv2.CascadeClassifier(cascade_file)
-                faces = face_cascade.detectMultiScale(gray_face, 1.2, 5)
-                for (x, y, w, h) in faces:
-                    roi = frame[y:y+h, x:x+w]
-                    roi = cv2.GaussianBlur(roi, (31, 31), 0)
-                    frame[y:y+h, x:x+w] = roi
-            except Exception:
-                pass
-        _last_frames[cam_id] = frame
-        if st:
-            st.last_frame_ts = now
-            _last_health[cam_id] = now
-        try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            gray = cv2.GaussianBlur(gray, (9, 9), 0)
-            motion = False
-            if prev_gray is not None:
-                diff = cv2.absdiff(prev_gray, gray)
-                _, th = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)
-                motion_pixels = int(np.sum(th > 0)) if np is not None else 0
-                motion = motion_pixels > motion_threshold
-            prev_gray = gray
-            if st:
-                st.motion = motion
-                # naive baseline: motion suggests activity; fall decided via pose/onnx below
-                st.fall = False
+                outputs = self._run_batch(inputs)
+                for (_, fut), out in zip(batch, outputs):
+                    fut.set_result(out)
+            except Exception as e:
+                self.errors += 1
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            self.batches += 1
+            self.items += len(batch)
+            self.last_batch_size = len(batch)
 
-                # ONNX fall model inference (very minimal stub): resize grayscale to 224x224 and run
-                if onnx_session is not None and np is not None and (now - onnx_last_fire) > onnx_debounce:
-                    try:
-                        resized = cv2.resize(gray, (224, 224))
-                        # normalize to 0..1 and add batch/channel dims: [1,1,224,224]
-                        inp = (resized.astype('float32') / 255.0)[None, None, :, :]
-                        out = onnx_session.run(None, {onnx_input_name: inp})
-                        score = float(out[0].ravel()[0]) if out and len(out[0].shape) >= 1 else 0.0
-                        # threshold; if score>0.5 treat as fall
-                        if score > 0.5:
-                            st.fall = True
-                            onnx_last_fire = now
-                    except Exception:
-                        pass
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "queueDepth": self._queue.qsize(),
+            "batches": self.batches,
+            "items": self.items,
+            "errors": self.errors,
+            "lastBatchSize": self.last_batch_size,
+            "avgBatchSize": (self.items / self.batches) if self.batches else 0.0,
+            "model": self.model.stats() if self.model is not None and hasattr(self.model, 'stats') else None,
+        }
 
-                # MediaPipe pose enhancement: consider nose-to-hip delta + shoulder angle for fall
-                # and combine with motion
-                pose_fall = False
-                if pose is not None and _toggles.get('pose_enabled') and frame_count % 5 == 0:
-                    try:
-                        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        res = pose.process(rgb)
-                        if res and res.pose_landmarks:
-                            lm = res.pose_landmarks.landmark
-                            nose = lm[0]
-                            left_hip = lm[23]
-                            right_hip = lm[24]
-                            left_shoulder = lm[11]
-                            right_shoulder = lm[12]
-                            cy = (left_hip.y + right_hip.y) / 2.0
-                            shoulder_angle = abs(left_shoulder.y - right_shoulder.y)
-                            nose_delta = cy - nose.y
-                            # If nose below hip (negative delta) or shoulders nearly horizontal but body low → possible fall
-                            pose_fall = motion and ((nose_delta < 0.02) or (shoulder_angle < 0.02 and nose_delta < 0.04))
-                            if pose_fall and (now - last_fall_ts) > 2.0:
-                                st.fall = True
-                                last_fall_ts = now
-                    except Exception:
-                        pass
 
-                # YOLO person detection (event emission with confidence)
-                person_event_emitted = False
-                if yolo_model is not None and _toggles.get('yolo_enabled') and (now - yolo_last_infer) > yolo_interval:
-                    try:
-                        yolo_last_infer = now
-                        img = frame
-                        results = yolo_model.predict(source=img, imgsz=320, verbose=False)
-                        conf = 0.0
-                        if results and len(results) > 0:
-                            r = results[0]
-                            # class 0 is 'person' for COCO
-                            for b in r.boxes:
-                                cls_id = int(getattr(b, 'cls', [0])[0]) if hasattr(b, 'cls') else 0
-                                score = float(getattr(b, 'conf', [0.0])[0]) if hasattr(b, 'conf') else 0.0
-                                if cls_id == 0 and score > conf:
-                                    conf = score
-                        yolo_person_conf = conf
-                        if conf >= yolo_min_conf:
-                            # emit person event with confidence
-                            try:
-                                cfg = load_config()
-                                api = str(cfg.get('api', {}).get('base_url') or os.getenv('API_URL', 'http://localhost:4000'))
-                                ingest = str(cfg.get('api', {}).get('ingest_token') or os.getenv('INGEST_TOKEN', ''))
-                                requests.post(
-                                    f"{api}/alerts/events",
-                                    json={
-                                        "cameraId": cam_id,
-                                        "type": "person",
-                                        "details": {"confidence": float(conf)},
-                                    },
-                                    headers={"x-ingest-token": ingest},
-                                    timeout=1.5,
-                                )
-                                person_event_emitted = True
-                            except Exception:
-                                pass
-                    except Exception:
-                        pass
+def _yolo_person_confidence(result: Any) -> float:
+    conf = 0.0
+    # class 0 is 'person' for COCO
+    for b in result.boxes:
+        cls_id = int(getattr(b, 'cls', [0])[0]) if hasattr(b, 'cls') else 0
+        score = float(getattr(b, 'conf', [0.0])[0]) if hasattr(b, 'conf') else 0.0
+        if cls_id == 0 and score > conf:
+            conf = score
+    return conf
 
-                # mediapipe pose heuristic (if available) every 5th frame
-                frame_count += 1
-                if pose is not None and _toggles.get('pose_enabled') and frame_count % 5 == 0:
-                    try:
-                        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        res = pose.process(rgb)
-                        if res and res.pose_landmarks:
-                            lm = res.pose_landmarks.landmark
-                            # landmarks indices
-                            nose = lm[0]
-                            left_hip = lm[23]
-                            right_hip = lm[24]
-                            cx = (left_hip.x + right_hip.x) / 2.0
-                            cy = (left_hip.y + right_hip.y) / 2.0
-                            # Compute body tilt using shoulders if available
-                            left_shoulder = lm[11]
-                            right_shoulder = lm[12]
-                            shoulder_angle = abs(left_shoulder.y - right_shoulder.y)
-                            # if nose is close to hips (vertical collapse) and recent motion
-                            nose_delta = cy - nose.y  # positive if nose below hips
-                            likely_fall = motion and (nose_delta < fall_nose_hip_delta)
-                            if likely_fall:
-                                # debounce to reduce duplicates
-                                if (now - last_fall_ts) > fall_debounce_sec:
-                                    st.fall = True
-                                    last_fall_ts = now
-                    except Exception:
-                        pass
-                # MediaPipe Hands gesture detection (simple heuristics)
-                gesture_name = None
-                if hands is not None and _toggles.get('hands_enabled') and frame_count % 3 == 0:
-                    try:
-                        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        res_h = hands.process(rgb)
-                        if res_h and res_h.multi_hand_landmarks:
-                            # Heuristic: detect open palm vs closed (thumb to index distance)
-                            for hand_lms in res_h.multi_hand_landmarks:
-                                # landmarks indices per MediaPipe Hands
-                                # 4: thumb_tip, 8: index_tip, 12: middle_tip
-                                t = hand_lms.landmark[4]
-                                i = hand_lms.landmark[8]
-                                m = hand_lms.landmark[12]
-                                # compute pairwise distances in normalized coords
-                                ti = ((t.x - i.x)**2 + (t.y - i.y)**2) ** 0.5
-                                im = ((i.x - m.x)**2 + (i.y - m.y)**2) ** 0.5
-                                if ti > 0.12 and im > 0.10:
-                                    gesture_name = 'open_palm'
-                                    break
-                                elif ti < 0.05:
-                                    gesture_name = 'pinch_or_fist'
-                                    break
-                    except Exception:
-                        gesture_name = None
-                # post events to API
-                try:
-                    cfg = load_config()
-                    api = str(cfg.get('api', {}).get('base_url') or os.getenv('API_URL', 'http://localhost:4000'))
-                    ingest = str(cfg.get('api', {}).get('ingest_token') or os.getenv('INGEST_TOKEN', ''))
-                    if motion:
-                        requests.post(
-                            f"{api}/alerts/events",
-                            json={
-                                "cameraId": cam_id,
-                                "type": "motion",
-                                "details": {"motionPixels": motion_pixels},
-                            },
-                            headers={"x-ingest-token": ingest},
-                            timeout=1.5,
-                        )
-                    if st.fall:
-                        requests.post(
-                            f"{api}/alerts/events",
-                            json={
-                                "cameraId": cam_id,
-                                "type": "fall",
-                                "details": {
-                                    "noseHipDelta": float(nose_delta) if 'nose_delta' in locals() else None,
-                                    "shoulderAngle": float(shoulder_angle) if 'shoulder_angle' in locals() else None,
-                                    "onnx": bool(onnx_session is not None),
-                                    "yoloPersonConfidence": float(yolo_person_conf),
-                                },
-                            },
-                            headers={"x-ingest-token": ingest},
-                            timeout=1.5,
-                        )
-                    if gesture_name:
-                        try:
-                            cfg = load_config()
-                            api = str(cfg.get('api', {}).get('base_url') or os.getenv('API_URL', 'http://localhost:4000'))
-                            ingest = str(cfg.get('api', {}).get('ingest_token') or os.getenv('INGEST_TOKEN', ''))
-                            requests.post(
-                                f"{api}/alerts/events",
-                                json={
-                                    "cameraId": cam_id,
-                                    "type": "gesture",
-                                    "details": {"name": gesture_name},
-                                },
-                                headers={"x-ingest-token": ingest},
-                                timeout=1.5,
-                            )
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-        except Exception:
-            pass
-        time.sleep(interval)
-    cap.release()
 
+def _build_yolo_runner(weights: str) -> Callable[[List[Any]], List[Any]]:
+    model = YOLO(weights)
 
-def _start_hls(cam_id: str, url: str):
-    # Requires ffmpeg in PATH
-    if _hls_procs.get(cam_id) and _hls_procs[cam_id].poll() is None:
-        return True
-    hls_root = BASE_DIR / 'static' / 'hls' / cam_id
+    def run(frames: List[Any]) -> List[float]:
+        results = model.predict(source=frames, imgsz=320, verbose=False)
+        return [_yolo_person_confidence(r) for r in results]
+    return run
+
+
+def _resolve_fall_model(model_path: str, precision: str) -> tuple:
+    """Pick the fp32 model or its INT8 sibling (fall.int8.onnx / fall_int8.onnx)."""
+    base = Path(model_path)
+    if precision in ('auto', 'int8'):
+        for cand in (base.with_name(f"{base.stem}.int8{base.suffix}"), base.with_name(f"{base.stem}_int8{base.suffix}")):
+            if cand.exists():
+                return str(cand), 'int8'
+    return model_path, 'fp32'
+
+
+class _FallModelRuntime:
+    """Fall model session tuned for a shared CPU.
+
+    Thread counts are explicit (ORT defaults to every core, which starves
+    the camera threads), the graph is fully optimized once, and inputs are
+    copied into one preallocated [max_batch, ...] float32 buffer that is
+    bound through IO binding instead of building a new feed per run.
+    `clip_length` > 1 means the model scores a window of recent frames.
+    """
+
+    def __init__(self, model_path: str, precision: str = 'auto', intra_op_threads: int = 2, inter_op_threads: int = 1,
+                 clip_length: int = 1, input_size: int = 224, max_batch: int = 8):
+        self.model_path, self.precision = _resolve_fall_model(model_path, precision)
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.intra_op_num_threads = max(1, intra_op_threads)
+        opts.inter_op_num_threads = max(1, inter_op_threads)
+        self.threads = (opts.intra_op_num_threads, opts.inter_op_num_threads)
+        self.session = ort.InferenceSession(self.model_path, sess_options=opts, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_name = self.session.get_outputs()[0].name
+        dims = list(model_input.shape)
+        # a symbolic/None leading dim means the model accepts any batch size
+        self.dynamic_batch = not isinstance(dims[0], int)
+        rest = [d if isinstance(d, int) and d > 0 else None for d in dims[1:]]
+        if len(rest) == 4:
+            # [N, C, T, H, W] video model
+            self.clip_length = rest[1] or clip_length
+            self.sample_shape = (rest[0] or 1, self.clip_length, rest[2] or input_size, rest[3] or input_size)
+        else:
+            # [N, C|T, H, W]: a single gray frame, or T stacked frames as channels
+            c, h, w = (rest + [None, None, None])[:3]
+            self.clip_length = c or clip_length
+            self.sample_shape = (self.clip_length, h or input_size, w or input_size)
+        self.input_size = (self.sample_shape[-2], self.sample_shape[-1])
+        self.max_batch = max_batch if self.dynamic_batch else 1
+        self._input = np.zeros((self.max_batch,) + self.sample_shape, dtype=np.float32)
+        self.runs = 0
+        self.total_sec = 0.0
+
+    @classmethod
+    def from_config(cls, model_path: str, max_batch: int = 8) -> "_FallModelRuntime":
+        fc = get_config().get('fall_model', {}) or {}
+        return cls(
+            model_path,
+            precision=str(os.getenv('FALL_ONNX_PRECISION') or fc.get('precision', 'auto')).lower(),
+            intra_op_threads=int(fc.get('intra_op_threads', 2)),
+            inter_op_threads=int(fc.get('inter_op_threads', 1)),
+            clip_length=int(fc.get('clip_length', 1)),
+            input_size=int(fc.get('input_size', 224)),
+            max_batch=max_batch,
+        )
+
+    def _run_bound(self, n: int) -> Any:
+        binding = self.session.io_binding()
+        # buffer[:n] is a contiguous view: no copy, no new allocation
+        binding.bind_cpu_input(self.input_name, self._input[:n])
+        binding.bind_output(self.output_name)
+        self.session.run_with_iobinding(binding)
+        return binding.copy_outputs_to_cpu()[0]
+
+    def run(self, inputs: List[Any]) -> List[float]:
+        started = time.perf_counter()
+        scores: List[float] = []
+        for offset in range(0, len(inputs), self.max_batch):
+            chunk = inputs[offset:offset + self.max_batch]
+            for i, inp in enumerate(chunk):
+                self._input[i] = inp.reshape(self.sample_shape)
+            out = self._run_bound(len(chunk))
+            scores.extend(float(out[i].ravel()[0]) for i in range(len(chunk)))
+        self.runs += len(inputs)
+        self.total_sec += time.perf_counter() - started
+        return scores
+
+    def clip_buffer(self) -> "_FallClipBuffer":
+        return _FallClipBuffer(self.clip_length, self.input_size)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": Path(self.model_path).name,
+            "precision": self.precision,
+            "threads": {"intraOp": self.threads[0], "interOp": self.threads[1]},
+            "inputShape": list(self.sample_shape),
+            "clipLength": self.clip_length,
+            "avgInferMs": round(self.total_sec / self.runs * 1000.0, 3) if self.runs else None,
+        }
+
+
+class _FallClipBuffer:
+    """Per-camera sliding window of normalized gray frames for the fall model.
+
+    Frames are resized into a reused uint8 plane and scaled straight into
+    the ring (no per-frame float allocation). Each frame is written twice,
+    at i and i+length, so the newest `length` frames are always one
+    contiguous, chronologically ordered view.
+    """
+
+    def __init__(self, length: int, size: tuple):
+        self.length = max(1, length)
+        self.size = size
+        self._resized = np.empty(size, dtype=np.uint8)
+        self._ring = np.zeros((2 * self.length,) + tuple(size), dtype=np.float32)
+        self._next = 0
+        self.filled = 0
+
+    def push(self, gray: Any) -> None:
+        cv2.resize(gray, (self.size[1], self.size[0]), dst=self._resized)
+        i = self._next
+        np.multiply(self._resized, np.float32(1.0 / 255.0), out=self._ring[i], casting='unsafe')
+        self._ring[i + self.length] = self._ring[i]
+        self._next = (i + 1) % self.length
+        self.filled = min(self.length, self.filled + 1)
+
+    def ready(self) -> bool:
+        return self.filled >= self.length
+
+    def reset(self) -> None:
+        self.filled = 0
+
+    def clip(self) -> Any:
+        """Oldest→newest window, shape (length, H, W); a view valid until the next push."""
+        start = self._next
+        return self._ring[start:start + self.length]
+
+
+_inference_engines: Dict[tuple, _BatchedInference] = {}
+_inference_failures: Dict[tuple, Dict[str, Any]] = {}
+# loads in progress; set when the load finished (either way)
+_inference_loading: Dict[tuple, threading.Event] = {}
+_inference_lock = threading.Lock()
+_INFERENCE_RETRY_BASE_SEC = 5.0
+_INFERENCE_RETRY_MAX_SEC = 300.0
+
+
+def _load_inference_engine(kind: str, model_path: str) -> tuple:
+    """Build an engine for (kind, model_path); returns (engine or None, error)."""
+    max_batch = int(os.getenv('INFER_MAX_BATCH', '8'))
+    try:
+        model = None
+        if kind == 'yolo' and YOLO:
+            runner = _build_yolo_runner(model_path)
+        elif kind == 'onnx' and np is not None and Path(model_path).exists() and ort:
+            model = _FallModelRuntime.from_config(model_path, max_batch=max_batch)
+            runner = model.run
+        else:
+            return None, 'unavailable'
+        engine = _BatchedInference(
+            f"{kind}:{Path(model_path).name}",
+            runner,
+            max_batch=max_batch,
+            max_wait=float(os.getenv('INFER_MAX_WAIT_MS', '20')) / 1000.0,
+            model=model,
+        )
+        return engine, None
+    except Exception as e:
+        return None, str(e)
+
+
+def _get_inference_engine(kind: str, model_path: str, wait: Optional[float] = None) -> Optional[_BatchedInference]:
+    """Return the process-wide engine for (kind, model_path), loading it once.
+
+    Only a working engine is cached. A failed load (model file not there yet,
+    runtime missing) returns None and is retried on a later call once its
+    backoff (5 s doubling up to 5 min) has passed. The load itself (which may
+    download weights) runs outside _inference_lock; concurrent callers for
+    the same key wait up to `wait` seconds (None: until it is done) for it.
+    """
+    key = (kind, model_path)
+    with _inference_lock:
+        if key in _inference_engines:
+            return _inference_engines[key]
+        failure = _inference_failures.get(key)
+        if failure and time.time() < failure["retryAt"]:
+            return None
+        loading = _inference_loading.get(key)
+        owner = loading is None
+        if owner:
+            loading = _inference_loading[key] = threading.Event()
+    if not owner:
+        loading.wait(wait)
+        with _inference_lock:
+            return _inference_engines.get(key)
+    engine, error = None, 'unavailable'
+    try:
+        engine, error = _load_inference_engine(kind, model_path)
+    finally:
+        with _inference_lock:
+            if engine is None:
+                attempts = (failure or {}).get("attempts", 0) + 1
+                delay = min(_INFERENCE_RETRY_MAX_SEC, _INFERENCE_RETRY_BASE_SEC * (2 ** (attempts - 1)))
+                _inference_failures[key] = {"kind": kind, "model": model_path, "attempts": attempts,
+                                            "error": error, "retryAt": time.time() + delay}
+            else:
+                _inference_failures.pop(key, None)
+                _inference_engines[key] = engine
+            del _inference_loading[key]
+        loading.set()
+    return engine
+
+
+@app.get('/api/inference')
+def inference_stats():
+    return {
+        "engines": [e.stats() for e in list(_inference_engines.values())],
+        "failures": [dict(f) for f in list(_inference_failures.values())],
+    }
+
+
+#############################
+# Async event emitter       #
+#############################
+
+def _event_api_target(cfg: Mapping[str, Any]) -> tuple:
+    api = str(cfg.get('api', {}).get('base_url') or os.getenv('API_URL', 'http://localhost:4000'))
+    ingest = str(cfg.get('api', {}).get('ingest_token') or os.getenv('INGEST_TOKEN', ''))
+    return api, ingest
+
+
+class _EventJournal:
+    """Durable outbound event queue: one SQLite table in WAL mode.
+
+    Every event is committed here before any network I/O, so nothing is lost
+    when the alerts API or the tunnel is down, or when the process restarts.
+    Rows are read back in insertion order and deleted only once the API
+    acknowledged them. Non-critical events may carry a coalesce key: a
+    newer event with the same key rewrites the unsent row (bumping `rev`
+    so an in-flight older version is not acked over it). The idempotency key
+    is `<id>-<rev>`, so every rewritten payload is a new delivery to an API
+    that dedupes on it, while retries of one version reuse the same key.
+    The row count is bounded; the oldest non-critical row is evicted first,
+    critical (fall) rows never are. Events the API rejects for good are moved
+    to a dead_letters table rather than deleted. Camera worker processes
+    append to the same file.
+    """
+
+    def __init__(self, path: Any = ':memory:', max_events: int = 100000):
+        self.path = str(path)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_events = max(1, max_events)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        # WAL + NORMAL: a commit survives a process crash without an fsync per event
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS events ('
+            ' seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL, coalesce_key TEXT UNIQUE,'
+            ' camera TEXT NOT NULL, type TEXT NOT NULL, details TEXT NOT NULL, created REAL NOT NULL,'
+            ' critical INTEGER NOT NULL DEFAULT 0, rev INTEGER NOT NULL DEFAULT 0,'
+            ' repeats INTEGER NOT NULL DEFAULT 1, attempts INTEGER NOT NULL DEFAULT 0)'
+        )
+        # wait_delivered() polls by id while a backlog builds up
+        self._db.execute('CREATE INDEX IF NOT EXISTS events_id ON events(id)')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS dead_letters ('
+            ' seq INTEGER PRIMARY KEY, id TEXT NOT NULL, camera TEXT NOT NULL, type TEXT NOT NULL,'
+            ' details TEXT NOT NULL, created REAL NOT NULL, critical INTEGER NOT NULL, rev INTEGER NOT NULL,'
+            ' repeats INTEGER NOT NULL, status INTEGER, error TEXT, failed_at REAL NOT NULL)'
+        )
+        self._count = self._db.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+        self.appended = 0
+        self.coalesced = 0
+        self.evicted = 0
+        self.rejected_full = 0
+
+    @staticmethod
+    def key(event_id: str, rev: int) -> str:
+        return f"{event_id}-{rev}"
+
+    def append(self, cam_id: str, event_type: str, details: Dict[str, Any], coalesce_key: Optional[str] = None,
+               critical: bool = False) -> Optional[str]:
+        """Commit one event; returns its idempotency key, or None if the journal is full of critical rows."""
+        body = json.dumps(details, separators=(',', ':'), default=str)
+        with self._lock:
+            if coalesce_key is not None:
+                row = self._db.execute('SELECT seq, id, rev FROM events WHERE coalesce_key=?', (coalesce_key,)).fetchone()
+                if row is not None:
+                    self._db.execute('UPDATE events SET details=?, repeats=repeats+1, rev=rev+1 WHERE seq=?', (body, row[0]))
+                    self.coalesced += 1
+                    return self.key(row[1], row[2] + 1)
+            if self._count >= self.max_events:
+                # other processes append too; trust the table, not the cached count
+                self._count = self._db.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+            if self._count >= self.max_events:
+                victim = self._db.execute('SELECT seq FROM events WHERE critical=0 ORDER BY seq LIMIT 1').fetchone()
+                if victim is None and not critical:
+                    self.rejected_full += 1
+                    return None
+                if victim is not None:
+                    self._db.execute('DELETE FROM events WHERE seq=?', victim)
+                    self._count -= 1
+                    self.evicted += 1
+            event_id = uuid.uuid4().hex
+            self._db.execute(
+                'INSERT INTO events (id, coalesce_key, camera, type, details, created, critical) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (event_id, coalesce_key, cam_id, event_type, body, time.time(), int(critical)),
+            )
+            self._count += 1
+            self.appended += 1
+            return self.key(event_id, 0)
+
+    def peek(self, limit: int) -> List[Dict[str, Any]]:
+        """Oldest unacknowledged events, in order."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT seq, rev, id, camera, type, details, repeats, attempts, created FROM events ORDER BY seq LIMIT ?', (limit,)
+            ).fetchall()
+        out = []
+        for seq, rev, event_id, cam_id, event_type, body, repeats, attempts, created in rows:
+            details = json.loads(body)
+            if repeats > 1:
+                details["repeats"] = repeats
+            out.append({"seq": seq, "rev": rev, "id": self.key(event_id, rev), "cameraId": cam_id, "type": event_type,
+                        "details": details, "attempts": attempts, "created": created})
+        return out
+
+    def ack(self, seq: int, rev: int) -> bool:
+        """Delete a delivered row unless it was rewritten while in flight."""
+        with self._lock:
+            cur = self._db.execute('DELETE FROM events WHERE seq=? AND rev=?', (seq, rev))
+            if cur.rowcount:
+                self._count -= 1
+            return bool(cur.rowcount)
+
+    def failed(self, seq: int) -> None:
+        with self._lock:
+            self._db.execute('UPDATE events SET attempts=attempts+1 WHERE seq=?', (seq,))
+
+    def dead_letter(self, seq: int, rev: int, status: Optional[int], error: Optional[str] = None) -> bool:
+        """Move a row the API refused for good out of the queue; False if it was rewritten meanwhile."""
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                cur = self._db.execute(
+                    'INSERT INTO dead_letters (seq, id, camera, type, details, created, critical, rev, repeats, status, error, failed_at)'
+                    ' SELECT seq, id, camera, type, details, created, critical, rev, repeats, ?, ?, ? FROM events WHERE seq=? AND rev=?',
+                    (status, error, time.time(), seq, rev),
+                )
+                if cur.rowcount:
+                    self._db.execute('DELETE FROM events WHERE seq=?', (seq,))
+                    self._count -= 1
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+            return bool(cur.rowcount)
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT id, rev, camera, type, details, created, critical, status, error, failed_at'
+                ' FROM dead_letters ORDER BY seq DESC LIMIT ?', (limit,)
+            ).fetchall()
+        return [{"id": self.key(event_id, rev), "cameraId": cam_id, "type": event_type, "details": json.loads(body),
+                 "created": created, "critical": bool(critical), "status": status, "error": error, "failedAt": failed_at}
+                for event_id, rev, cam_id, event_type, body, created, critical, status, error, failed_at in rows]
+
+    def requeue_dead_letters(self) -> int:
+        """Put every dead letter back at the end of the queue (e.g. after the API was fixed)."""
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                cur = self._db.execute(
+                    'INSERT INTO events (id, camera, type, details, created, critical, rev, repeats)'
+                    ' SELECT id, camera, type, details, created, critical, rev + 1, repeats FROM dead_letters ORDER BY seq'
+                )
+                self._db.execute('DELETE FROM dead_letters')
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+            self._count += cur.rowcount
+            return cur.rowcount
+
+    def contains(self, key: str) -> bool:
+        """True while the event behind an idempotency key (any revision of it) is undelivered."""
+        event_id = key.rsplit('-', 1)[0]
+        with self._lock:
+            return self._db.execute('SELECT 1 FROM events WHERE id=?', (event_id,)).fetchone() is not None
+
+    def count(self) -> int:
+        with self._lock:
+            self._count = self._db.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+            return self._count
+
+    def compact(self) -> None:
+        """Fold the WAL back into the main file once the queue is empty."""
+        with self._lock:
+            try:
+                self._db.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = None
+        with self._lock:
+            row = self._db.execute('SELECT MIN(created) FROM events').fetchone()
+            dead = self._db.execute('SELECT COUNT(*) FROM dead_letters').fetchone()[0]
+        if row and row[0]:
+            oldest = round(time.time() - row[0], 1)
+        return {
+            "path": self.path,
+            "pending": self._count,
+            "maxEvents": self.max_events,
+            "oldestPendingSec": oldest,
+            "appended": self.appended,
+            "coalesced": self.coalesced,
+            "evicted": self.evicted,
+            "rejectedFull": self.rejected_full,
+            "deadLetters": dead,
+        }
+
+
+class _EventEmitter:
+    """Background sender for /alerts/events so camera loops never block on HTTP.
+
+    emit() only commits the event to the _EventJournal. A single sender
+    thread (in the API process; camera workers only append) replays the
+    journal in order over a pooled keep-alive session, sending each event's
+    id as its Idempotency-Key, and deletes it once the API accepted it.
+    A failure stops the pass so order is kept, and retries back off up to
+    max_retry_wait. Events the API rejects as malformed are dead-lettered in
+    the journal rather than blocking everything behind them. A newer motion/person/gesture event
+    for the same camera and episode coalesces into the unsent one (with a
+    repeat count); fall events and episode start/end markers never coalesce.
+    """
+
+    def __init__(self, journal: Optional[_EventJournal] = None, max_batch: int = 50, linger: float = 0.25,
+                 timeout: float = 3.0, max_queue: Optional[int] = None, sender: bool = True, max_retry_wait: float = 30.0):
+        self.journal = journal or _EventJournal(max_events=max_queue or 500)
+        self._max_batch = max(1, max_batch)
+        self._linger = linger
+        self._timeout = timeout
+        self._sender = sender
+        self._max_retry_wait = max_retry_wait
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._session = requests.Session()
+        self._session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.sent = 0
+        self.failed = 0
+        self.rejected = 0
+        self.retry_wait = 0.0
+        self.last_batch_size = 0
+        self.last_latency_ms = 0.0
+        self.avg_latency_ms = 0.0
+        self.last_error: Optional[str] = None
+        self.last_response: Optional[str] = None
+
+    @property
+    def dropped(self) -> int:
+        return self.journal.evicted + self.journal.rejected_full
+
+    @property
+    def coalesced(self) -> int:
+        return self.journal.coalesced
+
+    def start(self) -> None:
+        if not self._sender:
+            return
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="event-emitter", daemon=True)
+                self._thread.start()
+
+    def submit(self, cam_id: str, event_type: str, details: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Journal an event; returns its id, or None when it was dropped by backpressure."""
+        details = dict(details or {})
+        marker = event_type == 'fall' or details.get('phase') in ('start', 'end')
+        # scoped to the episode, so a new episode's summary never rewrites the
+        # previous one's unsent summary (which sits before that episode's end)
+        event_id = self.journal.append(
+            cam_id, event_type, details,
+            coalesce_key=None if marker else f"{cam_id}\0{event_type}\0{details.get('startedAt', '')}",
+            critical=event_type == 'fall',
+        )
+        if event_id is not None:
+            self.start()
+            with self._cond:
+                self._cond.notify()
+        return event_id
+
+    def emit(self, cam_id: str, event_type: str, details: Optional[Dict[str, Any]] = None) -> bool:
+        """Queue an event; returns False when it was dropped by backpressure."""
+        return self.submit(cam_id, event_type, details) is not None
+
+    def wait_delivered(self, event_id: str, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while self.journal.contains(event_id):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            # camera workers append from other processes without notifying us
+            while not self.journal.count():
+                self._cond.wait(timeout=1.0)
+        # give bursts a moment to coalesce before draining
+        if self._linger > 0:
+            time.sleep(self._linger)
+        return self.journal.peek(self._max_batch)
+
+    def _post(self, api: str, ingest: str, ev: Dict[str, Any]) -> Optional[int]:
+        started = time.perf_counter()
+        try:
+            r = self._session.post(
+                f"{api}/alerts/events",
+                json={"cameraId": ev["cameraId"], "type": ev["type"], "details": dict(ev["details"], eventId=ev["id"])},
+                headers={"x-ingest-token": ingest, "Idempotency-Key": ev["id"]},
+                timeout=self._timeout,
+            )
+            status: Optional[int] = r.status_code
+            self.last_response = r.text[:500] if status >= 400 else None
+        except Exception as e:
+            self.last_error = str(e)
+            status = None
+        self.last_latency_ms = (time.perf_counter() - started) * 1000.0
+        self.avg_latency_ms = 0.9 * self.avg_latency_ms + 0.1 * self.last_latency_ms if self.avg_latency_ms else self.last_latency_ms
+        return status
+
+    def _loop(self):
+        while True:
+            batch = self._take_batch()
+            self.last_batch_size = len(batch)
+            api, ingest = _event_api_target(get_config())
+            for ev in batch:
+                status = self._post(api, ingest, ev)
+                if status is not None and 200 <= status < 300:
+                    self.journal.ack(ev["seq"], ev["rev"])
+                    self.sent += 1
+                    self.retry_wait = 0.0
+                elif status in (400, 413, 422):
+                    # malformed for this API: retrying can never succeed, but
+                    # keep it (falls included) for inspection and requeueing
+                    self.journal.dead_letter(ev["seq"], ev["rev"], status, self.last_response)
+                    self.rejected += 1
+                else:
+                    self.journal.failed(ev["seq"])
+                    self.failed += 1
+                    if status is not None:
+                        self.last_error = f"HTTP {status}"
+                    self.retry_wait = min(self._max_retry_wait, max(1.0, self.retry_wait * 2))
+                    break
+            if self.retry_wait:
+                time.sleep(self.retry_wait)
+            elif not self.journal.count():
+                self.journal.compact()
+
+    def queue_depth(self) -> int:
+        return self.journal.count()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queueDepth": self.queue_depth(),
+            "maxQueue": self.journal.max_events,
+            "lastBatchSize": self.last_batch_size,
+            "sent": self.sent,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "retryWaitSec": self.retry_wait,
+            "lastError": self.last_error,
+            "lastLatencyMs": round(self.last_latency_ms, 2),
+            "avgLatencyMs": round(self.avg_latency_ms, 2),
+            "journal": self.journal.stats(),
+        }
+
+
+_event_emitter = _EventEmitter(
+    _EventJournal(
+        os.getenv('EVENT_JOURNAL_PATH') or BASE_DIR / 'storage' / 'events.db',
+        max_events=int(os.getenv('EVENT_QUEUE_MAX', '100000')),
+    ),
+    max_batch=int(os.getenv('EVENT_BATCH_MAX', '50')),
+    sender=not _IS_CAMERA_WORKER,
+)
+
+
+class _EventTracker:
+    """Turns per-frame detections into episodes per (camera, event type).
+
+    An observation opens a pending episode; it becomes active (and 'start'
+    is sent) once it has lasted min_dwell_sec, so one-frame blips never leave
+    the box. While active, an 'ongoing' summary with the count, duration and
+    peak numeric values since the start goes out every summary_sec, and
+    'end' follows end_after_sec after the last observation. Starts and
+    summaries draw from a token bucket per (camera, type); a skipped summary
+    loses nothing because the next one is cumulative, and every episode whose
+    start was sent gets its end. Falls bypass all of it.
+    """
+
+    DEFAULT_RULES: Dict[str, Dict[str, float]] = {
+        'motion': {'min_dwell_sec': 1.0, 'end_after_sec': 15.0, 'summary_sec': 120.0, 'rate_per_min': 6.0, 'burst': 3},
+        'person': {'min_dwell_sec': 1.0, 'end_after_sec': 15.0, 'summary_sec': 120.0, 'rate_per_min': 6.0, 'burst': 3},
+        'gesture': {'min_dwell_sec': 0.5, 'end_after_sec': 3.0, 'summary_sec': 30.0, 'rate_per_min': 6.0, 'burst': 3},
+    }
+    FALLBACK_RULE: Dict[str, float] = {'min_dwell_sec': 1.0, 'end_after_sec': 10.0, 'summary_sec': 60.0, 'rate_per_min': 6.0, 'burst': 3}
+
+    def __init__(self, emit: Callable[[str, str, Dict[str, Any]], bool], tick_interval: float = 1.0):
+        self._emit = emit
+        self._tick_interval = tick_interval
+        self._lock = threading.Lock()
+        self._episodes: Dict[tuple, Dict[str, Any]] = {}
+        self._buckets: Dict[tuple, List[float]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self.observed = 0
+        self.sent: Dict[str, int] = {"start": 0, "ongoing": 0, "end": 0, "fall": 0}
+        self.rate_limited = 0
+        self.debounced = 0
+
+    def rule(self, cam_id: str, event_type: str) -> Dict[str, float]:
+        merged = dict(self.DEFAULT_RULES.get(event_type, self.FALLBACK_RULE))
+        merged.update(_camera_config(cam_id, 'events').get(event_type) or {})
+        return merged
+
+    def _take_token(self, key: tuple, rule: Mapping[str, float], now: float) -> bool:
+        rate = float(rule.get('rate_per_min', 6.0)) / 60.0
+        burst = max(1.0, float(rule.get('burst', 3)))
+        bucket = self._buckets.setdefault(key, [burst, now])
+        bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return True
+        self.rate_limited += 1
+        return False
+
+    def _send(self, key: tuple, ep: Dict[str, Any], phase: str) -> None:
+        details = dict(ep["details"]) if phase != 'end' else {}
+        details.update({
+            "phase": phase,
+            "startedAt": ep["first"],
+            "count": ep["count"],
+            "durationSec": round(ep["last"] - ep["first"], 2),
+            "peak": dict(ep["peak"]),
+        })
+        if phase == 'end':
+            details["endedAt"] = ep["last"]
+        if ep["skipped"]:
+            details["rateLimitedUpdates"] = ep["skipped"]
+        self.sent[phase] += 1
+        self._emit(key[0], key[1], details)
+
+    def observe(self, cam_id: str, event_type: str, details: Optional[Dict[str, Any]] = None, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        details = dict(details or {})
+        self.observed += 1
+        if event_type == 'fall':
+            self.sent["fall"] += 1
+            self._emit(cam_id, event_type, details)
+            return
+        self._ensure_ticker()
+        key = (cam_id, event_type)
+        with self._lock:
+            ep = self._episodes.get(key)
+            if ep is None:
+                ep = self._episodes[key] = {
+                    "state": "pending", "first": now, "last": now, "lastSent": now, "count": 0,
+                    "details": {}, "peak": {}, "skipped": 0, "startSent": False, "rule": self.rule(cam_id, event_type),
+                }
+            rule = ep["rule"]
+            ep["count"] += 1
+            ep["last"] = now
+            ep["details"] = details
+            for k, v in details.items():
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    ep["peak"][k] = max(v, ep["peak"].get(k, v))
+            if ep["state"] == "pending":
+                if now - ep["first"] >= float(rule['min_dwell_sec']):
+                    ep["state"] = "active"
+                    ep["lastSent"] = now
+                    if self._take_token(key, rule, now):
+                        ep["startSent"] = True
+                        self._send(key, ep, 'start')
+                    else:
+                        ep["skipped"] += 1
+            elif now - ep["lastSent"] >= float(rule['summary_sec']):
+                ep["lastSent"] = now
+                if self._take_token(key, rule, now):
+                    self._send(key, ep, 'ongoing' if ep["startSent"] else 'start')
+                    ep["startSent"] = True
+                else:
+                    ep["skipped"] += 1
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """Close episodes that have not been observed for end_after_sec."""
+        now = time.time() if now is None else now
+        with self._lock:
+            for key, ep in list(self._episodes.items()):
+                if now - ep["last"] < float(ep["rule"]['end_after_sec']):
+                    continue
+                del self._episodes[key]
+                if ep["state"] == "pending":
+                    self.debounced += 1
+                elif ep["startSent"]:
+                    self._send(key, ep, 'end')
+
+    def _ensure_ticker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._tick_loop, name="event-tracker", daemon=True)
+            self._thread.start()
+
+    def _tick_loop(self) -> None:
+        while True:
+            time.sleep(self._tick_interval)
+            try:
+                self.tick()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            active = [
+                {"cameraId": k[0], "type": k[1], "state": ep["state"], "count": ep["count"], "sinceSec": round(time.time() - ep["first"], 1)}
+                for k, ep in self._episodes.items()
+            ]
+        return {
+            "observed": self.observed,
+            "sent": dict(self.sent),
+            "rateLimited": self.rate_limited,
+            "debounced": self.debounced,
+            "episodes": active,
+        }
+
+
+_event_tracker = _EventTracker(_event_emitter.emit)
+
+
+@app.get('/api/events/emitter')
+def event_emitter_stats():
+    return _event_emitter.stats()
+
+
+@app.get('/api/events/dead-letters')
+def event_dead_letters(limit: int = 100):
+    return {"items": _event_emitter.journal.dead_letters(max(1, min(limit, 1000)))}
+
+
+@app.post('/api/events/dead-letters/requeue')
+def event_dead_letters_requeue():
+    requeued = _event_emitter.journal.requeue_dead_letters()
+    if requeued:
+        _event_emitter.start()
+    return {"requeued": requeued}
+
+
+@app.get('/api/events/state')
+def event_tracker_stats():
+    return _event_tracker.stats()
+
+
+############################
+# RTSP ingest minimal stub #
+############################
+
+class CameraState(BaseModel):
+    url: str
+    last_frame_ts: Optional[float] = None
+    motion: bool = False
+    fall: bool = False
+
+_camera_threads: Dict[str, threading.Thread] = {}
+_camera_state: Dict[str, CameraState] = {}
+_stop_flags: Dict[str, bool] = {}
+_last_frames: Dict[str, Any] = {}
+_last_health: Dict[str, float] = {}
+_frame_grabbers: Dict[str, "_FrameGrabber"] = {}
+
+
+class _SnapshotCache:
+    """Latest published frame per camera, JPEG-encoded at most once per version.
+
+    Every publish bumps the camera's version; the first reader of a version
+    encodes it and every other reader (snapshot polls, MJPEG subscribers,
+    backups) reuses those bytes.
+    """
+
+    def __init__(self, quality: int = 80):
+        self.quality = quality
+        self._lock = threading.Lock()
+        self._frames: Dict[str, tuple] = {}
+        self._encoded: Dict[str, tuple] = {}
+        self._encode_locks: Dict[str, threading.Lock] = {}
+        self.encodes = 0
+        self.hits = 0
+
+    def publish(self, cam_id: str, frame: Any) -> int:
+        with self._lock:
+            version = self._frames.get(cam_id, (0, None))[0] + 1
+            self._frames[cam_id] = (version, frame)
+            self._encode_locks.setdefault(cam_id, threading.Lock())
+            return version
+
+    def version(self, cam_id: str) -> int:
+        return self._frames.get(cam_id, (0, None))[0]
+
+    def jpeg(self, cam_id: str) -> Optional[tuple]:
+        """(version, bytes or None on encode failure) for the newest frame."""
+        entry = self._frames.get(cam_id)
+        if entry is None:
+            return None
+        with self._encode_locks[cam_id]:
+            version, frame = self._frames[cam_id]
+            cached = self._encoded.get(cam_id)
+            if cached is not None and cached[0] == version:
+                self.hits += 1
+                return cached
+            ok, buf = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality])
+            self.encodes += 1
+            result = (version, buf.tobytes() if ok else None)
+            self._encoded[cam_id] = result
+            return result
+
+    def etag(self, version: int) -> str:
+        # boot time keeps tags from colliding across restarts
+        return f'"{int(_process_start):x}-{version}"'
+
+
+_snapshots = _SnapshotCache(quality=int(os.getenv('SNAPSHOT_JPEG_QUALITY', '80')))
+
+
+class _SharedFrameSlot:
+    """Latest frame plus camera flags for one camera in shared memory.
+
+    Layout: 8 float64 header fields [seq, height, width, channels,
+    capture_ts, motion, fall, last_frame_ts] followed by the frame bytes.
+    The writer (camera worker process) bumps seq to odd before copying the
+    frame and to even after; readers retry if seq was odd or moved while
+    they copied (a seqlock), so no locks or pickling cross the process line.
+    """
+
+    HEADER_BYTES = 64
+
+    def __init__(self, name: str, capacity: int = 0, create: bool = False):
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=self.HEADER_BYTES + capacity)
+        else:
+            # spawned workers share the API process's resource tracker, so
+            # attaching here does not add a second owner; only the API
+            # process unlinks
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = name
+        self._header = np.ndarray((8,), dtype=np.float64, buffer=self.shm.buf)
+        if create:
+            self._header[:] = 0
+        self._data = np.ndarray((self.shm.size - self.HEADER_BYTES,), dtype=np.uint8, buffer=self.shm.buf, offset=self.HEADER_BYTES)
+        self.capacity = self._data.size
+
+    def write_frame(self, frame: Any, capture_ts: float) -> bool:
+        if frame.nbytes > self.capacity or frame.dtype != np.uint8:
+            return False
+        h = self._header
+        seq = h[0]
+        h[0] = seq + 1
+        self._data[:frame.nbytes] = frame.reshape(-1)
+        h[1], h[2] = frame.shape[0], frame.shape[1]
+        h[3] = frame.shape[2] if frame.ndim == 3 else 1
+        h[4] = capture_ts
+        h[0] = seq + 2
+        return True
+
+    def write_state(self, last_frame_ts: Optional[float], motion: bool, fall: bool) -> None:
+        self._header[5] = 1.0 if motion else 0.0
+        self._header[6] = 1.0 if fall else 0.0
+        self._header[7] = last_frame_ts or 0.0
+
+    def read_state(self) -> tuple:
+        h = self._header
+        return (float(h[7]) or None, bool(h[5]), bool(h[6]))
+
+    def sequence(self) -> int:
+        return int(self._header[0])
+
+    def read_frame(self, after_seq: int = 0) -> Optional[tuple]:
+        """(seq, capture_ts, frame copy) if a frame newer than after_seq is available."""
+        h = self._header
+        for _ in range(10):
+            seq = int(h[0])
+            if seq == 0 or seq == after_seq:
+                return None
+            if seq % 2:
+                time.sleep(0.001)
+                continue
+            height, width, channels, ts = int(h[1]), int(h[2]), int(h[3]), float(h[4])
+            n = height * width * channels
+            frame = self._data[:n].copy()
+            if int(h[0]) == seq:
+                shape = (height, width, channels) if channels > 1 else (height, width)
+                return seq, ts, frame.reshape(shape)
+        return None
+
+    def close(self, unlink: bool = False) -> None:
+        # drop numpy views first; SharedMemory refuses to close with live exports
+        self._header = None  # type: ignore[assignment]
+        self._data = None  # type: ignore[assignment]
+        try:
+            self.shm.close()
+            if unlink:
+                self.shm.unlink()
+        except Exception:
+            pass
+
+
+# set inside camera worker processes: cam_id -> slot this process writes to
+_shared_slots: Dict[str, _SharedFrameSlot] = {}
+
+
+def _publish_frame(cam_id: str, frame: Any) -> None:
+    slot = _shared_slots.get(cam_id)
+    if slot is not None:
+        # worker process: the API process serves snapshots from shared memory
+        slot.write_frame(frame, time.time())
+        return
+    _last_frames[cam_id] = frame
+    _snapshots.publish(cam_id, frame)
+
+
+def _publish_state(cam_id: str, st: Optional["CameraState"]) -> None:
+    slot = _shared_slots.get(cam_id)
+    if slot is not None and st is not None:
+        slot.write_state(st.last_frame_ts, st.motion, st.fall)
+
+
+_pipeline_stats: Dict[str, Dict[str, Any]] = {}
+_hls_procs: Dict[str, subprocess.Popen] = {}
+
+# Runtime toggles (can be changed via API)
+_toggles = {
+    'face_blur': True,
+    'pose_enabled': True,
+    'hands_enabled': True,
+    'yolo_enabled': os.getenv('YOLO_ENABLED', 'false').lower() in ('1', 'true', 'yes'),
+    'onnx_enabled': bool(os.getenv('FALL_ONNX_MODEL')),
+}
+
+
+# per-camera overrides of the toggles above (from the camera registry)
+_camera_toggles: Dict[str, Dict[str, bool]] = {}
+
+
+def _toggle(cam_id: str, name: str) -> bool:
+    override = _camera_toggles.get(cam_id, {}).get(name)
+    return bool(_toggles.get(name, False) if override is None else override)
+
+
+def _ingest_mode() -> str:
+    """'separate' (OpenCV + its own HLS ffmpeg) or 'fanout' (one ffmpeg feeds both)."""
+    mode = os.getenv('CAMERA_INGEST_MODE') or get_config().get('camera', {}).get('ingest_mode') or 'separate'
+    return str(mode).lower()
+
+
+def _probe_video_codec(url: str) -> Optional[str]:
+    cmd = ['ffprobe', '-v', 'error']
+    if url.startswith('rtsp'):
+        cmd += ['-rtsp_transport', 'tcp']
+    cmd += ['-select_streams', 'v:0', '-show_entries', 'stream=codec_name', '-of', 'csv=p=0', url]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip().split('\n')[0] or None
+    except Exception:
+        return None
+
+
+class _FfmpegFanoutCapture:
+    """One ffmpeg per camera: a single network pull and decode feeding both the
+    HLS packager and the analysis pipeline (raw BGR frames on stdout).
+
+    H.264 sources are remuxed into HLS with stream copy; anything else is
+    transcoded once. Analysis frames are fitted into camera.resolution
+    without distortion (letterboxed) at the camera's own fps. Quacks like
+    cv2.VideoCapture for the frame grabber.
+    """
+
+    def __init__(self, cam_id: str, url: str, fps: Optional[int] = None):
+        cam_cfg = get_config().get('camera', {})
+        width, height = (list(cam_cfg.get('resolution') or [1280, 720]) + [720])[:2]
+        self.width, self.height = int(width), int(height)
+        fps = int(fps or cam_cfg.get('fps', 15))
+        self.codec = _probe_video_codec(url)
+        playlist = _prepare_hls_dir(cam_id)
+        cmd = ['ffmpeg', '-y', '-loglevel', 'error']
+        if url.startswith('rtsp'):
+            cmd += ['-rtsp_transport', 'tcp']
+        cmd += ['-i', url, '-an', '-map', '0:v:0']
+        cmd += _hls_output_args(playlist, copy=(self.codec == 'h264'))
+        cmd += [
+            '-map', '0:v:0',
+            '-vf', f'fps={fps},scale={self.width}:{self.height}:force_original_aspect_ratio=decrease,'
+                   f'pad={self.width}:{self.height}:(ow-iw)/2:(oh-ih)/2',
+            '-pix_fmt', 'bgr24', '-f', 'rawvideo', 'pipe:1',
+        ]
+        self._frame_bytes = self.width * self.height * 3
+        self._proc: Optional[subprocess.Popen] = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=self._frame_bytes,
+        )
+        _hls_procs[cam_id] = self._proc
+
+    def isOpened(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def read(self) -> tuple:
+        if self._proc is None or self._proc.stdout is None:
+            return False, None
+        buf = self._proc.stdout.read(self._frame_bytes)
+        if not buf or len(buf) < self._frame_bytes:
+            return False, None
+        return True, np.frombuffer(buf, dtype=np.uint8).reshape(self.height, self.width, 3).copy()
+
+    def release(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.kill()
+                proc.wait(timeout=2)
+            except Exception:
+                pass
+
+
+# url scheme -> factory(url, cam_id) returning a VideoCapture-like object;
+# lets tools (e.g. scripts/bench_pipeline.py) feed synthetic or paced sources
+_capture_factories: Dict[str, Callable[[str, Optional[str]], Any]] = {}
+# every grabber thread ever started per camera, until it has exited; a thread
+# stuck in a blocking read is still a live decoder the supervisor must wait for
+_grab_threads: Dict[str, List[threading.Thread]] = {}
+_grab_threads_lock = threading.Lock()
+
+
+def _live_grab_threads(cam_id: str) -> List[threading.Thread]:
+    with _grab_threads_lock:
+        alive = [t for t in _grab_threads.get(cam_id, []) if t.is_alive()]
+        if alive:
+            _grab_threads[cam_id] = alive
+        else:
+            _grab_threads.pop(cam_id, None)
+        return alive
+
+
+def _open_capture(url: str, cam_id: Optional[str] = None, fps: Optional[int] = None) -> Any:
+    factory = _capture_factories.get(urlparse(url).scheme)
+    if factory is not None:
+        return factory(url, cam_id)
+    if cam_id is not None and _ingest_mode() == 'fanout' and shutil.which('ffmpeg') and np is not None:
+        return _FfmpegFanoutCapture(cam_id, url, fps=fps)
+    cam_cfg = get_config().get('camera', {})
+    if urlparse(url).scheme in ('rtsp', 'rtmp', 'http', 'https') and hasattr(cv2, 'CAP_PROP_READ_TIMEOUT_MSEC'):
+        # bounded open/read so a dead network camera fails the read instead of
+        # blocking the grabber thread forever
+        cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG, [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(float(cam_cfg.get('open_timeout_sec', 10)) * 1000),
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(float(cam_cfg.get('read_timeout_sec', 5)) * 1000),
+        ])
+    else:
+        cap = cv2.VideoCapture(url)
+    try:
+        # keep OpenCV's own decode queue short; the grabber holds the ring
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    except Exception:
+        pass
+    return cap
+
+
+class _FrameGrabber:
+    """Capture thread for one camera that only ever keeps the newest frames.
+
+    Decoding runs flat out in its own thread so the RTSP/OS buffers never
+    back up behind slow analysis. Frames land in a small ring of
+    (seq, capture_ts, frame); the analysis side asks for the newest frame
+    after the last sequence it saw, and everything it skipped is counted as
+    dropped. Frames older than max_age are refused as stale. Each sequence is
+    looked at once: after a refusal the next call waits for a newer frame
+    instead of re-examining (and re-counting) the same one.
+    """
+
+    def __init__(self, cam_id: str, url: str, ring_size: int = 3, max_age: float = 1.0, fps: Optional[int] = None):
+        self.cam_id = cam_id
+        self.url = url
+        self.max_age = max_age
+        self.fps = fps
+        self._ring: deque = deque(maxlen=max(1, ring_size))
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._seq = 0
+        self._last_seen = 0
+        self._cap: Any = None
+        self._thread = threading.Thread(target=self._loop, name=f"grab-{cam_id}", daemon=True)
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.stale_dropped = 0
+        self.reconnects = 0
+        self.last_capture_ts: Optional[float] = None
+
+    def start(self) -> "_FrameGrabber":
+        with _grab_threads_lock:
+            _grab_threads.setdefault(self.cam_id, []).append(self._thread)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        # OpenCV captures are released by their own thread (releasing while
+        # read() is in flight is not safe with every backend); an ffmpeg
+        # pipe can be killed from here, which unblocks the pending read
+        cap = self._cap
+        if isinstance(cap, _FfmpegFanoutCapture):
+            cap.release()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _loop(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            if self._cap is None or not self._cap.isOpened():
+                try:
+                    self._cap = _open_capture(self.url, self.cam_id, fps=self.fps)
+                except Exception:
+                    self._cap = None
+                if self._cap is None or not self._cap.isOpened():
+                    self._stop.wait(backoff)
+                    backoff = min(backoff * 2, 30.0)
+                    continue
+                backoff = 1.0
+            started = time.perf_counter()
+            ok, frame = self._cap.read()
+            if not ok:
+                # try reopen stream
+                try:
+                    self._cap.release()
+                except Exception:
+                    pass
+                self._cap = None
+                self.reconnects += 1
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            _observe_stage(self.cam_id, 'capture', started)
+            ts = time.time()
+            with self._cond:
+                self._seq += 1
+                self._ring.append((self._seq, ts, frame))
+                self.frames_captured += 1
+                self.last_capture_ts = ts
+                self._cond.notify_all()
+        if self._cap is not None:
+            try:
+                self._cap.release()
+            except Exception:
+                pass
+            self._cap = None
+
+    def latest(self, after_seq: int, timeout: float = 1.0) -> Optional[tuple]:
+        """Newest (seq, ts, frame) newer than after_seq, or None on timeout/stale."""
+        with self._cond:
+            seen = max(after_seq, self._last_seen)
+            self._cond.wait_for(lambda: self._seq > seen or self._stop.is_set(), timeout)
+            if not self._ring or self._ring[-1][0] <= seen:
+                return None
+            seq, ts, frame = self._ring[-1]
+            self._last_seen = seq
+            if seen:
+                self.frames_dropped += max(0, seq - seen - 1)
+            if time.time() - ts > self.max_age:
+                self.stale_dropped += 1
+                return None
+        return seq, ts, frame
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "framesCaptured": self.frames_captured,
+            "framesDropped": self.frames_dropped,
+            "staleDropped": self.stale_dropped,
+            "reconnects": self.reconnects,
+            "lastCaptureAgoSec": (time.time() - self.last_capture_ts) if self.last_capture_ts else None,
+        }
+
+
+class _FrameViews:
+    """Derived images of one captured frame, each computed lazily and at most once.
+
+    gray is taken from the frame as captured; rgb is taken on first use, which
+    in the pipeline is after the privacy blur has been applied in place.
+    """
+
+    __slots__ = ('frame', '_gray', '_blurred_gray', '_rgb', '_pose_result', '_pose_done')
+
+    def __init__(self, frame: Any):
+        self.frame = frame
+        self._gray = None
+        self._blurred_gray = None
+        self._rgb = None
+        self._pose_result = None
+        self._pose_done = False
+
+    @property
+    def gray(self) -> Any:
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def blurred_gray(self) -> Any:
+        if self._blurred_gray is None:
+            self._blurred_gray = cv2.GaussianBlur(self.gray, (9, 9), 0)
+        return self._blurred_gray
+
+    @property
+    def rgb(self) -> Any:
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    def pose(self, pose_model: Any) -> Any:
+        if not self._pose_done:
+            self._pose_done = True
+            self._pose_result = pose_model.process(self.rgb)
+        return self._pose_result
+
+
+_face_cascade = None
+_face_cascade_lock = threading.Lock()
+
+
+def _get_face_cascade() -> Any:
+    """Load the Haar face cascade once per process."""
+    global _face_cascade
+    with _face_cascade_lock:
+        if _face_cascade is None:
+            # Use default haarcascade if available in cv2 data
+            cascade_path = getattr(cv2, 'data', None)
+            if cascade_path and hasattr(cascade_path, 'haarcascades'):
+                cascade_file = cascade_path.haarcascades + 'haarcascade_frontalface_default.xml'
+            else:
+                cascade_file = (Path(cv2.__file__).resolve().parent / 'data' / 'haarcascade_frontalface_default.xml').as_posix()  # type: ignore
+            cascade = cv2.CascadeClassifier(cascade_file)
+            if cascade.empty():
+                raise RuntimeError(f"face cascade not loadable: {cascade_file}")
+            _face_cascade = cascade
+        return _face_cascade
+
+
+class _FaceBlurEngine:
+    """Per-camera privacy blur.
+
+    The cascade runs on a downscaled gray plane every `detect_every` frames;
+    in between, each face box is re-located by template matching in a small
+    search window around its last position. Boxes are padded by `margin` and
+    kept for `hold` detection cycles after the detector last saw them, so a
+    single missed detection never unblurs a face. Tracking cannot find a face
+    that just entered the frame, so the cascade also runs early whenever more
+    than `change_ratio` of a small thumbnail changed outside the tracked
+    boxes. Any failure blurs the whole frame instead.
+    """
+
+    def __init__(self, detect_every: int = 5, detect_width: int = 480, margin: float = 0.25, hold: int = 2,
+                 change_ratio: float = 0.02, thumb_width: int = 64):
+        self.detect_every = max(1, detect_every)
+        self.detect_width = max(64, detect_width)
+        self.margin = margin
+        self.hold = max(0, hold)
+        self.change_ratio = max(0.0, change_ratio)
+        self.thumb_width = max(8, thumb_width)
+        self._frame_no = 0
+        self._thumb = None
+        # each track: [x, y, w, h, template, misses] in downscaled coordinates
+        self._tracks: List[list] = []
+        self.detections = 0
+        self.forced_detections = 0
+        self.failsafe_blurs = 0
+
+    def _changed(self, small: Any) -> bool:
+        """True when the scene outside the tracked faces changed since the previous frame."""
+        sh, sw = small.shape[:2]
+        tw = min(self.thumb_width, sw)
+        th = max(1, int(round(sh * tw / float(sw))))
+        thumb = cv2.resize(small, (tw, th), interpolation=cv2.INTER_AREA)
+        prev, self._thumb = self._thumb, thumb
+        if prev is None or prev.shape != thumb.shape:
+            return prev is not None
+        diff = cv2.absdiff(thumb, prev)
+        k = tw / float(sw)
+        # tracked faces may move within their search window without forcing a detection
+        for (x, y, w, h, _tmpl, _misses) in self._tracks:
+            diff[max(0, int((y - h // 2) * k)):int((y + h + h // 2) * k) + 1,
+                 max(0, int((x - w // 2) * k)):int((x + w + w // 2) * k) + 1] = 0
+        return np.count_nonzero(diff > 25) > self.change_ratio * diff.size
+
+    def _detect(self, small: Any) -> None:
+        faces = _get_face_cascade().detectMultiScale(small, 1.2, 5)
+        self.detections += 1
+        fresh = []
+        for (x, y, w, h) in faces:
+            fresh.append([int(x), int(y), int(w), int(h), small[y:y+h, x:x+w].copy(), 0])
+        # keep unmatched old tracks alive for `hold` cycles
+        for tr in self._tracks:
+            if not any(self._overlaps(tr, f) for f in fresh) and tr[5] < self.hold:
+                tr[5] += 1
+                fresh.append(tr)
+        self._tracks = fresh
+
+    @staticmethod
+    def _overlaps(a: list, b: list) -> bool:
+        return not (a[0] + a[2] < b[0] or b[0] + b[2] < a[0] or a[1] + a[3] < b[1] or b[1] + b[3] < a[1])
+
+    def _track(self, small: Any) -> None:
+        sh, sw = small.shape[:2]
+        for tr in self._tracks:
+            x, y, w, h, tmpl = tr[0], tr[1], tr[2], tr[3], tr[4]
+            x0, y0 = max(0, x - w // 2), max(0, y - h // 2)
+            x1, y1 = min(sw, x + w + w // 2), min(sh, y + h + h // 2)
+            window = small[y0:y1, x0:x1]
+            if window.shape[0] < h or window.shape[1] < w:
+                continue
+            res = cv2.matchTemplate(window, tmpl, cv2.TM_CCOEFF_NORMED)
+            _, score, _, loc = cv2.minMaxLoc(res)
+            if score > 0.5:
+                tr[0], tr[1] = x0 + loc[0], y0 + loc[1]
+
+    def apply(self, frame: Any, gray: Any) -> int:
+        """Blur faces in `frame` in place; returns the number of blurred regions."""
+        try:
+            fh, fw = gray.shape[:2]
+            scale = min(1.0, self.detect_width / float(fw))
+            small = cv2.resize(gray, (int(fw * scale), int(fh * scale)), interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+            changed = self._changed(small)
+            if self._frame_no % self.detect_every == 0:
+                self._detect(small)
+            elif changed:
+                self.forced_detections += 1
+                self._detect(small)
+            elif self._tracks:
+                self._track(small)
+            self._frame_no += 1
+            inv = 1.0 / scale
+            for (x, y, w, h, _tmpl, _misses) in self._tracks:
+                pad_w, pad_h = int(w * self.margin), int(h * self.margin)
+                x0 = max(0, int((x - pad_w) * inv))
+                y0 = max(0, int((y - pad_h) * inv))
+                x1 = min(fw, int((x + w + pad_w) * inv))
+                y1 = min(fh, int((y + h + pad_h) * inv))
+                if x1 > x0 and y1 > y0:
+                    frame[y0:y1, x0:x1] = cv2.GaussianBlur(frame[y0:y1, x0:x1], (31, 31), 0)
+            return len(self._tracks)
+        except Exception:
+            # fail closed: never publish an unblurred frame while blur is on
+            self.failsafe_blurs += 1
+            h, w = frame.shape[:2]
+            tiny = cv2.resize(frame, (max(1, w // 32), max(1, h // 32)), interpolation=cv2.INTER_AREA)
+            frame[:] = cv2.resize(tiny, (w, h), interpolation=cv2.INTER_NEAREST)
+            self._tracks = []
+            return -1
+
+
+def _camera_config(cam_id: str, section: str) -> Dict[str, Any]:
+    """Global `section` settings overlaid with `cameras.<cam_id>.<section>`."""
+    cfg = get_config()
+    merged = dict(cfg.get(section, {}) or {})
+    merged.update((cfg.get('cameras', {}) or {}).get(cam_id, {}).get(section, {}) or {})
+    return merged
+
+
+class _MotionEngine:
+    """Per-camera motion detection on a downscaled plane.
+
+    Frames are compared against a running-average background rather than the
+    previous frame. Pixels are counted with countNonZero into reused buffers.
+    The trigger is a fraction of the (zone-masked) area, so it does not depend
+    on camera resolution. Zones are polygons in normalised 0..1 coordinates:
+    `include` limits detection to those areas (whole frame when empty),
+    `exclude` masks areas such as a TV or a window with curtains.
+    """
+
+    def __init__(self, width: int = 320, alpha: float = 0.05, pixel_threshold: int = 25,
+                 min_area_ratio: float = 0.013, include: Optional[list] = None, exclude: Optional[list] = None):
+        self.width = max(32, width)
+        self.alpha = alpha
+        self.pixel_threshold = pixel_threshold
+        self.min_area_ratio = min_area_ratio
+        self.include = [list(z) for z in (include or [])]
+        self.exclude = [list(z) for z in (exclude or [])]
+        self._size: Optional[tuple] = None
+        self._background = None
+        self._background_u8 = None
+        self._small = None
+        self._diff = None
+        self._mask = None
+        self._zone_mask = None
+        self._zone_area = 0
+
+    @classmethod
+    def from_config(cls, cam_id: str) -> "_MotionEngine":
+        mc = _camera_config(cam_id, 'motion')
+        return cls(
+            width=int(mc.get('width', 320)),
+            alpha=float(mc.get('background_alpha', 0.05)),
+            pixel_threshold=int(mc.get('pixel_threshold', 25)),
+            min_area_ratio=float(mc.get('min_area_ratio', 0.013)),
+            include=mc.get('include_zones'),
+            exclude=mc.get('exclude_zones'),
+        )
+
+    def _allocate(self, w: int, h: int) -> None:
+        self._size = (w, h)
+        self._background = None
+        self._small = np.empty((h, w), dtype=np.uint8)
+        self._background_u8 = np.empty((h, w), dtype=np.uint8)
+        self._diff = np.empty((h, w), dtype=np.uint8)
+        self._mask = np.empty((h, w), dtype=np.uint8)
+        self._zone_mask = None
+        self._zone_area = w * h
+        if self.include or self.exclude:
+            zone = np.full((h, w), 0 if self.include else 255, dtype=np.uint8)
+            scale = np.array([w, h], dtype=np.float32)
+            for poly in self.include:
+                cv2.fillPoly(zone, [(np.array(poly, dtype=np.float32) * scale).astype(np.int32)], 255)
+            for poly in self.exclude:
+                cv2.fillPoly(zone, [(np.array(poly, dtype=np.float32) * scale).astype(np.int32)], 0)
+            self._zone_mask = zone
+            self._zone_area = max(1, cv2.countNonZero(zone))
+
+    def process(self, gray: Any) -> Dict[str, Any]:
+        """Returns {"motion", "ratio", "pixels", "boxes"}; pixels/boxes are in full-frame units."""
+        fh, fw = gray.shape[:2]
+        w = min(self.width, fw)
+        h = max(1, int(round(fh * w / float(fw))))
+        if self._size != (w, h):
+            self._allocate(w, h)
+        cv2.resize(gray, (w, h), dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.GaussianBlur(self._small, (5, 5), 0, dst=self._small)
+        if self._background is None:
+            self._background = self._small.astype(np.float32)
+            return {"motion": False, "ratio": 0.0, "pixels": 0, "boxes": []}
+        cv2.convertScaleAbs(self._background, dst=self._background_u8)
+        cv2.absdiff(self._small, self._background_u8, dst=self._diff)
+        cv2.threshold(self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._mask)
+        if self._zone_mask is not None:
+            cv2.bitwise_and(self._mask, self._zone_mask, dst=self._mask)
+        count = cv2.countNonZero(self._mask)
+        cv2.accumulateWeighted(self._small, self._background, self.alpha)
+        ratio = count / float(self._zone_area)
+        motion = ratio > self.min_area_ratio
+        boxes: List[List[int]] = []
+        if motion:
+            sx, sy = fw / float(w), fh / float(h)
+            contours, _ = cv2.findContours(cv2.dilate(self._mask, None, iterations=2), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            min_box = 0.1 * self.min_area_ratio * w * h
+            for c in contours:
+                x, y, bw, bh = cv2.boundingRect(c)
+                if bw * bh >= min_box:
+                    boxes.append([int(x * sx), int(y * sy), int(bw * sx), int(bh * sy)])
+        return {
+            "motion": motion,
+            "ratio": ratio,
+            "pixels": int(count * (fw * fh) / float(w * h)),
+            "boxes": boxes,
+        }
+
+
+class _TemporalFallDetector:
+    """Fall decision from a short history of pose landmarks.
+
+    Each pose result becomes one row of a fixed-size ring buffer
+    (t, body-centre y, hip-minus-nose y, torso dx, torso dy). A fall needs a
+    fast downward drop of the body centre (velocity and acceleration in
+    torso lengths per second), a drop of a meaningful fraction of the torso,
+    stillness afterwards and a lying posture; the four scores combine into
+    one confidence. Firing clears the history so one event fires once.
+    """
+
+    # MediaPipe pose indices: nose, left/right shoulder, left/right hip
+    LANDMARKS = (0, 11, 12, 23, 24)
+
+    def __init__(self, capacity: int = 64, window: float = 4.0, min_drop: float = 0.5, velocity_ref: float = 2.0,
+                 accel_ref: float = 10.0, still_sec: float = 1.0, still_velocity: float = 0.3, threshold: float = 0.6,
+                 cooldown: float = 10.0):
+        self.capacity = max(4, capacity)
+        self.window = window
+        self.min_drop = min_drop
+        self.velocity_ref = velocity_ref
+        self.accel_ref = accel_ref
+        self.still_sec = still_sec
+        self.still_velocity = still_velocity
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._buf = np.zeros((self.capacity, 5), dtype=np.float64)
+        self._next = 0
+        self._count = 0
+        self.last_fire = float('-inf')
+        self.fired = 0
+
+    @classmethod
+    def from_config(cls, cam_id: str) -> "_TemporalFallDetector":
+        fc = _camera_config(cam_id, 'fall_detection')
+        return cls(
+            capacity=int(fc.get('capacity', 64)),
+            window=float(fc.get('window_sec', 4.0)),
+            min_drop=float(fc.get('min_drop', 0.5)),
+            velocity_ref=float(fc.get('velocity_ref', 2.0)),
+            accel_ref=float(fc.get('accel_ref', 10.0)),
+            still_sec=float(fc.get('still_sec', 1.0)),
+            still_velocity=float(fc.get('still_velocity', 0.3)),
+            threshold=float(fc.get('threshold', 0.6)),
+            cooldown=float(fc.get('cooldown_sec', 10.0)),
+        )
+
+    def reset(self) -> None:
+        self._next = 0
+        self._count = 0
+
+    def push(self, ts: float, landmarks: Any) -> None:
+        pts = np.array([(landmarks[i].x, landmarks[i].y) for i in self.LANDMARKS], dtype=np.float64)
+        self.push_points(ts, pts)
+
+    def push_points(self, ts: float, pts: Any) -> None:
+        """Add one pose sample; `pts` is a (5, 2) array of normalized x, y in LANDMARKS order."""
+        if self._count and ts - self._buf[(self._next - 1) % self.capacity, 0] > self.window:
+            # the person was out of view for a whole window: old samples say nothing
+            self.reset()
+        shoulders = pts[1:3].mean(axis=0)
+        hips = pts[3:5].mean(axis=0)
+        row = self._buf[self._next]
+        row[0] = ts
+        row[1] = (shoulders[1] + hips[1]) / 2.0
+        row[2] = hips[1] - pts[0, 1]
+        row[3] = hips[0] - shoulders[0]
+        row[4] = hips[1] - shoulders[1]
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self.capacity, self._count + 1)
+
+    def _history(self) -> Any:
+        order = (self._next - self._count + np.arange(self._count)) % self.capacity
+        rows = self._buf[order]
+        return rows[rows[:, 0] >= rows[-1, 0] - self.window]
+
+    def evaluate(self, now: Optional[float] = None) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"fall": False, "confidence": 0.0}
+        if self._count < 4:
+            return result
+        rows = self._history()
+        if len(rows) < 4:
+            return result
+        t, y, head_hip, dx, dy = rows.T
+        torso = max(float(np.median(np.hypot(dx, dy))), 1e-3)
+        dt = np.maximum(np.diff(t), 1e-3)
+        # image y grows downward: positive velocity = moving towards the floor
+        v = np.diff(y) / dt / torso
+        a = np.diff(v) / dt[1:]
+        k = int(np.argmax(v))
+        v_peak = float(v[k])
+        a_peak = float(a[max(0, k - 1):k + 1].max()) if a.size else 0.0
+        drop = float((y[k + 1:].mean() - y[:k + 1].min()) / torso)
+        post_v = v[k + 1:]
+        still_for = float(t[-1] - t[k + 1])
+        stillness = float(np.clip(1.0 - np.abs(post_v).mean() / self.still_velocity, 0.0, 1.0)) if post_v.size and still_for >= self.still_sec else 0.0
+        tilt = float(np.degrees(np.arctan2(abs(dx[-1]), abs(dy[-1]))))
+        posture = max(float(np.clip((tilt - 30.0) / 40.0, 0.0, 1.0)), float(np.clip((0.5 - head_hip[-1] / torso) / 0.5, 0.0, 1.0)))
+        scores = np.array([v_peak / self.velocity_ref, a_peak / self.accel_ref, stillness, posture])
+        confidence = float(np.clip(scores, 0.0, 1.0) @ np.array([0.35, 0.15, 0.25, 0.25]))
+        result.update({
+            "confidence": round(confidence, 3),
+            "dropVelocity": round(v_peak, 3),
+            "acceleration": round(a_peak, 3),
+            "drop": round(drop, 3),
+            "stillSec": round(still_for, 2),
+            "tiltDeg": round(tilt, 1),
+        })
+        now = t[-1] if now is None else now
+        # a fall is only confirmed once the person has stayed down; that wait
+        # is what filters out sitting, bending and quick crouches
+        if drop >= self.min_drop and stillness >= 0.5 and confidence >= self.threshold and now - self.last_fire > self.cooldown:
+            result["fall"] = True
+            self.last_fire = now
+            self.fired += 1
+            self.reset()
+        return result
+
+
+class _StageGate:
+    """Per-camera cascade: an expensive stage runs only while a cheaper one vouches for it.
+
+    Signals ('motion', 'person', 'pose') are stamped when a stage finds
+    something. A stage runs if any signal in its `when` list fired within
+    `hold_sec`, or if `keepalive_sec` (0 = never) passed since it last ran,
+    so a still room is re-checked occasionally instead of never.
+    """
+
+    DEFAULT_RULES: Dict[str, Dict[str, Any]] = {
+        'yolo': {'when': ['motion'], 'hold_sec': 2.0, 'keepalive_sec': 60.0},
+        'pose': {'when': ['motion', 'person'], 'hold_sec': 5.0, 'keepalive_sec': 30.0},
+        'hands': {'when': ['person', 'pose'], 'hold_sec': 5.0, 'keepalive_sec': 0.0},
+        'fall_model': {'when': ['motion', 'pose'], 'hold_sec': 5.0, 'keepalive_sec': 30.0},
+    }
+
+    def __init__(self, rules: Optional[Mapping[str, Any]] = None, enabled: bool = True):
+        self.enabled = enabled
+        self.rules: Dict[str, Dict[str, Any]] = {}
+        for stage, default in self.DEFAULT_RULES.items():
+            rule = dict(default)
+            rule.update(dict((rules or {}).get(stage) or {}))
+            rule['when'] = [str(w) for w in (rule.get('when') or [])]
+            self.rules[stage] = rule
+        self._signals: Dict[str, float] = {}
+        self._last_run: Dict[str, float] = {}
+        self.runs: Dict[str, int] = {stage: 0 for stage in self.rules}
+        self.skips: Dict[str, int] = {stage: 0 for stage in self.rules}
+        self.reasons: Dict[str, Optional[str]] = {stage: None for stage in self.rules}
+
+    @classmethod
+    def from_config(cls, cam_id: str) -> "_StageGate":
+        gc = _camera_config(cam_id, 'gating')
+        return cls({k: v for k, v in gc.items() if isinstance(v, Mapping)}, enabled=bool(gc.get('enabled', True)))
+
+    def signal(self, name: str, now: float) -> None:
+        self._signals[name] = now
+
+    def should_run(self, stage: str, now: float) -> bool:
+        rule = self.rules.get(stage)
+        reason = None
+        if not self.enabled or rule is None:
+            reason = 'ungated'
+        else:
+            for trigger in rule['when']:
+                if now - self._signals.get(trigger, float('-inf')) <= rule['hold_sec']:
+                    reason = trigger
+                    break
+            keepalive = float(rule.get('keepalive_sec') or 0.0)
+            if reason is None and keepalive > 0 and now - self._last_run.get(stage, float('-inf')) >= keepalive:
+                reason = 'keepalive'
+        if stage in self.runs:
+            if reason is None:
+                self.skips[stage] += 1
+            else:
+                self.runs[stage] += 1
+                self.reasons[stage] = reason
+        if reason is not None:
+            self._last_run[stage] = now
+        return reason is not None
+
+    def became_active(self, stage: str, now: float, gap: float) -> bool:
+        """True if `stage` had not run for `gap` seconds before now (call before should_run)."""
+        return now - self._last_run.get(stage, float('-inf')) > gap
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            stage: {"runs": self.runs[stage], "skips": self.skips[stage], "lastReason": self.reasons[stage]}
+            for stage in self.rules
+        }
+
+
+_stage_gates: Dict[str, _StageGate] = {}
+
+
+class _FrameScheduler:
+    """Process-wide analysis-rate scheduler.
+
+    Every camera reports the wall time its last frame took and whether it
+    saw motion or raised an alert. Every `rebalance_every` seconds rates are
+    recomputed: cameras with a recent alert or motion ask for their full
+    rate, idle ones drop to `idle_fps`. If the summed demand (rate × cost per
+    frame) exceeds `cpu_budget` cores, idle cameras are cut to `min_fps`
+    first, then active ones are scaled down proportionally; cameras with a
+    recent alert are never throttled below full rate.
+    """
+
+    def __init__(self, cpu_budget: float = 0.75, idle_fps: float = 1.0, min_fps: float = 0.2,
+                 active_window: float = 30.0, alert_window: float = 120.0, rebalance_every: float = 2.0):
+        self.cpu_budget = cpu_budget
+        self.idle_fps = idle_fps
+        self.min_fps = min_fps
+        self.active_window = active_window
+        self.alert_window = alert_window
+        self.rebalance_every = rebalance_every
+        self.budget_share = 1.0
+        self._lock = threading.Lock()
+        self._cams: Dict[str, Dict[str, Any]] = {}
+        self._rebalanced_at = 0.0
+        self.decisions: deque = deque(maxlen=100)
+
+    @classmethod
+    def from_config(cls) -> "_FrameScheduler":
+        sc = get_config().get('scheduler', {}) or {}
+        return cls(
+            cpu_budget=float(sc.get('cpu_budget', 0.75)),
+            idle_fps=float(sc.get('idle_fps', 1.0)),
+            min_fps=float(sc.get('min_fps', 0.2)),
+            active_window=float(sc.get('active_window_sec', 30.0)),
+            alert_window=float(sc.get('alert_window_sec', 120.0)),
+        )
+
+    def budget_cores(self) -> float:
+        return (os.cpu_count() or 1) * self.cpu_budget * self.budget_share
+
+    def register(self, cam_id: str, max_fps: float) -> None:
+        with self._lock:
+            self._cams[cam_id] = {
+                "maxFps": float(max_fps), "rate": float(max_fps), "costSec": 0.0,
+                "lastMotion": time.time(), "lastAlert": 0.0, "state": "active",
+            }
+
+    def unregister(self, cam_id: str) -> None:
+        with self._lock:
+            self._cams.pop(cam_id, None)
+
+    def report(self, cam_id: str, cost_sec: float, motion: bool, alert: bool) -> None:
+        with self._lock:
+            c = self._cams.get(cam_id)
+            if c is None:
+                return
+            now = time.time()
+            c["costSec"] = 0.8 * c["costSec"] + 0.2 * cost_sec if c["costSec"] else cost_sec
+            if motion:
+                c["lastMotion"] = now
+            if alert:
+                c["lastAlert"] = now
+                if c["state"] != "alert":
+                    # react to alerts immediately rather than at the next rebalance
+                    self._rebalanced_at = 0.0
+            if now - self._rebalanced_at >= self.rebalance_every:
+                self._rebalance(now)
+
+    def interval(self, cam_id: str) -> float:
+        with self._lock:
+            c = self._cams.get(cam_id)
+            return 1.0 / c["rate"] if c and c["rate"] > 0 else 1.0
+
+    def _rebalance(self, now: float) -> None:
+        """Recompute every camera's rate; called with the lock held."""
+        self._rebalanced_at = now
+        desired: Dict[str, float] = {}
+        states: Dict[str, str] = {}
+        for cam_id, c in self._cams.items():
+            if now - c["lastAlert"] < self.alert_window:
+                states[cam_id], desired[cam_id] = "alert", c["maxFps"]
+            elif now - c["lastMotion"] < self.active_window:
+                states[cam_id], desired[cam_id] = "active", c["maxFps"]
+            else:
+                states[cam_id], desired[cam_id] = "idle", min(self.idle_fps, c["maxFps"])
+        budget = self.budget_cores()
+        demand = sum(desired[k] * self._cams[k]["costSec"] for k in desired)
+        if demand > budget:
+            for cam_id in desired:
+                if states[cam_id] == "idle":
+                    desired[cam_id] = min(desired[cam_id], self.min_fps)
+            fixed = sum(desired[k] * self._cams[k]["costSec"] for k in desired if states[k] != "active")
+            active = sum(desired[k] * self._cams[k]["costSec"] for k in desired if states[k] == "active")
+            if active > 0 and fixed + active > budget:
+                scale = max(0.0, budget - fixed) / active
+                for cam_id in desired:
+                    if states[cam_id] == "active":
+                        desired[cam_id] = max(self.min_fps, desired[cam_id] * scale)
+        for cam_id, rate in desired.items():
+            c = self._cams[cam_id]
+            if states[cam_id] != c["state"] or abs(rate - c["rate"]) > 0.1 * max(c["rate"], 0.1):
+                self.decisions.append({
+                    "ts": now, "camera": cam_id, "from": round(c["rate"], 2), "to": round(rate, 2),
+                    "state": states[cam_id], "demandCores": round(demand, 3), "budgetCores": round(budget, 3),
+                })
+            c["rate"], c["state"] = rate, states[cam_id]
+
+    def camera_info(self, cam_id: str) -> Optional[Dict[str, Any]]:
+        c = self._cams.get(cam_id)
+        if c is None:
+            return None
+        return {"rate": round(c["rate"], 2), "maxFps": c["maxFps"], "state": c["state"], "costMs": round(c["costSec"] * 1000.0, 2)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cams = {cam_id: self.camera_info(cam_id) for cam_id in self._cams}
+            demand = sum(c["rate"] * c["costSec"] for c in self._cams.values())
+        return {
+            "budgetCores": round(self.budget_cores(), 3),
+            "demandCores": round(demand, 3),
+            "cameras": cams,
+            "decisions": list(self.decisions)[-20:],
+        }
+
+
+_scheduler = _FrameScheduler.from_config()
+
+
+def _process_stream(cam_id: str, url: str, fps: int = 10, generation: Optional[int] = None,
+                    stop: Optional[threading.Event] = None):
+    if not cv2:
+        return
+    # set by the supervisor when it retires this worker; also wakes the pacing sleep
+    stop = stop or threading.Event()
+    launched = time.time()
+    cadence = _camera_config(cam_id, 'pipeline')
+    pose_every = max(1, int(cadence.get('pose_every', 5)))
+    hands_every = max(1, int(cadence.get('hands_every', 3)))
+    pose = None
+    hands = None
+    onnx_engine = None
+    onnx_last_fire = 0.0
+    onnx_debounce = 3.0
+    yolo_engine = None
+    yolo_last_infer = 0.0
+    yolo_interval = float(cadence.get('yolo_interval_sec', 0.5))  # seconds between YOLO inferences
+    yolo_person_conf = 0.0
+    if _toggle(cam_id, 'pose_enabled') and mp:
+        try:
+            pose = mp.solutions.pose.Pose(static_image_mode=False, model_complexity=0, enable_segmentation=False)
+        except Exception:
+            pose = None
+        try:
+            hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        except Exception:
+            hands = None
+    # Optional ONNX fall model
+    model_path = os.getenv('FALL_ONNX_MODEL')
+    fall_clip: Optional[_FallClipBuffer] = None
+    onnx_threshold = float((get_config().get('fall_model', {}) or {}).get('threshold', 0.5))
+    if _toggle(cam_id, 'onnx_enabled') and model_path:
+        onnx_engine = _get_inference_engine('onnx', model_path)
+        if onnx_engine is not None and onnx_engine.model is not None:
+            fall_clip = onnx_engine.model.clip_buffer()
+
+    # Optional YOLO person detector (requires ultralytics + weights available)
+    yolo_weights = os.getenv('YOLO_MODEL', 'yolov8n.pt')
+    yolo_enabled = _toggle(cam_id, 'yolo_enabled')
+    yolo_min_conf = float(os.getenv('YOLO_MIN_CONF', '0.25'))
+    if yolo_enabled:
+        yolo_engine = _get_inference_engine('yolo', yolo_weights)
+    face_blur: Optional[_FaceBlurEngine] = None
+    motion_engine = _MotionEngine.from_config(cam_id)
+    frame_count = 0
+    fall_detector = _TemporalFallDetector.from_config(cam_id) if np is not None else None
+    gate = _StageGate.from_config(cam_id)
+    _stage_gates[cam_id] = gate
+    # a fall clip spanning more than ~1 s of skipped frames is not a clip
+    onnx_gap = 1.0
+    grabber = _FrameGrabber(
+        cam_id,
+        url,
+        ring_size=int(os.getenv('CAPTURE_RING_SIZE', '3')),
+        max_age=float(os.getenv('CAPTURE_MAX_FRAME_AGE', '1.0')),
+        fps=fps,
+    ).start()
+    _frame_grabbers[cam_id] = grabber
+    stats = _pipeline_stats.setdefault(cam_id, {"framesAnalyzed": 0, "latencyMs": 0.0, "avgLatencyMs": 0.0})
+    # stream open + model loads + first analysis, per (re)start
+    stats["firstFrameSec"] = None
+    stats["firstAnalysedAt"] = None
+    _scheduler.register(cam_id, fps)
+    last_seq = 0
+    prev_analyzed_ts = 0.0
+    engines_retry_at = launched + _INFERENCE_RETRY_BASE_SEC
+    # a supervised worker also exits as soon as the supervisor hands the camera
+    # to a newer generation, even if it never observed a stop flag
+    while not stop.is_set() and not _stop_flags.get(cam_id, False) \
+            and (generation is None or _supervisor.generation(cam_id) == generation):
+        item = grabber.latest(last_seq, timeout=1.0)
+        if item is None:
+            continue
+        last_seq, captured_ts, frame = item
+        now = time.time()
+        if now >= engines_retry_at:
+            # pick up models that failed to load at start (weights copied in later, etc.);
+            # _get_inference_engine applies its own backoff between real attempts;
+            # a load already running for another camera is not waited on here
+            engines_retry_at = now + _INFERENCE_RETRY_BASE_SEC
+            if yolo_engine is None and _toggle(cam_id, 'yolo_enabled'):
+                yolo_engine = _get_inference_engine('yolo', yolo_weights, wait=0)
+            if onnx_engine is None and model_path and _toggle(cam_id, 'onnx_enabled'):
+                onnx_engine = _get_inference_engine('onnx', model_path, wait=0)
+                if onnx_engine is not None and onnx_engine.model is not None:
+                    fall_clip = onnx_engine.model.clip_buffer()
+        st = _camera_state.get(cam_id)
+        motion = False
+        alerted = False
+        sample: Dict[str, Any] = {}
+        views = _FrameViews(frame)
+        # Face blurring if enabled
+        cfg = get_config()
+        try:
+            blur_enabled = bool(cfg.get('privacy', {}).get('face_blur', False)) or _toggle(cam_id, 'face_blur')
+        except Exception:
+            blur_enabled = _toggle(cam_id, 'face_blur')
+        if blur_enabled:
+            if face_blur is None:
+                privacy = cfg.get('privacy', {})
+                face_blur = _FaceBlurEngine(
+                    detect_every=int(privacy.get('face_blur_detect_every', 5)),
+                    detect_width=int(privacy.get('face_blur_detect_width', 480)),
+                    change_ratio=float(privacy.get('face_blur_change_ratio', 0.02)),
+                )
+            started = time.perf_counter()
+            face_blur.apply(frame, views.gray)
+            _observe_stage(cam_id, 'blur', started)
+        _publish_frame(cam_id, frame)
+        if st:
+            st.last_frame_ts = captured_ts
+            _last_health[cam_id] = now
+        try:
+            started = time.perf_counter()
+            motion_result = motion_engine.process(views.gray)
+            _observe_stage(cam_id, 'motion', started)
+            motion = motion_result["motion"]
+            motion_pixels = motion_result["pixels"]
+            sample["active"] = 1.0 if motion else 0.0
+            sample["motionRatio"] = motion_result["ratio"]
+            if st:
+                st.motion = motion
+                # naive baseline: motion suggests activity; fall decided via pose/onnx below
+                st.fall = False
+
+                if motion:
+                    gate.signal('motion', now)
+
+                # YOLO person detection (event emission with confidence)
+                person_event_emitted = False
+                if yolo_engine is not None and _toggle(cam_id, 'yolo_enabled') and (now - yolo_last_infer) > yolo_interval \
+                        and gate.should_run('yolo', now):
+                    started = time.perf_counter()
+                    try:
+                        yolo_last_infer = now
+                        conf = float(yolo_engine.infer(frame))
+                        yolo_person_conf = conf
+                        sample["personConf"] = conf
+                        if conf >= yolo_min_conf:
+                            gate.signal('person', now)
+                            _event_tracker.observe(cam_id, 'person', {"confidence": float(conf)})
+                            person_event_emitted = True
+                    except Exception:
+                        pass
+                    _observe_stage(cam_id, 'yolo', started)
+
+                # MediaPipe pose every pose_every frames feeds the temporal fall detector
+                fall_decision: Optional[Dict[str, Any]] = None
+                if pose is not None and fall_detector is not None and _toggle(cam_id, 'pose_enabled') and frame_count % pose_every == 0 \
+                        and gate.should_run('pose', now):
+                    started = time.perf_counter()
+                    try:
+                        res = views.pose(pose)
+                        if res and res.pose_landmarks:
+                            gate.signal('pose', now)
+                            fall_detector.push(captured_ts, res.pose_landmarks.landmark)
+                            decision = fall_detector.evaluate()
+                            sample["fallScore"] = decision["confidence"]
+                            if decision["fall"]:
+                                st.fall = True
+                                fall_decision = decision
+                    except Exception:
+                        pass
+                    _observe_stage(cam_id, 'pose', started)
+
+                frame_count += 1
+                # MediaPipe Hands gesture detection (simple heuristics)
+                gesture_name = None
+                if hands is not None and _toggle(cam_id, 'hands_enabled') and frame_count % hands_every == 0 \
+                        and gate.should_run('hands', now):
+                    started = time.perf_counter()
+                    try:
+                        res_h = hands.process(views.rgb)
+                        if res_h and res_h.multi_hand_landmarks:
+                            # Heuristic: detect open palm vs closed (thumb to index distance)
+                            for hand_lms in res_h.multi_hand_landmarks:
+                                # landmarks indices per MediaPipe Hands
+                                # 4: thumb_tip, 8: index_tip, 12: middle_tip
+                                t = hand_lms.landmark[4]
+                                i = hand_lms.landmark[8]
+                                m = hand_lms.landmark[12]
+                                # compute pairwise distances in normalized coords
+                                ti = ((t.x - i.x)**2 + (t.y - i.y)**2) ** 0.5
+                                im = ((i.x - m.x)**2 + (i.y - m.y)**2) ** 0.5
+                                if ti > 0.12 and im > 0.10:
+                                    gesture_name = 'open_palm'
+                                    break
+                                elif ti < 0.05:
+                                    gesture_name = 'pinch_or_fist'
+                                    break
+                    except Exception:
+                        gesture_name = None
+                    _observe_stage(cam_id, 'hands', started)
+
+                # ONNX fall model last in the cascade; the clip window restarts
+                # whenever the stage wakes from a gap so it never mixes old frames
+                if onnx_engine is not None and fall_clip is not None:
+                    if gate.became_active('fall_model', now, onnx_gap):
+                        fall_clip.reset()
+                    if gate.should_run('fall_model', now):
+                        started = time.perf_counter()
+                        try:
+                            fall_clip.push(views.blurred_gray)
+                            if fall_clip.ready() and (now - onnx_last_fire) > onnx_debounce:
+                                score = float(onnx_engine.infer(fall_clip.clip()))
+                                sample["fallScore"] = max(score, sample.get("fallScore") or 0.0)
+                                if score > onnx_threshold:
+                                    st.fall = True
+                                    onnx_last_fire = now
+                        except Exception:
+                            pass
+                        _observe_stage(cam_id, 'onnx', started)
+                # detections go through the episode tracker to the background emitter; never blocks on the network
+                started = time.perf_counter()
+                if motion:
+                    _event_tracker.observe(cam_id, 'motion', {
+                        "motionPixels": motion_pixels,
+                        "motionRatio": round(motion_result["ratio"], 4),
+                        "boxes": motion_result["boxes"],
+                    })
+                if st.fall:
+                    fall_details = {k: v for k, v in (fall_decision or {"confidence": None}).items() if k != "fall"}
+                    _event_tracker.observe(cam_id, 'fall', {
+                        **fall_details,
+                        "source": "pose" if fall_decision else "onnx",
+                        "onnx": bool(onnx_engine is not None),
+                        "yoloPersonConfidence": float(yolo_person_conf),
+                    })
+                if gesture_name:
+                    _event_tracker.observe(cam_id, 'gesture', {"name": gesture_name})
+                _observe_stage(cam_id, 'emit', started)
+                alerted = bool(st.fall or person_event_emitted or gesture_name)
+        except Exception:
+            pass
+        _publish_state(cam_id, st)
+        # end-to-end: capture timestamp → analysis finished
+        latency_ms = (time.time() - captured_ts) * 1000.0
+        stats["framesAnalyzed"] += 1
+        if stats["firstFrameSec"] is None:
+            stats["firstAnalysedAt"] = time.time()
+            stats["firstFrameSec"] = round(stats["firstAnalysedAt"] - launched, 3)
+        stats["latencyMs"] = round(latency_ms, 2)
+        stats["avgLatencyMs"] = round(0.9 * stats["avgLatencyMs"] + 0.1 * latency_ms if stats["avgLatencyMs"] else latency_ms, 2)
+        if prev_analyzed_ts:
+            inst_fps = 1.0 / max(1e-3, now - prev_analyzed_ts)
+            stats["fps"] = round(0.8 * stats.get("fps", inst_fps) + 0.2 * inst_fps, 2)
+        prev_analyzed_ts = now
+        sample["fps"] = stats.get("fps")
+        if np is not None:
+            _timeseries.record(cam_id, captured_ts, sample)
+        elapsed = time.time() - now
+        _scheduler.report(cam_id, elapsed, motion, alerted)
+        stop.wait(max(0.0, _scheduler.interval(cam_id) - elapsed))
+    if generation is None or _supervisor.generation(cam_id) in (None, generation):
+        _scheduler.unregister(cam_id)
+    grabber.stop()
+    if _frame_grabbers.get(cam_id) is grabber:
+        _frame_grabbers.pop(cam_id, None)
+    if _stage_gates.get(cam_id) is gate:
+        _stage_gates.pop(cam_id, None)
+
+
+def _prepare_hls_dir(cam_id: str) -> Path:
+    hls_root = BASE_DIR / 'static' / 'hls' / cam_id
     hls_root.mkdir(parents=True, exist_ok=True)
     # clean old segments
     for p in list(hls_root.glob('*')):
         try:
-            p.unlink(missing_ok=True)  # type: ignore
+            p.unlink(missing_ok=True)  # type: ignore
+        except Exception:
+            pass
+    return hls_root / 'index.m3u8'
+
+
+def _hls_output_args(playlist: Path, copy: bool = False) -> List[str]:
+    if copy:
+        video = ['-c:v', 'copy']
+    else:
+        video = ['-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'zerolatency', '-pix_fmt', 'yuv420p']
+    return video + [
+        '-max_muxing_queue_size', '1024',
+        '-f', 'hls', '-hls_time', '2', '-hls_list_size', '6', '-hls_flags', 'delete_segments+append_list',
+        str(playlist),
+    ]
+
+
+def _start_hls(cam_id: str, url: str):
+    # Requires ffmpeg in PATH
+    if _hls_procs.get(cam_id) and _hls_procs[cam_id].poll() is None:
+        return True
+    playlist = _prepare_hls_dir(cam_id)
+    # Basic ffmpeg HLS; tune as needed
+    cmd = [
+        'ffmpeg', '-y',
+        '-rtsp_transport', 'tcp',
+        '-i', url,
+        '-an',
+    ] + _hls_output_args(playlist)
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _hls_procs[cam_id] = proc
+        return True
+    except Exception:
+        return False
+
+
+def _stop_hls(cam_id: str):
+    proc = _hls_procs.get(cam_id)
+    if proc and proc.poll() is None:
+        try:
+            proc.terminate()
+        except Exception:
+            pass
+    _hls_procs.pop(cam_id, None)
+
+
+class _CameraSupervisor:
+    """Owns exactly one pipeline thread per camera.
+
+    Every (re)start bumps the camera's generation; a pipeline loop runs only
+    while its generation is current, so a retired worker exits on its next
+    iteration instead of racing the replacement. Retiring stops the old
+    grabber (killing a fanout ffmpeg) and joins the pipeline thread and every
+    grabber thread of the camera with a bounded timeout; while any of them is
+    still alive (e.g. blocked inside a capture read) no new worker, and so no
+    second decoder, is spawned. Restarts back off exponentially per camera and
+    reset after a healthy stretch.
+    """
+
+    def __init__(self, stale_after: float = 10.0, backoff_base: float = 2.0, backoff_max: float = 120.0,
+                 join_timeout: float = 3.0, healthy_after: float = 60.0):
+        self.stale_after = stale_after
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.join_timeout = join_timeout
+        self.healthy_after = healthy_after
+        self._lock = threading.RLock()
+        self._cams: Dict[str, Dict[str, Any]] = {}
+        self._generations: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls) -> "_CameraSupervisor":
+        c = get_config().get('camera', {})
+        return cls(
+            stale_after=float(c.get('stale_after_sec', 10.0)),
+            backoff_base=float(c.get('restart_backoff_sec', 2.0)),
+            backoff_max=float(c.get('restart_backoff_max_sec', 120.0)),
+            join_timeout=float(c.get('restart_join_timeout_sec', 3.0)),
+        )
+
+    def generation(self, cam_id: str) -> Optional[int]:
+        rec = self._cams.get(cam_id)
+        return rec["generation"] if rec is not None else None
+
+    def owns(self, cam_id: str) -> bool:
+        return cam_id in self._cams
+
+    def running(self, cam_id: str) -> bool:
+        rec = self._cams.get(cam_id)
+        return rec is not None and rec["thread"] is not None and rec["thread"].is_alive()
+
+    def _spawn(self, cam_id: str, rec: Dict[str, Any]) -> None:
+        gen = self._generations.get(cam_id, 0) + 1
+        self._generations[cam_id] = gen
+        rec["generation"] = gen
+        _stop_flags[cam_id] = False
+        rec["stop"] = threading.Event()
+        t = threading.Thread(target=_process_stream, args=(cam_id, rec["url"], rec["fps"]),
+                             kwargs={"generation": gen, "stop": rec["stop"]},
+                             name=f"camera-{cam_id}-g{gen}", daemon=True)
+        rec["thread"] = t
+        rec["startedAt"] = time.time()
+        rec["state"] = "running"
+        _camera_threads[cam_id] = t
+        t.start()
+
+    def _retire(self, cam_id: str, rec: Dict[str, Any]) -> bool:
+        """Hand the camera to no one and wait (bounded) for the old worker and its grabber; True if all exited."""
+        old = rec.get("thread")
+        rec["generation"] = None
+        rec["thread"] = None
+        if rec.get("stop") is not None:
+            rec["stop"].set()
+        grabber = _frame_grabbers.get(cam_id)
+        if grabber is not None:
+            grabber.stop(timeout=0)
+        waiting = ([old] if old is not None else []) + _live_grab_threads(cam_id)
+        deadline = time.time() + self.join_timeout
+        for t in waiting:
+            t.join(timeout=max(0.0, deadline - time.time()))
+        rec["retiring"] = [t for t in waiting if t.is_alive()]
+        return not rec["retiring"]
+
+    @staticmethod
+    def _lingering(cam_id: str, rec: Dict[str, Any]) -> List[threading.Thread]:
+        """Threads of earlier workers (pipeline or grabber) that have not exited yet."""
+        alive = [t for t in rec.get("retiring") or [] if t.is_alive()]
+        rec["retiring"] = alive
+        return alive + [t for t in _live_grab_threads(cam_id) if t not in alive]
+
+    def start(self, cam_id: str, url: str, fps: int = 10) -> bool:
+        with self._lock:
+            rec = self._cams.get(cam_id)
+            if rec is not None and (rec["thread"] is not None and rec["thread"].is_alive()):
+                return False
+            if rec is None:
+                rec = self._cams[cam_id] = {
+                    "url": url, "generation": None, "thread": None, "retiring": [], "state": "starting",
+                    "startedAt": 0.0, "restarts": 0, "failures": 0, "nextRestartAt": 0.0,
+                    "history": deque(maxlen=10),
+                }
+            rec["url"] = url
+            rec["fps"] = fps
+            if self._lingering(cam_id, rec):
+                # an earlier decoder of this camera is still stuck; check() starts
+                # this one once it is gone
+                rec["state"] = "draining"
+                rec["nextRestartAt"] = time.time() + self.join_timeout
+                return False
+            self._spawn(cam_id, rec)
+            return True
+
+    def stop(self, cam_id: str) -> None:
+        with self._lock:
+            rec = self._cams.pop(cam_id, None)
+        _stop_flags[cam_id] = True
+        if rec is not None:
+            self._retire(cam_id, rec)
+        if _camera_threads.get(cam_id) is not None and not _camera_threads[cam_id].is_alive():
+            _camera_threads.pop(cam_id, None)
+
+    def restart(self, cam_id: str, reason: str, force: bool = False) -> bool:
+        """Replace the camera's worker unless it is backing off; returns True if a new one started."""
+        with self._lock:
+            rec = self._cams.get(cam_id)
+            if rec is None:
+                return False
+            now = time.time()
+            if not force and now < rec["nextRestartAt"]:
+                return False
+            if rec["generation"] is None and self._lingering(cam_id, rec):
+                # never stack a second decoder on top of one that is still stuck
+                rec["state"] = "draining"
+                rec["nextRestartAt"] = now + self.join_timeout
+                return False
+            if rec["generation"] is not None and not self._retire(cam_id, rec):
+                rec["state"] = "draining"
+                rec["nextRestartAt"] = now + self.join_timeout
+                self._record(rec, reason, now, spawned=False)
+                return False
+            rec["failures"] += 1
+            rec["restarts"] += 1
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (rec["failures"] - 1)))
+            rec["nextRestartAt"] = now + delay
+            self._spawn(cam_id, rec)
+            self._record(rec, reason, now, spawned=True)
+            return True
+
+    @staticmethod
+    def _record(rec: Dict[str, Any], reason: str, ts: float, spawned: bool) -> None:
+        rec["history"].append({"ts": ts, "reason": reason, "generation": rec["generation"], "spawned": spawned})
+
+    def check(self, now: Optional[float] = None) -> List[tuple]:
+        """One supervision pass; returns (cam_id, reason) for cameras it restarted."""
+        now = now or time.time()
+        restarted = []
+        for cam_id, rec in list(self._cams.items()):
+            st = _camera_state.get(cam_id)
+            last = max(rec["startedAt"], (st.last_frame_ts if st else None) or 0.0)
+            thread = rec["thread"]
+            reason = None
+            if rec["state"] == "draining":
+                reason = "stale"
+            elif thread is None or not thread.is_alive():
+                reason = "exited"
+            elif now - last > self.stale_after:
+                reason = "stale"
+            elif rec["failures"] and now - rec["startedAt"] > self.healthy_after:
+                rec["failures"] = 0
+            if reason and self.restart(cam_id, reason):
+                restarted.append((cam_id, reason))
+        return restarted
+
+    def camera_info(self, cam_id: str) -> Optional[Dict[str, Any]]:
+        rec = self._cams.get(cam_id)
+        if rec is None:
+            return None
+        return {
+            "state": rec["state"],
+            "generation": rec["generation"],
+            "restarts": rec["restarts"],
+            "consecutiveFailures": rec["failures"],
+            "lingeringThreads": len(rec["retiring"]),
+            "backoffUntil": rec["nextRestartAt"] or None,
+            "lastReason": rec["history"][-1]["reason"] if rec["history"] else None,
+            "history": list(rec["history"]),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "staleAfterSec": self.stale_after,
+            "cameras": {cam_id: self.camera_info(cam_id) for cam_id in list(self._cams)},
+        }
+
+
+_supervisor = _CameraSupervisor.from_config()
+
+
+def _supervisor_loop(stop: Optional[threading.Event] = None) -> None:
+    stop = stop or threading.Event()
+    while not stop.wait(2.0):
+        try:
+            _supervisor.check()
+        except Exception:
+            pass
+        if _camera_pool is not None:
+            try:
+                _camera_pool.check_workers()
+            except Exception:
+                pass
+
+
+#############################
+# Camera worker processes   #
+#############################
+
+
+def _worker_stats_pusher(stats_queue: Any) -> None:
+    while True:
+        time.sleep(2.0)
+        try:
+            stats_queue.put_nowait(('stages', os.getpid(), _stage_latency.collect()))
         except Exception:
             pass
-    playlist = hls_root / 'index.m3u8'
-    # Basic ffmpeg HLS; tune as needed
-    cmd = [
-        'ffmpeg', '-y',
-        '-rtsp_transport', 'tcp',
-        '-i', url,
-        '-an',
-        '-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'zerolatency', '-pix_fmt', 'yuv420p',
-        '-max_muxing_queue_size', '1024',
-        '-f', 'hls', '-hls_time', '2', '-hls_list_size', '6', '-hls_flags', 'delete_segments+append_list',
-        str(playlist)
-    ]
-    try:
-        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        _hls_procs[cam_id] = proc
-        return True
-    except Exception:
-        return False
+        for cam_id in list(_camera_state):
+            grabber = _frame_grabbers.get(cam_id)
+            try:
+                stats_queue.put_nowait(('camera', cam_id, {
+                    "capture": grabber.stats() if grabber else None,
+                    "analysis": dict(_pipeline_stats.get(cam_id, {})),
+                    "scheduler": _scheduler.camera_info(cam_id),
+                    "supervisor": _supervisor.camera_info(cam_id),
+                    "gating": _stage_gates[cam_id].stats() if cam_id in _stage_gates else None,
+                    # what this worker actually applies, after global + per-camera toggles
+                    "toggles": {name: _toggle(cam_id, name) for name in _toggles},
+                    "pid": os.getpid(),
+                }))
+            except Exception:
+                pass
+            rows = _timeseries.export_seconds(cam_id) if np is not None else []
+            if rows:
+                try:
+                    stats_queue.put_nowait(('series', cam_id, rows))
+                except Exception:
+                    pass
 
 
-def _stop_hls(cam_id: str):
-    proc = _hls_procs.get(cam_id)
-    if proc and proc.poll() is None:
+def _camera_worker_main(cmd_queue: Any, stats_queue: Any, budget_share: float = 1.0) -> None:
+    """Entry point of a spawned camera worker: runs camera pipelines as threads
+    and publishes their frames/flags into the slots the API process created."""
+    # each worker schedules its own cameras against its slice of the CPU budget
+    _scheduler.budget_share = budget_share
+    threading.Thread(target=_worker_stats_pusher, args=(stats_queue,), daemon=True).start()
+    # stale/exited cameras are restarted right here, next to the threads
+    threading.Thread(target=_supervisor_loop, daemon=True).start()
+    while True:
+        cmd = cmd_queue.get()
+        op = cmd[0]
+        if op == 'shutdown':
+            for cam_id in list(_stop_flags):
+                _stop_flags[cam_id] = True
+            return
+        if op == 'global_toggles':
+            _toggles.update(cmd[2])
+            continue
+        cam_id = cmd[1]
+        if op == 'start':
+            _, _, url, slot_name, fps, toggles = cmd
+            _shared_slots[cam_id] = _SharedFrameSlot(slot_name)
+            _camera_state[cam_id] = CameraState(url=url)
+            _camera_toggles[cam_id] = toggles
+            _supervisor.start(cam_id, url, fps)
+        elif op == 'toggles':
+            _camera_toggles[cam_id] = cmd[2]
+        elif op == 'restart':
+            _supervisor.restart(cam_id, 'requested', force=True)
+        elif op == 'stop':
+            _supervisor.stop(cam_id)
+            _camera_threads.pop(cam_id, None)
+            _camera_state.pop(cam_id, None)
+            _camera_toggles.pop(cam_id, None)
+            _timeseries.drop(cam_id)
+            slot = _shared_slots.pop(cam_id, None)
+            if slot is not None:
+                slot.close()
+
+
+class _CameraWorkerPool:
+    """Spreads cameras over spawned worker processes (one GIL each).
+
+    The API process owns one _SharedFrameSlot per camera; workers write into
+    it and the API reads state flags from the header and copies a frame out
+    only when a snapshot/stream/backup actually needs it. Per-camera stats
+    come back as small dicts every couple of seconds. Toggle changes are
+    sent to every worker, and a worker process that died is respawned with
+    its cameras (check_workers(), run by the supervisor loop).
+    """
+
+    def __init__(self, processes: int, max_frame_bytes: int):
+        self._ctx = multiprocessing.get_context('spawn')
+        self.size = max(1, processes)
+        self.max_frame_bytes = max_frame_bytes
+        self._lock = threading.Lock()
+        self._workers: List[tuple] = []
+        self._stats_queue: Any = None
+        self._assignment: Dict[str, int] = {}
+        self._slots: Dict[str, _SharedFrameSlot] = {}
+        self._seen_seq: Dict[str, int] = {}
+        self._remote_stats: Dict[str, Dict[str, Any]] = {}
+        self._remote_stages: Dict[int, Dict[tuple, list]] = {}
+        self._slot_counter = 0
+        # (url, fps, toggles) per camera, to start it again in a respawned worker
+        self._params: Dict[str, tuple] = {}
+        self.worker_restarts = 0
+
+    def _spawn_worker(self, i: int) -> tuple:
+        cmd_queue = self._ctx.Queue()
+        proc = self._ctx.Process(
+            target=_camera_worker_main,
+            args=(cmd_queue, self._stats_queue, 1.0 / self.size),
+            name=f'carenest-camera-worker-{i}',
+            daemon=True,
+        )
+        proc.start()
+        cmd_queue.put(('global_toggles', None, dict(_toggles)))
+        return proc, cmd_queue
+
+    def _ensure_started(self) -> None:
+        if self._workers:
+            return
+        self._stats_queue = self._ctx.Queue(maxsize=1024)
+        for i in range(self.size):
+            self._workers.append(self._spawn_worker(i))
+        threading.Thread(target=self._collect_stats, name="camera-worker-stats", daemon=True).start()
+
+    def check_workers(self) -> List[int]:
+        """Respawn worker processes that exited and restart their cameras; returns their indexes."""
+        respawned = []
+        with self._lock:
+            for i, (proc, cmd_queue) in enumerate(self._workers):
+                if proc.is_alive():
+                    continue
+                self._workers[i] = worker = self._spawn_worker(i)
+                self.worker_restarts += 1
+                respawned.append(i)
+                for cam_id, idx in self._assignment.items():
+                    if idx == i:
+                        url, fps, toggles = self._params[cam_id]
+                        worker[1].put(('start', cam_id, url, self._slots[cam_id].name, fps, dict(toggles)))
+        return respawned
+
+    def broadcast_toggles(self, toggles: Dict[str, bool]) -> None:
+        with self._lock:
+            for _, cmd_queue in self._workers:
+                cmd_queue.put(('global_toggles', None, dict(toggles)))
+
+    def _collect_stats(self) -> None:
+        while True:
+            try:
+                kind, key, payload = self._stats_queue.get()
+            except Exception:
+                return
+            if kind == 'stages':
+                self._remote_stages[key] = payload
+            elif kind == 'series':
+                _timeseries.merge(key, payload)
+            else:
+                self._remote_stats[key] = payload
+
+    def remote_stage_latency(self) -> Dict[tuple, list]:
+        merged: Dict[tuple, list] = {}
+        for data in list(self._remote_stages.values()):
+            for labels, h in data.items():
+                _Histograms.merge_into(merged, labels, h)
+        return merged
+
+    def owns(self, cam_id: str) -> bool:
+        return cam_id in self._assignment
+
+    def start(self, cam_id: str, url: str, fps: int = 10, toggles: Optional[Dict[str, bool]] = None) -> None:
+        with self._lock:
+            self._ensure_started()
+            if cam_id in self._assignment:
+                return
+            loads = [0] * self.size
+            for idx in self._assignment.values():
+                loads[idx] += 1
+            idx = loads.index(min(loads))
+            self._slot_counter += 1
+            slot = _SharedFrameSlot(f"cn{os.getpid()}_{self._slot_counter}", self.max_frame_bytes, create=True)
+            self._slots[cam_id] = slot
+            self._seen_seq[cam_id] = 0
+            self._assignment[cam_id] = idx
+            self._params[cam_id] = (url, fps, dict(toggles or {}))
+            self._workers[idx][1].put(('start', cam_id, url, slot.name, fps, dict(toggles or {})))
+
+    def restart(self, cam_id: str, url: str) -> None:
+        idx = self._assignment.get(cam_id)
+        if idx is not None:
+            self._workers[idx][1].put(('restart', cam_id, url))
+
+    def set_toggles(self, cam_id: str, toggles: Dict[str, bool]) -> None:
+        with self._lock:
+            idx = self._assignment.get(cam_id)
+            if idx is not None:
+                url, fps, _ = self._params[cam_id]
+                self._params[cam_id] = (url, fps, dict(toggles))
+                self._workers[idx][1].put(('toggles', cam_id, dict(toggles)))
+
+    def stop(self, cam_id: str) -> None:
+        with self._lock:
+            idx = self._assignment.pop(cam_id, None)
+            self._params.pop(cam_id, None)
+            if idx is None:
+                return
+            self._workers[idx][1].put(('stop', cam_id))
+            slot = self._slots.pop(cam_id, None)
+            self._seen_seq.pop(cam_id, None)
+        if slot is not None:
+            # the worker keeps its own mapping until it processes 'stop'
+            slot.close(unlink=True)
+
+    def sync_state(self, cam_id: str, st: "CameraState") -> None:
+        slot = self._slots.get(cam_id)
+        if slot is None:
+            return
+        st.last_frame_ts, st.motion, st.fall = slot.read_state()
+
+    def frame_pending(self, cam_id: str) -> bool:
+        """True when the slot holds a frame sync_frame has not copied yet (reads the header only)."""
+        slot = self._slots.get(cam_id)
+        return slot is not None and slot.sequence() != self._seen_seq.get(cam_id)
+
+    def sync_frame(self, cam_id: str) -> None:
+        slot = self._slots.get(cam_id)
+        if slot is None or slot.sequence() == self._seen_seq.get(cam_id):
+            return
+        got = slot.read_frame(self._seen_seq.get(cam_id, 0))
+        if got is None:
+            return
+        self._seen_seq[cam_id] = got[0]
+        _publish_frame(cam_id, got[2])
+
+    def remote_stats(self, cam_id: str) -> Optional[Dict[str, Any]]:
+        return self._remote_stats.get(cam_id)
+
+    def cameras(self) -> List[str]:
+        return list(self._assignment)
+
+    def shutdown(self) -> None:
+        for proc, cmd_queue in self._workers:
+            try:
+                cmd_queue.put(('shutdown',))
+                proc.join(timeout=2.0)
+                if proc.is_alive():
+                    proc.terminate()
+            except Exception:
+                pass
+        for slot in self._slots.values():
+            slot.close(unlink=True)
+        self._slots.clear()
+
+
+def _build_camera_pool() -> Optional[_CameraWorkerPool]:
+    cam_cfg = get_config().get('camera', {})
+    mode = str(os.getenv('CAMERA_WORKER_MODE') or cam_cfg.get('worker_mode') or 'thread').lower()
+    if mode != 'process' or _IS_CAMERA_WORKER or np is None:
+        return None
+    workers = str(os.getenv('CAMERA_WORKERS') or cam_cfg.get('worker_processes') or 'auto')
+    # leave one core for the API process itself
+    processes = max(1, (os.cpu_count() or 2) - 1) if workers == 'auto' else int(workers)
+    max_frame_bytes = int(os.getenv('CAMERA_MAX_FRAME_BYTES', str(1920 * 1080 * 3)))
+    pool = _CameraWorkerPool(processes, max_frame_bytes)
+    atexit.register(pool.shutdown)
+    return pool
+
+
+_camera_pool = _build_camera_pool()
+
+
+def _refresh_camera(cam_id: str, frame: bool = False) -> None:
+    """Pull a worker-owned camera's flags (and optionally newest frame) from shared memory."""
+    if _camera_pool is None or not _camera_pool.owns(cam_id):
+        return
+    st = _camera_state.get(cam_id)
+    if st is not None:
+        _camera_pool.sync_state(cam_id, st)
+    if frame:
+        _camera_pool.sync_frame(cam_id)
+
+
+@app.get('/api/scheduler')
+def scheduler_status():
+    data = _scheduler.stats()
+    if _camera_pool is not None:
+        for cam_id in _camera_pool.cameras():
+            remote = (_camera_pool.remote_stats(cam_id) or {}).get('scheduler')
+            if remote:
+                data["cameras"][cam_id] = remote
+    return data
+
+
+class _CameraRegistry:
+    """Cameras to bring back after a restart, persisted as JSON.
+
+    Entries hold url, fps, enabled and per-camera toggle overrides. Every
+    change rewrites the (small) file through a temp file + rename, so a crash
+    mid-write leaves the previous version; an unreadable file is moved aside
+    to `<name>.bad` instead of being overwritten.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._cams: Dict[str, Dict[str, Any]] = {}
+        self.load_error: Optional[str] = None
+        if self.path is not None:
+            self._load()
+
+    def _load(self) -> None:
         try:
-            proc.terminate()
-        except Exception:
-            pass
-    _hls_procs.pop(cam_id, None)
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            for item in data.get('cameras', []):
+                if item.get('id') and item.get('url'):
+                    self._cams[str(item['id'])] = {
+                        "id": str(item['id']),
+                        "url": str(item['url']),
+                        "fps": int(item.get('fps') or 10),
+                        "enabled": bool(item.get('enabled', True)),
+                        "toggles": {k: bool(v) for k, v in (item.get('toggles') or {}).items() if k in _toggles},
+                    }
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            self.load_error = str(e)
+            self._cams.clear()
+            try:
+                os.replace(self.path, self.path.with_name(self.path.name + '.bad'))
+            except OSError:
+                pass
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "cameras": list(self._cams.values())}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def get(self, cam_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._cams.get(cam_id)
+        return {**entry, "toggles": dict(entry["toggles"])} if entry else None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        return [self.get(cam_id) for cam_id in list(self._cams)]
+
+    def upsert(self, cam_id: str, url: Optional[str] = None, fps: Optional[int] = None,
+               enabled: Optional[bool] = None, toggles: Optional[Dict[str, bool]] = None) -> Optional[Dict[str, Any]]:
+        """Create or update an entry (a new one needs a url); None leaves a field as it is."""
+        with self._lock:
+            entry = self._cams.get(cam_id)
+            if entry is None:
+                if not url:
+                    return None
+                entry = self._cams[cam_id] = {"id": cam_id, "url": url, "fps": 10, "enabled": True, "toggles": {}}
+            if url:
+                entry["url"] = url
+            if fps:
+                entry["fps"] = int(fps)
+            if enabled is not None:
+                entry["enabled"] = bool(enabled)
+            if toggles is not None:
+                entry["toggles"] = dict(toggles)
+            self._save()
+        return self.get(cam_id)
+
+    def remove(self, cam_id: str) -> bool:
+        with self._lock:
+            if self._cams.pop(cam_id, None) is None:
+                return False
+            self._save()
+            return True
+
+
+_camera_registry = _CameraRegistry(
+    None if _IS_CAMERA_WORKER else (os.getenv('CAMERA_REGISTRY_PATH') or BASE_DIR / 'storage' / 'cameras.json')
+)
+
+
+def _launch_camera(cam_id: str, url: str, fps: int = 10, toggles: Optional[Dict[str, bool]] = None) -> bool:
+    """Start processing (and HLS) for a camera; False if it is already running."""
+    if _supervisor.running(cam_id) or (_camera_pool is not None and _camera_pool.owns(cam_id)):
+        return False
+    _camera_toggles[cam_id] = dict(toggles or {})
+    _camera_state[cam_id] = CameraState(url=url)
+    if _camera_pool is not None:
+        _camera_pool.start(cam_id, url, fps, toggles)
+    else:
+        _supervisor.start(cam_id, url, fps)
+    # Try to start HLS alongside processing; in fanout mode the grabber's
+    # ffmpeg already produces it from the same decode
+    if _ingest_mode() != 'fanout':
+        _start_hls(cam_id, url)
+    return True
+
+
+def _first_analysed_ts(cam_id: str) -> Optional[float]:
+    """When the camera's current worker finished analysing its first frame
+    (models loaded and run once), not when that frame was captured."""
+    if _camera_pool is not None and _camera_pool.owns(cam_id):
+        analysis = (_camera_pool.remote_stats(cam_id) or {}).get('analysis') or {}
+    else:
+        analysis = _pipeline_stats.get(cam_id, {})
+    return analysis.get('firstAnalysedAt')
+
+
+class _WarmStart:
+    """Relaunches the registry's enabled cameras at boot, one at a time.
+
+    The next camera starts once the previous one has analysed its first frame
+    (stream handshake and model loads are behind it), but never sooner than
+    `stagger` and never later than `ready_timeout` seconds after it, so N
+    cameras do not all connect and load models in the same second.
+    """
+
+    def __init__(self, stagger: float = 2.0, ready_timeout: float = 20.0, poll: float = 0.1):
+        self.stagger = stagger
+        self.ready_timeout = ready_timeout
+        self.poll = poll
+        self.state = "idle"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cams: Dict[str, Dict[str, Any]] = {}
+        self._first_frame: Callable[[str], Optional[float]] = _first_analysed_ts
+
+    @classmethod
+    def from_config(cls) -> "_WarmStart":
+        c = get_config().get('camera', {})
+        return cls(
+            stagger=float(c.get('warm_start_stagger_sec', 2.0)),
+            ready_timeout=float(c.get('warm_start_timeout_sec', 20.0)),
+        )
+
+    def _check(self, cam_id: str) -> bool:
+        rec = self._cams[cam_id]
+        if rec["state"] == "ready":
+            return True
+        if rec["state"] not in ("starting", "slow"):
+            return False
+        ts = self._first_frame(cam_id)
+        if ts is None or ts < rec["launchedAt"]:
+            return False
+        rec["state"] = "ready"
+        rec["firstFrameSec"] = round(ts - rec["launchedAt"], 3)
+        return True
+
+    def run(self, entries: List[Dict[str, Any]], launch: Callable[..., bool] = _launch_camera,
+            first_frame: Optional[Callable[[str], Optional[float]]] = None) -> None:
+        if first_frame is not None:
+            self._first_frame = first_frame
+        self.state = "running"
+        self.started_at = time.time()
+        self._cams = {e["id"]: {"state": "pending", "launchedAt": None, "firstFrameSec": None} for e in entries}
+        for e in entries:
+            rec = self._cams[e["id"]]
+            rec["launchedAt"] = time.time()
+            try:
+                rec["state"] = "starting" if launch(e["id"], e["url"], e["fps"], e["toggles"]) else "running"
+            except Exception as exc:
+                rec["state"], rec["error"] = "failed", str(exc)
+                continue
+            while rec["state"] == "starting":
+                now = time.time()
+                if self._check(e["id"]):
+                    break
+                if now - rec["launchedAt"] >= self.ready_timeout:
+                    # keep an eye on it in stats(), but do not hold up the rest
+                    rec["state"] = "slow"
+                    break
+                time.sleep(self.poll)
+            time.sleep(max(0.0, rec["launchedAt"] + self.stagger - time.time()))
+        self.state = "done"
+        self.finished_at = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        for cam_id, rec in list(self._cams.items()):
+            if rec["state"] == "slow":
+                self._check(cam_id)
+        states = [rec["state"] for rec in self._cams.values()]
+        return {
+            "state": self.state,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "staggerSec": self.stagger,
+            "total": len(states),
+            "ready": states.count("ready"),
+            "cameras": {cam_id: dict(rec) for cam_id, rec in list(self._cams.items())},
+        }
+
+
+_warm_start = _WarmStart.from_config()
+
+
+def _warm_start_cameras() -> None:
+    entries = [e for e in _camera_registry.entries() if e["enabled"]]
+    if entries:
+        _warm_start.run(entries)
+
+
+@app.get('/api/startup')
+def startup_status():
+    return {**_warm_start.stats(), "registryError": _camera_registry.load_error}
 
 
 class StartCameraReq(BaseModel):
     id: str
     url: str
+    fps: Optional[int] = None
+    toggles: Optional[Dict[str, bool]] = None
+    # False: run now but do not bring back after a restart
+    persist: bool = True
 
 
 @app.post("/api/camera/start")
 def start_camera(req: StartCameraReq):
     cam_id = req.id
-    if cam_id in _camera_threads and _camera_threads[cam_id].is_alive():
+    unknown = sorted(set(req.toggles or {}) - set(_toggles))
+    if unknown:
+        return JSONResponse({"error": f"unknown toggles: {', '.join(unknown)}"}, status_code=400)
+    entry = _camera_registry.get(cam_id) or {}
+    fps = req.fps or entry.get("fps") or 10
+    toggles = req.toggles if req.toggles is not None else entry.get("toggles")
+    if req.persist:
+        _camera_registry.upsert(cam_id, url=req.url, fps=fps, enabled=True, toggles=toggles)
+    if not _launch_camera(cam_id, req.url, fps, toggles):
         return {"running": True}
-    _stop_flags[cam_id] = False
-    _camera_state[cam_id] = CameraState(url=req.url)
-    t = threading.Thread(target=_process_stream, args=(cam_id, req.url), daemon=True)
-    _camera_threads[cam_id] = t
-    t.start()
-    # Try to start HLS alongside processing
-    _start_hls(cam_id, req.url)
     return {"started": True}
 
 
 class StopCameraReq(BaseModel):
     id: str
+    # True: also drop it from the registry instead of just disabling it
+    forget: bool = False
 
 
 @app.post("/api/camera/stop")
 def stop_camera(req: StopCameraReq):
     cam_id = req.id
-    _stop_flags[cam_id] = True
+    if req.forget:
+        _camera_registry.remove(cam_id)
+        _timeseries.drop(cam_id)
+    else:
+        _camera_registry.upsert(cam_id, enabled=False)
+    if _camera_pool is not None and _camera_pool.owns(cam_id):
+        _camera_pool.stop(cam_id)
+    _supervisor.stop(cam_id)
     _stop_hls(cam_id)
     return {"stopping": True}
 
 
+@app.get('/api/camera/registry')
+def camera_registry():
+    return {"items": _camera_registry.entries(), "error": _camera_registry.load_error}
+
+
 @app.get("/api/camera/{cam_id}/state")
 def camera_state(cam_id: str):
+    _refresh_camera(cam_id)
     st = _camera_state.get(cam_id)
     if not st:
         return JSONResponse({"error": "not found"}, status_code=404)
     return st.model_dump()
 
 
+@app.get("/api/camera/{cam_id}/stats")
+def camera_stats(cam_id: str):
+    if cam_id not in _camera_state:
+        return JSONResponse({"error": "not found"}, status_code=404)
+    if _camera_pool is not None and _camera_pool.owns(cam_id):
+        remote = _camera_pool.remote_stats(cam_id) or {}
+        return {"id": cam_id, **remote}
+    grabber = _frame_grabbers.get(cam_id)
+    return {
+        "id": cam_id,
+        "capture": grabber.stats() if grabber else None,
+        "analysis": dict(_pipeline_stats.get(cam_id, {})),
+        "supervisor": _supervisor.camera_info(cam_id),
+        "gating": _stage_gates[cam_id].stats() if cam_id in _stage_gates else None,
+    }
+
+
 @app.get("/api/camera/{cam_id}/snapshot")
-def camera_snapshot(cam_id: str):
-    if cv2 is None:
+def camera_snapshot(cam_id: str, request: Request):
+    if not cv2:
         return JSONResponse({"error": "cv2 not available"}, status_code=503)
-    frame = _last_frames.get(cam_id)
-    if frame is None:
+    _refresh_camera(cam_id, frame=True)
+    snap = _snapshots.jpeg(cam_id)
+    if snap is None:
         return JSONResponse({"error": "no frame"}, status_code=404)
-    ok, buf = cv2.imencode('.jpg', frame)
-    if not ok:
+    version, data = snap
+    if data is None:
         return JSONResponse({"error": "encode failed"}, status_code=500)
-    return Response(content=buf.tobytes(), media_type='image/jpeg')
+    etag = _snapshots.etag(version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type='image/jpeg', headers=headers)
+
+
+@app.get("/api/camera/{cam_id}/mjpeg")
+async def camera_mjpeg(cam_id: str, fps: float = 5.0):
+    if not cv2:
+        return JSONResponse({"error": "cv2 not available"}, status_code=503)
+    if cam_id not in _camera_state:
+        return JSONResponse({"error": "not found"}, status_code=404)
+    min_gap = 1.0 / max(0.1, min(fps, 30.0))
+
+    async def frames():
+        sent_version = 0
+        while cam_id in _camera_state:
+            if _camera_pool is not None and _camera_pool.owns(cam_id) and _camera_pool.frame_pending(cam_id):
+                # copying a frame out of shared memory is not event-loop work
+                await run_in_threadpool(_refresh_camera, cam_id, True)
+            if _snapshots.version(cam_id) == sent_version:
+                # polling an int is cheaper than parking a thread per viewer
+                await asyncio.sleep(0.05)
+                continue
+            snap = await run_in_threadpool(_snapshots.jpeg, cam_id)
+            if snap is None or snap[1] is None:
+                await asyncio.sleep(min_gap)
+                continue
+            sent_version, data = snap
+            yield (
+                b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                + str(len(data)).encode() + b"\r\n\r\n" + data + b"\r\n"
+            )
+            await asyncio.sleep(min_gap)
+
+    return StreamingResponse(frames(), media_type='multipart/x-mixed-replace; boundary=frame')
 
 
 @app.get('/api/camera/{cam_id}/hls')
@@ -711,7 +3855,8 @@ def camera_hls(cam_id: str):
 def health_analytics():
     # Aggregate simple signals from camera states; extend later with ML
     cams = []
-    for cam_id, st in _camera_state.items():
+    for cam_id, st in list(_camera_state.items()):
+        _refresh_camera(cam_id)
         cams.append({
             "id": cam_id,
             "motion": st.motion,
@@ -727,61 +3872,577 @@ def health_analytics():
     return summary
 
 
-#########################
-# Watchdog, Power & Backups    #
-#########################
+class _TimeSeriesStore:
+    """Per-camera metric history in fixed NumPy rings, served from memory.
 
-def _watchdog_loop():
-    while True:
+    Each camera has one ring per tier (1 s x 1 h, 1 min x 24 h, 1 h x 30 d by
+    default) holding sum, max and sample count per metric. A sample is added
+    to the current bucket of every tier at once, so coarser tiers are always
+    up to date without a rollup job; a bucket is cleared when its slot comes
+    round again. Memory per camera is fixed at creation. At `max_cameras`,
+    the camera written least recently (typically a stopped one) gives up its
+    rings to the new one; a forgotten camera's rings are dropped at once.
+    """
+
+    METRICS = ('active', 'motionRatio', 'fallScore', 'personConf', 'fps')
+    TIERS = ((1, 3600), (60, 1440), (3600, 720))
+
+    def __init__(self, tiers: Any = None, max_cameras: int = 64):
+        self.tiers = tuple(tiers or self.TIERS)
+        self.max_cameras = max_cameras
+        self._lock = threading.Lock()
+        self._cams: Dict[str, List[Dict[str, Any]]] = {}
+        self._exported: Dict[str, int] = {}
+        self._written: Dict[str, float] = {}
+        self.evicted = 0
+
+    def _drop_locked(self, cam_id: str) -> bool:
+        self._exported.pop(cam_id, None)
+        self._written.pop(cam_id, None)
+        return self._cams.pop(cam_id, None) is not None
+
+    def drop(self, cam_id: str) -> bool:
+        """Forget a camera's history; returns False when there was none."""
+        with self._lock:
+            return self._drop_locked(cam_id)
+
+    def _rings(self, cam_id: str) -> Optional[List[Dict[str, Any]]]:
+        rings = self._cams.get(cam_id)
+        if rings is None:
+            if len(self._cams) >= self.max_cameras:
+                if self.max_cameras <= 0:
+                    return None
+                victim = min(self._cams, key=lambda c: self._written.get(c, 0.0))
+                self._drop_locked(victim)
+                self.evicted += 1
+                _log.warning("time series for %d cameras (max_cameras); dropped %s (idle longest) for %s",
+                             self.max_cameras, victim, cam_id)
+            m = len(self.METRICS)
+            rings = self._cams[cam_id] = [{
+                "res": res,
+                "bucket": np.full(slots, -1, dtype=np.int64),
+                "sum": np.zeros((slots, m), dtype=np.float32),
+                "max": np.zeros((slots, m), dtype=np.float32),
+                "count": np.zeros((slots, m), dtype=np.int32),
+            } for res, slots in self.tiers]
+        return rings
+
+    def _add(self, cam_id: str, ts: float, sums: Any, maxs: Any, counts: Any) -> None:
+        with self._lock:
+            rings = self._rings(cam_id)
+            if rings is None:
+                return
+            self._written[cam_id] = time.monotonic()
+            has = counts > 0
+            for ring in rings:
+                bucket = int(ts // ring["res"])
+                i = bucket % len(ring["bucket"])
+                if ring["bucket"][i] != bucket:
+                    ring["bucket"][i] = bucket
+                    ring["sum"][i] = 0.0
+                    ring["max"][i] = 0.0
+                    ring["count"][i] = 0
+                fresh = has & (ring["count"][i] == 0)
+                ring["max"][i] = np.where(fresh, maxs, np.where(has, np.maximum(ring["max"][i], maxs), ring["max"][i]))
+                ring["sum"][i] += sums
+                ring["count"][i] += counts
+
+    def record(self, cam_id: str, ts: float, values: Mapping[str, Any]) -> None:
+        """Add one sample; metrics missing from `values` (or None) are not counted."""
+        v = np.array([float(values[k]) if values.get(k) is not None else np.nan for k in self.METRICS], dtype=np.float32)
+        has = ~np.isnan(v)
+        v = np.where(has, v, 0.0).astype(np.float32)
+        self._add(cam_id, ts, v, v, has.astype(np.int32))
+
+    def export_seconds(self, cam_id: str, until: Optional[float] = None) -> List[list]:
+        """Finished 1-second buckets not exported before, as plain lists (for the worker→API queue)."""
+        until_b = int((time.time() if until is None else until) // 1) - 1
+        with self._lock:
+            rings = self._cams.get(cam_id)
+            if not rings or rings[0]["res"] != 1:
+                return []
+            ring = rings[0]
+            slots = len(ring["bucket"])
+            since = max(self._exported.get(cam_id, until_b - slots), until_b - slots)
+            b = np.arange(since + 1, until_b + 1)
+            idx = b % slots
+            valid = ring["bucket"][idx] == b
+            rows = [[int(bucket), ring["sum"][i].tolist(), ring["max"][i].tolist(), ring["count"][i].tolist()]
+                    for bucket, i in zip(b[valid], idx[valid])]
+            self._exported[cam_id] = until_b
+        return rows
+
+    def merge(self, cam_id: str, rows: List[list]) -> None:
+        for bucket, sums, maxs, counts in rows:
+            self._add(cam_id, float(bucket), np.asarray(sums, dtype=np.float32), np.asarray(maxs, dtype=np.float32),
+                      np.asarray(counts, dtype=np.int32))
+
+    def query(self, cam_id: str, window: float, step: float, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Mean/max per metric over the last `window` seconds in `step`-second points."""
+        now = time.time() if now is None else now
+        with self._lock:
+            rings = self._cams.get(cam_id)
+            if rings is None:
+                return None
+            # coarsest tier that still resolves `step`, falling back to the one that covers the window
+            ring = rings[0]
+            for cand in rings:
+                if cand["res"] <= step:
+                    ring = cand
+            for cand in rings:
+                if cand["res"] >= ring["res"] and cand["res"] * len(cand["bucket"]) >= window:
+                    ring = cand
+                    break
+            res = ring["res"]
+            per = max(1, int(step // res))
+            slots = len(ring["bucket"])
+            n = min(int(np.ceil(window / res)), slots)
+            n = int(np.ceil(n / per)) * per
+            end_b = int(now // res)
+            b = np.arange(end_b - n + 1, end_b + 1)
+            idx = b % slots
+            valid = (ring["bucket"][idx] == b)[:, None]
+            sums = np.where(valid, ring["sum"][idx], 0.0).reshape(-1, per, len(self.METRICS)).sum(axis=1)
+            counts = np.where(valid, ring["count"][idx], 0).reshape(-1, per, len(self.METRICS)).sum(axis=1)
+            maxs = np.where(valid & (ring["count"][idx] > 0), ring["max"][idx], -np.inf).reshape(-1, per, len(self.METRICS)).max(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        series = {}
+        for j, name in enumerate(self.METRICS):
+            empty = counts[:, j] == 0
+            series[name] = {
+                "mean": [None if e else round(float(x), 4) for x, e in zip(means[:, j], empty)],
+                "max": [None if e else round(float(x), 4) for x, e in zip(maxs[:, j], empty)],
+            }
+        return {
+            "camera": cam_id,
+            "resolutionSec": res,
+            "stepSec": res * per,
+            "t": (b[::per] * res).tolist(),
+            "series": series,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        per_camera = sum(len(self.METRICS) * slots * 12 + slots * 8 for _, slots in self.tiers)
+        return {"cameras": len(self._cams), "maxCameras": self.max_cameras, "evicted": self.evicted,
+                "bytesPerCamera": per_camera, "tiers": [list(t) for t in self.tiers]}
+
+
+_timeseries = _TimeSeriesStore()
+
+
+def _parse_duration(value: str) -> float:
+    """'90', '90s', '15m', '24h', '7d' -> seconds."""
+    value = str(value).strip().lower()
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+@app.get('/api/health-analytics/series')
+def health_series(camera: str, window: str = '1h', step: str = '1m'):
+    try:
+        window_sec, step_sec = _parse_duration(window), _parse_duration(step)
+    except ValueError:
+        return JSONResponse({"error": "window/step must be seconds or like 15m, 24h, 7d"}, status_code=400)
+    if window_sec <= 0 or step_sec <= 0 or window_sec / step_sec > 10000:
+        return JSONResponse({"error": "window/step out of range"}, status_code=400)
+    data = _timeseries.query(camera, window_sec, step_sec)
+    if data is None:
+        return JSONResponse({"error": "not found"}, status_code=404)
+    return data
+
+
+class _StateBroadcaster:
+    """Pushes camera state changes to every SSE/WebSocket viewer from one producer.
+
+    A single asyncio task samples all cameras every `interval` seconds into a
+    compact {motion, fall, age} record (age is a bucket, so a steadily
+    running camera never changes) and, only when something changed, encodes
+    one delta message once for all subscribers. New subscribers start with a
+    full snapshot; a viewer too slow to keep up has its backlog replaced by a
+    fresh snapshot instead of growing memory. The task stops when the last
+    viewer leaves.
+    """
+
+    AGE_BUCKETS = ((2.0, 'live'), (10.0, 'lagging'))
+
+    def __init__(self, interval: float = 0.5, queue_size: int = 32, heartbeat: float = 15.0):
+        self.interval = interval
+        self.queue_size = max(2, queue_size)
+        self.heartbeat = heartbeat
+        self._subscribers: set = set()
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.version = 0
+        self.deltas = 0
+        self.resyncs = 0
+
+    @classmethod
+    def age_bucket(cls, age: Optional[float]) -> str:
+        if age is None:
+            return 'none'
+        for limit, name in cls.AGE_BUCKETS:
+            if age < limit:
+                return name
+        return 'stale'
+
+    def current(self) -> Dict[str, Dict[str, Any]]:
         now = time.time()
+        out = {}
         for cam_id, st in list(_camera_state.items()):
-            last = st.last_frame_ts or 0
-            if now - last > 10:  # stale >10s → restart
-                try:
-                    _stop_flags[cam_id] = True
-                    time.sleep(0.5)
-                    _stop_flags[cam_id] = False
-                    t = threading.Thread(target=_process_stream, args=(cam_id, st.url), daemon=True)
-                    _camera_threads[cam_id] = t
-                    t.start()
-                except Exception:
-                    pass
-        time.sleep(5)
+            _refresh_camera(cam_id)
+            age = (now - st.last_frame_ts) if st.last_frame_ts else None
+            out[cam_id] = {"motion": st.motion, "fall": st.fall, "age": self.age_bucket(age)}
+        return out
+
+    @staticmethod
+    def diff(old: Mapping[str, Any], new: Mapping[str, Any]) -> Dict[str, Any]:
+        """Changed or added cameras with their new record; removed ones as None."""
+        delta: Dict[str, Any] = {cam_id: rec for cam_id, rec in new.items() if old.get(cam_id) != rec}
+        delta.update({cam_id: None for cam_id in old if cam_id not in new})
+        return delta
+
+    @staticmethod
+    def _encode(payload: Dict[str, Any]) -> tuple:
+        text = json.dumps(payload, separators=(',', ':'))
+        # (WebSocket text, SSE frame), both built once per message
+        return text, f"data: {text}\n\n".encode('utf-8')
+
+    def _snapshot(self) -> tuple:
+        return self._encode({"type": "snapshot", "v": self.version, "cameras": self._state, "ts": time.time()})
+
+    def _publish(self, message: tuple) -> None:
+        for q in list(self._subscribers):
+            try:
+                q.put_nowait(message)
+            except asyncio.QueueFull:
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(self._snapshot())
+                self.resyncs += 1
+
+    async def subscribe(self) -> "asyncio.Queue[tuple]":
+        loop = asyncio.get_running_loop()
+        if not self._subscribers or self._task is None or self._task.done() or self._loop is not loop:
+            # nobody was watching: start from the present instead of replaying a diff
+            self._state = self.current()
+            self._loop = loop
+            self._task = loop.create_task(self._run())
+        q: "asyncio.Queue[tuple]" = asyncio.Queue(maxsize=self.queue_size)
+        q.put_nowait(self._snapshot())
+        self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: "asyncio.Queue[tuple]") -> None:
+        self._subscribers.discard(q)
+
+    async def _run(self) -> None:
+        last_sent = time.monotonic()
+        while self._subscribers:
+            await asyncio.sleep(self.interval)
+            new = self.current()
+            delta = self.diff(self._state, new)
+            if delta:
+                self._state = new
+                self.version += 1
+                self.deltas += 1
+                self._publish(self._encode({"type": "delta", "v": self.version, "cameras": delta, "ts": time.time()}))
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= self.heartbeat:
+                # keeps proxies from closing idle streams and surfaces dead sockets
+                self._publish(self._encode({"type": "ping", "v": self.version}))
+                last_sent = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "version": self.version,
+            "deltas": self.deltas,
+            "resyncs": self.resyncs,
+            "producerRunning": bool(self._task is not None and not self._task.done()),
+        }
+
+
+_state_broadcaster = _StateBroadcaster()
+
+
+@app.get('/api/stream/state')
+async def stream_state():
+    q = await _state_broadcaster.subscribe()
+
+    async def events():
+        try:
+            while True:
+                _, frame = await q.get()
+                yield frame
+        finally:
+            _state_broadcaster.unsubscribe(q)
+    return StreamingResponse(events(), media_type='text/event-stream', headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.websocket('/ws/state')
+async def ws_state(ws: WebSocket):
+    await ws.accept()
+    q = await _state_broadcaster.subscribe()
+    try:
+        while True:
+            text, _ = await q.get()
+            await ws.send_text(text)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        _state_broadcaster.unsubscribe(q)
+
+
+@app.get('/api/stream/stats')
+def stream_stats():
+    return _state_broadcaster.stats()
+
+
+#########################
+# Supervisor & Backups  #
+#########################
+
+@app.get('/api/supervisor')
+def supervisor_status():
+    data = _supervisor.stats()
+    if _camera_pool is not None:
+        for cam_id in _camera_pool.cameras():
+            remote = (_camera_pool.remote_stats(cam_id) or {}).get('supervisor')
+            if remote:
+                data["cameras"][cam_id] = remote
+        data["workerRestarts"] = _camera_pool.worker_restarts
+    return data
+
+
+def _perceptual_hash(frame: Any) -> int:
+    """64-bit difference hash of a frame (9x8 gray thumbnail, row gradients)."""
+    thumb = cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA)
+    if thumb.ndim == 3:
+        thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+    bits = (thumb[:, 1:] > thumb[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class _SnapshotStore:
+    """Snapshot backups on disk with an in-memory per-camera index.
+
+    The directory is scanned once (rebuild_index) at startup; after that
+    every write appends to the camera's deque and evicts from its head, so
+    quota enforcement is O(1) per write no matter how many files exist.
+    Writes go through a small queue to a background writer. Frames whose
+    perceptual hash is within `dedupe_distance` bits of the camera's last
+    stored snapshot are skipped.
+    """
+
+    def __init__(self, root: Path, max_files_per_camera: int = 100, max_bytes_per_camera: int = 0, dedupe_distance: int = 4):
+        self.root = root
+        self.max_files_per_camera = max(1, max_files_per_camera)
+        self.max_bytes_per_camera = max(0, max_bytes_per_camera)
+        self.dedupe_distance = dedupe_distance
+        self._lock = threading.Lock()
+        self._index: Dict[str, deque] = {}
+        self._bytes: Dict[str, int] = {}
+        self._last_hash: Dict[str, int] = {}
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=64)
+        self._writer: Optional[threading.Thread] = None
+        self.writes = 0
+        self.evictions = 0
+        self.duplicates_skipped = 0
+        self.queue_full_dropped = 0
+
+    @classmethod
+    def from_config(cls) -> "_SnapshotStore":
+        sc = get_config().get('storage', {}).get('snapshots', {}) or {}
+        return cls(
+            Path(os.getenv('SNAPSHOT_DIR') or BASE_DIR / 'storage' / 'snapshots'),
+            max_files_per_camera=int(sc.get('max_per_camera', 100)),
+            max_bytes_per_camera=int(sc.get('max_bytes_per_camera', 0)),
+            dedupe_distance=int(sc.get('dedupe_distance', 4)),
+        )
+
+    def rebuild_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        entries: Dict[str, list] = {}
+        for p in self.root.glob('*.jpg'):
+            cam_id, _, ts = p.stem.rpartition('-')
+            if not cam_id or not ts.isdigit():
+                continue
+            try:
+                size = p.stat().st_size
+            except OSError:
+                continue
+            entries.setdefault(cam_id, []).append((int(ts), p, size))
+        with self._lock:
+            self._index = {cam: deque(sorted(items)) for cam, items in entries.items()}
+            self._bytes = {cam: sum(size for _, _, size in items) for cam, items in entries.items()}
+        for cam_id in list(self._index):
+            with self._lock:
+                self._enforce_quota(cam_id)
+
+    def _enforce_quota(self, cam_id: str) -> None:
+        idx = self._index.get(cam_id)
+        while idx and (len(idx) > self.max_files_per_camera or (self.max_bytes_per_camera and self._bytes[cam_id] > self.max_bytes_per_camera)):
+            _, path, size = idx.popleft()
+            self._bytes[cam_id] -= size
+            self.evictions += 1
+            try:
+                path.unlink(missing_ok=True)  # type: ignore
+            except Exception:
+                pass
+
+    def submit(self, cam_id: str, jpeg: bytes, frame: Any = None) -> bool:
+        """Queue a snapshot for writing; False if skipped as duplicate or dropped."""
+        if frame is not None and self.dedupe_distance >= 0:
+            phash = _perceptual_hash(frame)
+            last = self._last_hash.get(cam_id)
+            if last is not None and (phash ^ last).bit_count() <= self.dedupe_distance:
+                self.duplicates_skipped += 1
+                return False
+            self._last_hash[cam_id] = phash
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="snapshot-writer", daemon=True)
+            self._writer.start()
+        try:
+            self._queue.put_nowait((cam_id, int(time.time()), jpeg))
+            return True
+        except queue.Full:
+            self.queue_full_dropped += 1
+            return False
+
+    def _write_loop(self) -> None:
+        while True:
+            cam_id, ts, data = self._queue.get()
+            path = self.root / f"{cam_id}-{ts}.jpg"
+            try:
+                with open(path, 'wb') as f:
+                    f.write(data)
+            except Exception:
+                continue
+            with self._lock:
+                idx = self._index.setdefault(cam_id, deque())
+                if idx and idx[-1][1] == path:
+                    # same second overwrite: replace the index entry in place
+                    _, _, old_size = idx.pop()
+                    self._bytes[cam_id] -= old_size
+                idx.append((ts, path, len(data)))
+                self._bytes[cam_id] = self._bytes.get(cam_id, 0) + len(data)
+                self.writes += 1
+                self._enforce_quota(cam_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cams = {cam: {"files": len(idx), "bytes": self._bytes.get(cam, 0)} for cam, idx in self._index.items()}
+        return {
+            "cameras": cams,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "duplicatesSkipped": self.duplicates_skipped,
+            "queueDepth": self._queue.qsize(),
+            "queueFullDropped": self.queue_full_dropped,
+        }
+
+
+_snapshot_store = _SnapshotStore.from_config()
 
-def _snapshot_backup_loop():
-    backup_dir = BASE_DIR / 'storage' / 'snapshots'
-    backup_dir.mkdir(parents=True, exist_ok=True)
-    retention = 100
+
+def _snapshot_backup_loop(stop: Optional[threading.Event] = None):
+    stop = stop or threading.Event()
+    _snapshot_store.rebuild_index()
+    # no cv2 check up front: there are only frames to back up once a camera
+    # pipeline runs, and that has imported cv2 already
     while True:
+        for cam_id in list(_camera_state):
+            _refresh_camera(cam_id, frame=True)
         for cam_id, frame in list(_last_frames.items()):
             try:
-                if cv2 is None:
-                    continue
-                ok, buf = cv2.imencode('.jpg', frame)
-                if not ok:
+                snap = _snapshots.jpeg(cam_id)
+                if snap is None or snap[1] is None:
                     continue
-                ts = int(time.time())
-                path = backup_dir / f"{cam_id}-{ts}.jpg"
-                with open(path, 'wb') as f:
-                    f.write(buf.tobytes())
+                _snapshot_store.submit(cam_id, snap[1], frame)
             except Exception:
                 pass
-        # retention
-        try:
-            files = sorted([p for p in backup_dir.glob('*.jpg')], key=lambda p: p.stat().st_mtime, reverse=True)
-            for p in files[retention:]:
-                try:
-                    p.unlink(missing_ok=True)  # type: ignore
-                except Exception:
-                    pass
-        except Exception:
-            pass
-        time.sleep(60)
+        if stop.wait(60):
+            return
+
+
+@app.get('/api/snapshots/backup')
+def snapshot_backup_stats():
+    return _snapshot_store.stats()
+
+
+#########################
+# Startup / lifespan     #
+#########################
+
+
+def _prewarm_targets() -> List[str]:
+    """Lazy modules to import in the background right after startup.
+
+    `auto` picks what the registered cameras will need (cv2, plus mediapipe /
+    onnxruntime / ultralytics when a global or per-camera toggle enables
+    them) and nothing when no camera is registered; `none` or a comma list
+    override it.
+    """
+    setting = os.getenv('PREWARM_IMPORTS') or (get_config().get('startup', {}) or {}).get('prewarm_imports', 'auto')
+    setting = str(setting).strip().lower()
+    if setting in ('', 'none', 'false', 'no', '0'):
+        return []
+    if setting != 'auto':
+        return [name.strip() for name in setting.split(',') if name.strip() in _lazy_modules]
+    entries = [e for e in _camera_registry.entries() if e["enabled"]]
+    if not entries:
+        return []
+
+    def wanted(toggle: str) -> bool:
+        return any(e["toggles"].get(toggle, _toggles.get(toggle, False)) for e in entries)
 
-_watchdog_thread = threading.Thread(target=_watchdog_loop, daemon=True)
-_watchdog_thread.start()
-_backup_thread = threading.Thread(target=_snapshot_backup_loop, daemon=True)
-_backup_thread.start()
+    names = ['cv2']
+    if wanted('pose_enabled') or wanted('hands_enabled'):
+        names.append('mediapipe')
+    if wanted('onnx_enabled'):
+        names.append('onnxruntime')
+    if wanted('yolo_enabled'):
+        names.append('ultralytics')
+    return names
+
+
+def _prewarm_imports(names: List[str]) -> None:
+    for name in names:
+        bool(_lazy_modules[name])
+
+
+_background_started: Dict[str, Any] = {}
+
+
+def _start_background(stop: threading.Event) -> None:
+    """API-process loops. Started by the app lifespan rather than at import, so
+    tests and spawned camera workers that only import this module stay idle."""
+    started = time.perf_counter()
+    threading.Thread(target=_supervisor_loop, args=(stop,), name="camera-supervisor", daemon=True).start()
+    threading.Thread(target=_snapshot_backup_loop, args=(stop,), name="snapshot-backup", daemon=True).start()
+    threading.Thread(target=_tts_prewarm, name="tts-prewarm", daemon=True).start()
+    prewarm = _prewarm_targets()
+    if prewarm:
+        threading.Thread(target=_prewarm_imports, args=(prewarm,), name="import-prewarm", daemon=True).start()
+    # replay whatever an earlier run could not deliver
+    _event_emitter.start()
+    if str(os.getenv('CAMERA_WARM_START') or get_config().get('camera', {}).get('warm_start', True)).lower() not in ('0', 'false', 'no'):
+        threading.Thread(target=_warm_start_cameras, name="camera-warm-start", daemon=True).start()
+    _background_started.update(at=time.time(), sec=round(time.perf_counter() - started, 4), prewarm=prewarm)
+
+
+@app.get('/api/startup/imports')
+def startup_imports():
+    return {
+        "moduleImportSec": round(sum(sec for _, sec in _import_phases), 4),
+        "phases": [{"phase": phase, "sec": sec} for phase, sec in _import_phases],
+        "background": dict(_background_started),
+        "lazy": {name: module.info() for name, module in _lazy_modules.items()},
+    }
 
 
 #########################
@@ -814,12 +4475,20 @@ def power_status():
 def list_cameras():
     out = []
     now = time.time()
-    for cam_id, st in _camera_state.items():
+    for cam_id, st in list(_camera_state.items()):
+        _refresh_camera(cam_id)
+        entry = _camera_registry.get(cam_id)
         out.append({
             'id': cam_id,
             'url': st.url,
             'lastFrameAgoSec': (now - (st.last_frame_ts or 0)) if st.last_frame_ts else None,
+            'persisted': entry is not None,
         })
+    # registered but stopped/disabled cameras, so a UI can offer to start them
+    for entry in _camera_registry.entries():
+        if entry['id'] not in _camera_state:
+            out.append({'id': entry['id'], 'url': entry['url'], 'lastFrameAgoSec': None, 'persisted': True,
+                        'enabled': entry['enabled']})
     return {'items': out}
 
 
@@ -852,5 +4521,33 @@ def set_toggles(req: ToggleSetReq):
         _toggles['yolo_enabled'] = bool(req.yolo_enabled)
     if req.onnx_enabled is not None:
         _toggles['onnx_enabled'] = bool(req.onnx_enabled)
+    if _camera_pool is not None:
+        # worker processes hold their own copy; face blur must apply there too
+        _camera_pool.broadcast_toggles(_toggles)
     return { **_toggles }
 
+
+@app.post('/api/camera/{cam_id}/toggles')
+def set_camera_toggles(cam_id: str, req: ToggleSetReq):
+    """Per-camera overrides of the global toggles; persisted with the camera."""
+    entry = _camera_registry.get(cam_id)
+    if cam_id not in _camera_state and entry is None:
+        return JSONResponse({"error": "not found"}, status_code=404)
+    overrides = {**(entry["toggles"] if entry else _camera_toggles.get(cam_id, {})), **req.model_dump(exclude_none=True)}
+    _camera_toggles[cam_id] = overrides
+    _camera_registry.upsert(cam_id, toggles=overrides)
+    if _camera_pool is not None:
+        _camera_pool.set_toggles(cam_id, overrides)
+    return {"overrides": overrides, "effective": {name: _toggle(cam_id, name) for name in _toggles}}
+
+
+@app.delete('/api/camera/{cam_id}/toggles')
+def reset_camera_toggles(cam_id: str):
+    _camera_toggles[cam_id] = {}
+    _camera_registry.upsert(cam_id, toggles={})
+    if _camera_pool is not None:
+        _camera_pool.set_toggles(cam_id, {})
+    return {"overrides": {}, "effective": {name: _toggle(cam_id, name) for name in _toggles}}
+
+
+_mark_import('state and routes')
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+CareNest Enterprise pipeline benchmark.
+
+Drives the real camera pipeline (main._process_stream) from synthetic frames
+or a local video file instead of RTSP, with a local stand-in for the alerts
+API, and scales from 1 to N cameras. For every level it reports per-stage
+latency, sustained analysed FPS per camera, process CPU and RSS, and writes
+machine-readable JSON so runs can be compared between commits.
+
+Examples:
+  python scripts/bench_pipeline.py --cameras 1,2,4 --duration 20
+  python scripts/bench_pipeline.py --source clips/fall.mp4 --cameras 4 --out bench.json
+"""
+
+from __future__ import annotations
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def load_main() -> Any:
+    # everything the app persists goes to a scratch dir: synthetic events left
+    # in storage/events.db would be replayed to the real API on its next start
+    scratch = Path(tempfile.mkdtemp(prefix='carenest-bench-'))
+    os.environ['EVENT_JOURNAL_PATH'] = str(scratch / 'events.db')
+    os.environ['TTS_CACHE_DIR'] = str(scratch / 'tts')
+    os.environ['SNAPSHOT_DIR'] = str(scratch / 'snapshots')
+    os.environ['CAMERA_REGISTRY_PATH'] = str(scratch / 'cameras.json')
+    os.environ['CAMERA_WARM_START'] = 'false'
+    sys.path.insert(0, str(BASE_DIR))
+    return importlib.import_module('main')
+
+
+class SyntheticCapture:
+    """VideoCapture-like source: bouncing shapes plus a figure that falls
+    over every `fall_every` seconds, paced to `fps`."""
+
+    def __init__(self, width: int, height: int, fps: float, fall_every: float = 8.0, seed: int = 0):
+        import numpy as np
+        self.np = np
+        self.width, self.height = width, height
+        self.interval = 1.0 / max(fps, 0.1)
+        self.fall_every = fall_every
+        rng = np.random.default_rng(seed)
+        self.shapes = [
+            [rng.uniform(0, width), rng.uniform(0, height), rng.uniform(-8, 8), rng.uniform(-8, 8), int(rng.uniform(20, 60))]
+            for _ in range(3)
+        ]
+        self.background = np.tile(np.linspace(40, 90, width, dtype=np.uint8), (height, 1))
+        self.started = time.time()
+        self.next_at = self.started
+
+    def isOpened(self) -> bool:
+        return True
+
+    def _draw_figure(self, cv2: Any, frame: Any, t: float) -> None:
+        phase = (t % self.fall_every) / self.fall_every
+        # standing for the first 60% of the cycle, then tipping over and lying still
+        angle = 0.0 if phase < 0.6 else min(90.0, (phase - 0.6) * 900.0)
+        cx, base_y = self.width // 2, int(self.height * 0.85)
+        length = self.height // 3
+        rad = self.np.deg2rad(angle)
+        head = (int(cx + length * self.np.sin(rad)), int(base_y - length * self.np.cos(rad)))
+        cv2.line(frame, (cx, base_y), head, (200, 200, 200), 18)
+        cv2.circle(frame, head, 28, (220, 210, 200), -1)
+
+    def read(self) -> tuple:
+        import cv2
+        delay = self.next_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_at = max(self.next_at + self.interval, time.time() - self.interval)
+        frame = cv2.cvtColor(self.background, cv2.COLOR_GRAY2BGR)
+        for s in self.shapes:
+            s[0] += s[2]
+            s[1] += s[3]
+            if not 0 <= s[0] <= self.width:
+                s[2] = -s[2]
+            if not 0 <= s[1] <= self.height:
+                s[3] = -s[3]
+            cv2.circle(frame, (int(s[0]), int(s[1])), s[4], (30, 160, 230), -1)
+        self._draw_figure(cv2, frame, time.time() - self.started)
+        return True, frame
+
+    def release(self) -> None:
+        pass
+
+
+class PacedFileCapture:
+    """Plays a local video file in a loop at its own frame rate (or `fps`)."""
+
+    def __init__(self, path: str, fps: Optional[float] = None):
+        import cv2
+        self.cv2 = cv2
+        self.cap = cv2.VideoCapture(path)
+        native = self.cap.get(cv2.CAP_PROP_FPS) or 0
+        self.interval = 1.0 / (fps or native or 15.0)
+        self.next_at = time.time()
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def read(self) -> tuple:
+        delay = self.next_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_at = max(self.next_at + self.interval, time.time() - self.interval)
+        ok, frame = self.cap.read()
+        if not ok:
+            self.cap.set(self.cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        return ok, frame
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+class FakeAlertsApi:
+    """Counts POST /alerts/events locally so events never leave the box."""
+
+    def __init__(self) -> None:
+        counts: Dict[str, int] = {}
+        lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get('content-length') or 0))
+                try:
+                    kind = str(json.loads(body or b'{}').get('type', 'unknown'))
+                except ValueError:
+                    kind = 'invalid'
+                with lock:
+                    counts[kind] = counts.get(kind, 0) + 1
+                self.send_response(201)
+                self.send_header('content-type', 'application/json')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self.counts = counts
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+    def close(self) -> None:
+        self.server.shutdown()
+
+
+def point_config_at(main: Any, api_url: str) -> None:
+    cfg_path = BASE_DIR / 'config.yaml'
+    cfg = yaml.safe_load(cfg_path.read_text(encoding='utf-8')) if cfg_path.exists() else {}
+    cfg = cfg or {}
+    cfg.setdefault('api', {})['base_url'] = api_url
+    tmp = Path(tempfile.mkdtemp(prefix='carenest-bench-')) / 'config.yaml'
+    tmp.write_text(yaml.safe_dump(cfg), encoding='utf-8')
+    main._config_store = main._ConfigStore(tmp)
+
+
+def process_usage() -> Dict[str, float]:
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    rss_mb = 0.0
+    try:
+        import psutil  # type: ignore
+        rss_mb = psutil.Process().memory_info().rss / 1e6
+    except Exception:
+        # ru_maxrss is KiB on Linux (peak, not current)
+        rss_mb = ru.ru_maxrss / 1024.0
+    return {"cpuSec": ru.ru_utime + ru.ru_stime, "rssMb": rss_mb}
+
+
+def stage_summary(before: Dict[tuple, list], after: Dict[tuple, list], buckets: tuple) -> Dict[str, Dict[str, float]]:
+    per_stage: Dict[str, list] = {}
+    for labels, h in after.items():
+        prev = before.get(labels, [0] * len(h))
+        diff = [a - b for a, b in zip(h, prev)]
+        acc = per_stage.setdefault(labels[1], [0] * len(h))
+        for i, v in enumerate(diff):
+            acc[i] += v
+    out = {}
+    for stage, h in sorted(per_stage.items()):
+        count = sum(h[:-1])
+        if not count:
+            continue
+
+        def quantile(q: float) -> float:
+            seen = 0
+            for le, c in zip(list(buckets) + [float('inf')], h[:-1]):
+                seen += c
+                if seen >= q * count:
+                    return le * 1000.0
+            return float('inf')
+
+        out[stage] = {
+            "count": count,
+            "meanMs": round(h[-1] / count * 1000.0, 3),
+            "p50MsUpper": quantile(0.5),
+            "p95MsUpper": quantile(0.95),
+        }
+    return out
+
+
+def run_level(main: Any, n_cameras: int, duration: float, url: str, fps: int, api: FakeAlertsApi) -> Dict[str, Any]:
+    cam_ids = [f"bench{n_cameras}-{i}" for i in range(n_cameras)]
+    stages_before = main._stage_latency.collect()
+    events_before = api.snapshot()
+    for cam_id in cam_ids:
+        main._camera_state[cam_id] = main.CameraState(url=url)
+        main._stop_flags[cam_id] = False
+        t = threading.Thread(target=main._process_stream, args=(cam_id, url, fps), daemon=True)
+        main._camera_threads[cam_id] = t
+        t.start()
+    # let models load and the first frames flow before measuring
+    time.sleep(min(5.0, duration / 4))
+    frames_before = {c: main._pipeline_stats.get(c, {}).get("framesAnalyzed", 0) for c in cam_ids}
+    usage_before = process_usage()
+    started = time.time()
+    time.sleep(duration)
+    elapsed = time.time() - started
+    usage_after = process_usage()
+    frames_after = {c: main._pipeline_stats.get(c, {}).get("framesAnalyzed", 0) for c in cam_ids}
+    cameras = {}
+    for c in cam_ids:
+        grabber = main._frame_grabbers.get(c)
+        cameras[c] = {
+            "fps": round((frames_after[c] - frames_before[c]) / elapsed, 2),
+            "avgLatencyMs": main._pipeline_stats.get(c, {}).get("avgLatencyMs"),
+            "capture": grabber.stats() if grabber else None,
+        }
+    for c in cam_ids:
+        main._stop_flags[c] = True
+    for c in cam_ids:
+        main._camera_threads[c].join(timeout=5)
+        main._camera_state.pop(c, None)
+    events_after = api.snapshot()
+    fps_values = [v["fps"] for v in cameras.values()]
+    return {
+        "cameras": n_cameras,
+        "durationSec": round(elapsed, 2),
+        "fpsPerCamera": {"min": min(fps_values), "mean": round(sum(fps_values) / len(fps_values), 2)},
+        "cpuPercent": round((usage_after["cpuSec"] - usage_before["cpuSec"]) / elapsed * 100.0, 1),
+        "rssMb": round(usage_after["rssMb"], 1),
+        "stages": stage_summary(stages_before, main._stage_latency.collect(), main._STAGE_BUCKETS),
+        "events": {k: events_after.get(k, 0) - events_before.get(k, 0) for k in events_after},
+        "perCamera": cameras,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the CareNest camera pipeline")
+    parser.add_argument('--cameras', default='1,2,4', help='comma separated camera counts to run, e.g. 1,2,4,8')
+    parser.add_argument('--duration', type=float, default=20.0, help='measured seconds per level')
+    parser.add_argument('--source', default='synthetic', help="'synthetic' or a path to a local video file")
+    parser.add_argument('--size', default='1280x720', help='synthetic frame size WxH')
+    parser.add_argument('--source-fps', type=float, default=None,
+                        help="frames per second the source produces (synthetic: 15; file: the file's own rate)")
+    parser.add_argument('--fps', type=int, default=10, help='requested analysis fps per camera')
+    parser.add_argument('--out', help='write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    main_mod = load_main()
+    if not main_mod.cv2:
+        print("cv2/numpy not available; cannot run the pipeline", file=sys.stderr)
+        return 2
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    if args.source == 'synthetic':
+        url = 'synthetic://bench'
+        main_mod._capture_factories['synthetic'] = lambda _url, _cam: SyntheticCapture(width, height, args.source_fps or 15.0)
+    else:
+        path = str(Path(args.source).resolve())
+        url = f'benchfile://{path}'
+        main_mod._capture_factories['benchfile'] = lambda _url, _cam: PacedFileCapture(path, args.source_fps)
+
+    api = FakeAlertsApi()
+    point_config_at(main_mod, api.url)
+    results = {
+        "revision": git_revision(),
+        "ts": time.time(),
+        "host": {"python": platform.python_version(), "cpus": os.cpu_count(), "machine": platform.machine()},
+        "params": vars(args),
+        "toggles": dict(main_mod._toggles),
+        "levels": [],
+    }
+    try:
+        for n in (int(v) for v in args.cameras.split(',') if v.strip()):
+            level = run_level(main_mod, n, args.duration, url, args.fps, api)
+            results["levels"].append(level)
+            print(f"{n} camera(s): {level['fpsPerCamera']['mean']} fps/cam, cpu {level['cpuPercent']}%, rss {level['rssMb']} MB", file=sys.stderr)
+    finally:
+        api.close()
+    payload = json.dumps(results, indent=2, default=str)
+    if args.out:
+        Path(args.out).write_text(payload + "\n", encoding='utf-8')
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
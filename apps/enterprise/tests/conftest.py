@@ -0,0 +1,12 @@
+import os
+import tempfile
+
+# Point every file the app persists at a scratch dir before any test imports
+# main: test events left in storage/events.db would be replayed to the real
+# alerts API the next time the service starts.
+_scratch = tempfile.mkdtemp(prefix='carenest-tests-')
+os.environ['EVENT_JOURNAL_PATH'] = os.path.join(_scratch, 'events.db')
+os.environ['TTS_CACHE_DIR'] = os.path.join(_scratch, 'tts')
+os.environ['SNAPSHOT_DIR'] = os.path.join(_scratch, 'snapshots')
+os.environ['CAMERA_REGISTRY_PATH'] = os.path.join(_scratch, 'cameras.json')
+os.environ['CAMERA_WARM_START'] = 'false'
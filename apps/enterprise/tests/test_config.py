@@ -0,0 +1,31 @@
+import importlib
+import os
+import time
+
+
+def _main():
+    return importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+
+
+def test_config_snapshot_reloads_only_on_change(tmp_path):
+    main = _main()
+    cfg_file = tmp_path / 'config.yaml'
+    cfg_file.write_text('system:\n  env: one\n', encoding='utf-8')
+    store = main._ConfigStore(cfg_file, check_interval=0.0)
+    assert store.get()['system']['env'] == 'one'
+    assert store.get()['system']['env'] == 'one'
+    assert store.reload_count == 1
+    cfg_file.write_text('system:\n  env: two\n', encoding='utf-8')
+    os.utime(cfg_file, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+    assert store.get()['system']['env'] == 'two'
+    assert store.reload_count == 2
+
+
+def test_config_snapshot_is_read_only():
+    main = _main()
+    cfg = main.get_config()
+    try:
+        cfg['system'] = {}  # type: ignore[index]
+    except TypeError:
+        return
+    raise AssertionError('config snapshot should be immutable')
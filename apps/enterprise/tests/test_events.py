@@ -0,0 +1,172 @@
+import importlib
+import time
+
+
+def _main():
+    return importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+
+
+def test_emitter_coalesces_and_keeps_falls():
+    main = _main()
+    # long linger keeps the worker from draining while we inspect the queue
+    emitter = main._EventEmitter(max_queue=2, linger=30.0)
+    assert emitter.emit('cam1', 'motion', {"motionPixels": 1})
+    assert emitter.emit('cam1', 'motion', {"motionPixels": 2})
+    assert emitter.queue_depth() == 1
+    assert emitter.coalesced == 1
+    assert emitter.emit('cam1', 'fall', {})
+    assert emitter.emit('cam1', 'fall', {})
+    # queue full of falls: the motion event was evicted, falls are all kept
+    assert emitter.queue_depth() == 2
+    assert emitter.dropped == 1
+    assert not emitter.emit('cam1', 'gesture', {"name": "open_palm"})
+
+
+def test_event_tracker_turns_frames_into_episodes():
+    main = _main()
+    sent = []
+    tracker = main._EventTracker(lambda cam, kind, details: sent.append((kind, details.get('phase'))) or True, tick_interval=3600)
+    # a single-frame blip never leaves the box
+    tracker.observe('cam1', 'motion', {"motionRatio": 0.5}, now=0.0)
+    tracker.tick(now=20.0)
+    assert sent == [] and tracker.debounced == 1
+    # ten minutes of motion at 10 fps
+    t = 100.0
+    for i in range(6000):
+        tracker.observe('cam1', 'motion', {"motionRatio": 0.02 + (i == 42) * 0.5}, now=t)
+        t += 0.1
+    tracker.tick(now=t + 16.0)
+    phases = [p for kind, p in sent if kind == 'motion']
+    assert phases[0] == 'start' and phases[-1] == 'end'
+    assert phases.count('ongoing') == 4 and len(phases) == 6
+    # falls bypass dwell and rate limits entirely
+    for _ in range(5):
+        tracker.observe('cam1', 'fall', {"confidence": 0.9}, now=t)
+    assert [k for k, _ in sent].count('fall') == 5
+
+
+def test_event_tracker_rate_limit_keeps_episode_end():
+    main = _main()
+    sent = []
+    tracker = main._EventTracker(lambda cam, kind, details: sent.append(details) or True, tick_interval=3600)
+    rule = {'min_dwell_sec': 0.0, 'end_after_sec': 1.0, 'summary_sec': 0.5, 'rate_per_min': 0.0, 'burst': 1}
+    tracker.rule = lambda cam_id, event_type: rule
+    t = 0.0
+    for _ in range(50):
+        tracker.observe('cam1', 'gesture', {"name": "open_palm"}, now=t)
+        t += 0.1
+    tracker.tick(now=t + 2.0)
+    assert [d['phase'] for d in sent] == ['start', 'end']
+    assert sent[-1]['count'] == 50 and sent[-1]['rateLimitedUpdates'] > 0
+
+
+def test_emitter_never_coalesces_episode_markers():
+    main = _main()
+    emitter = main._EventEmitter(linger=30.0)
+    emitter.emit('cam1', 'gesture', {"phase": "start"})
+    emitter.emit('cam1', 'gesture', {"phase": "end"})
+    assert emitter.queue_depth() == 2
+
+
+def test_back_to_back_episodes_keep_their_order_during_outage(tmp_path):
+    main = _main()
+    # no sender thread: everything stays in the journal, as during an outage
+    emitter = main._EventEmitter(journal=main._EventJournal(tmp_path / 'events.db', max_events=100), sender=False)
+    tracker = main._EventTracker(emitter.emit, tick_interval=3600)
+    rule = {'min_dwell_sec': 0.0, 'end_after_sec': 2.0, 'summary_sec': 1.0, 'rate_per_min': 600.0, 'burst': 10}
+    tracker.rule = lambda cam_id, event_type: rule
+    for start in (0.0, 10.0):
+        t = start
+        while t < start + 3.5:
+            tracker.observe('cam1', 'motion', {"motionRatio": 0.1}, now=t)
+            t += 0.1
+        tracker.tick(now=t + 3.0)
+    rows = emitter.journal.peek(20)
+    assert [(r["details"]["phase"], r["details"]["startedAt"]) for r in rows] == [
+        ('start', 0.0), ('ongoing', 0.0), ('end', 0.0),
+        ('start', 10.0), ('ongoing', 10.0), ('end', 10.0),
+    ]
+    assert rows[1]["details"]["repeats"] > 1
+
+
+def test_event_journal_survives_restart_in_order(tmp_path):
+    main = _main()
+    path = tmp_path / 'events.db'
+    journal = main._EventJournal(path, max_events=100)
+    ids = [journal.append('cam1', 'fall', {"n": i}, critical=True) for i in range(3)]
+    journal.append('cam1', 'motion', {"n": 1}, coalesce_key='cam1/motion')
+    in_flight = journal.peek(10)[-1]
+    # rewritten while "in flight": the stale ack must not delete the newer version
+    journal.append('cam1', 'motion', {"n": 2}, coalesce_key='cam1/motion')
+    assert not journal.ack(in_flight["seq"], in_flight["rev"])
+    reopened = main._EventJournal(path, max_events=100)
+    rows = reopened.peek(10)
+    assert [r["id"] for r in rows[:3]] == ids
+    assert rows[3]["details"] == {"n": 2, "repeats": 2}
+    assert reopened.ack(rows[0]["seq"], rows[0]["rev"]) and reopened.count() == 3
+    # contains() is polled by id; it must not scan the table
+    plan = reopened._db.execute('EXPLAIN QUERY PLAN SELECT 1 FROM events WHERE id=?', ('x',)).fetchall()
+    assert any('events_id' in str(step) for step in plan)
+
+
+def test_emitter_replays_journal_after_outage(tmp_path):
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    main = _main()
+    received = []
+    outage = threading.Event()
+    outage.set()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['content-length']))
+            if outage.is_set():
+                self.send_response(503)
+            else:
+                received.append((self.headers['Idempotency-Key'], main.json.loads(body)))
+                self.send_response(201)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cfg = tmp_path / 'config.yaml'
+    cfg.write_text(f'api:\n  base_url: http://127.0.0.1:{server.server_address[1]}\n', encoding='utf-8')
+    original_store = main._config_store
+    main._config_store = main._ConfigStore(cfg)
+    try:
+        emitter = main._EventEmitter(main._EventJournal(tmp_path / 'events.db'), linger=0.0, max_retry_wait=0.2)
+        ids = [emitter.submit('cam1', 'fall', {"n": i}) for i in range(5)]
+        time.sleep(0.5)
+        assert received == [] and emitter.queue_depth() == 5 and emitter.failed >= 1
+        outage.clear()
+        assert emitter.wait_delivered(ids[-1], timeout=5.0)
+    finally:
+        main._config_store = original_store
+        server.shutdown()
+    assert [key for key, _ in received] == ids
+    assert [body["details"]["n"] for _, body in received] == list(range(5))
+    assert received[0][1]["details"]["eventId"] == ids[0]
+
+
+def test_journal_keys_each_revision_and_dead_letters_rejects(tmp_path):
+    main = _main()
+    journal = main._EventJournal(tmp_path / 'events.db', max_events=100)
+    first = journal.append('cam1', 'motion', {"n": 1}, coalesce_key='cam1/motion')
+    second = journal.append('cam1', 'motion', {"n": 2}, coalesce_key='cam1/motion')
+    # a rewritten payload must not reuse the key the API may already have seen
+    assert first != second and journal.peek(1)[0]["id"] == second
+    assert journal.contains(first) and journal.contains(second)
+    fall = journal.append('cam1', 'fall', {"n": 3}, critical=True)
+    rows = journal.peek(10)
+    assert journal.dead_letter(rows[1]["seq"], rows[1]["rev"], 422, 'bad payload')
+    assert not journal.contains(fall) and journal.count() == 1
+    dead = journal.dead_letters()
+    assert [(d["id"], d["type"], d["status"], d["critical"]) for d in dead] == [(fall, 'fall', 422, True)]
+    reopened = main._EventJournal(tmp_path / 'events.db', max_events=100)
+    assert reopened.stats()["deadLetters"] == 1
+    assert reopened.requeue_dead_letters() == 1
+    assert reopened.dead_letters() == [] and reopened.count() == 2
+    assert reopened.peek(10)[-1]["details"] == {"n": 3}
@@ -1,4 +1,6 @@
 import importlib
+import time
+import pytest
 from fastapi.testclient import TestClient
 
 
@@ -17,3 +19,246 @@ def test_health_analytics_endpoint():
 
 
 
+
+
+def test_snapshot_is_encoded_once_and_supports_etag():
+    import numpy as np
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    client = TestClient(main.app)
+    main._publish_frame('etagcam', np.zeros((32, 32, 3), dtype=np.uint8))
+    encodes = main._snapshots.encodes
+    r = client.get('/api/camera/etagcam/snapshot')
+    assert r.status_code == 200
+    etag = r.headers['etag']
+    r2 = client.get('/api/camera/etagcam/snapshot', headers={'If-None-Match': etag})
+    assert r2.status_code == 304
+    assert main._snapshots.encodes == encodes + 1
+    main._publish_frame('etagcam', np.ones((32, 32, 3), dtype=np.uint8))
+    assert client.get('/api/camera/etagcam/snapshot', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_metrics_merge_thread_local_histograms():
+    import threading
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    hist = main._Histograms((0.01, 0.1))
+    threads = [threading.Thread(target=lambda: [hist.observe(('cam', 'pose'), 0.05) for _ in range(10)]) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    hist.observe(('cam', 'pose'), 1.0)
+    merged = hist.collect()
+    assert merged[('cam', 'pose')][:3] == [0, 30, 1]
+    lines = hist.render('x_seconds', 'x', ('camera', 'stage'), merged)
+    assert 'x_seconds_bucket{camera="cam",stage="pose",le="0.1"} 30' in lines
+    assert 'x_seconds_count{camera="cam",stage="pose"} 31' in lines
+
+    client = TestClient(main.app)
+    client.get('/api/health-analytics')
+    text = client.get('/metrics').text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/health-analytics",status="200"}' in text
+
+
+def test_camera_gauges_read_worker_frame_time_at_scrape(monkeypatch):
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+
+    class _Pool:
+        def owns(self, cam_id):
+            return cam_id == 'pooled'
+
+        def remote_stats(self, cam_id):
+            return {}
+
+        def sync_state(self, cam_id, st):
+            # the worker's last frame was a minute ago
+            st.last_frame_ts = time.time() - 60.0
+
+    monkeypatch.setattr(main, '_camera_pool', _Pool())
+    monkeypatch.setitem(main._camera_state, 'pooled', main.CameraState(url='rtsp://x'))
+    main._camera_state['pooled'].last_frame_ts = time.time()
+    age = [g for g in main._camera_gauges() if g.startswith('carenest_camera_frame_age_seconds{camera="pooled"}')]
+    assert len(age) == 1 and float(age[0].split()[-1]) >= 60.0
+
+
+def test_tts_cache_tiers_and_offline(tmp_path, monkeypatch):
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    rendered = []
+
+    class FakeRender(main._TtsCache):
+        def _render(self, text, lang):
+            rendered.append(text)
+            return f'mp3:{lang}:{text}'.encode('utf-8')
+
+    cache = FakeRender(tmp_path, offline=False)
+    key, data = cache.get('ચેતવણી', 'gu')
+    assert cache.get('ચેતવણી', 'gu') == (key, data)
+    assert rendered == ['ચેતવણી'] and cache.memory_hits == 1
+    # a fresh offline process still serves what is on disk, and nothing else
+    offline = FakeRender(tmp_path, offline=True)
+    assert offline.get('ચેતવણી', 'gu')[1] == data and offline.disk_hits == 1
+    try:
+        offline.get('new phrase', 'gu')
+        raise AssertionError('offline cache must not render')
+    except LookupError:
+        pass
+    assert rendered == ['ચેતવણી']
+    monkeypatch.setattr(main, '_tts_cache', offline)
+    client = TestClient(main.app)
+    r = client.get('/api/tts', params={'text': 'ચેતવણી'})
+    assert r.status_code == 200 and r.content == data
+    assert client.post('/api/tts', json={'text': 'ચેતવણી'}, headers={'If-None-Match': r.headers['etag']}).status_code == 304
+    assert client.get('/api/tts', params={'text': 'new phrase'}).status_code == 503
+
+
+def test_tts_cache_follows_config_reload(tmp_path, monkeypatch):
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    cfg = tmp_path / 'config.yaml'
+    cfg.write_text('privacy:\n  no_internet: false\ntts:\n  cache_memory_mb: 1\n', encoding='utf-8')
+    monkeypatch.setattr(main, '_config_store', main._ConfigStore(cfg))
+    monkeypatch.setattr(main, '_tts_cache', None)
+    monkeypatch.setenv('TTS_CACHE_DIR', str(tmp_path / 'tts'))
+    cache = main._get_tts_cache()
+    assert cache.offline is False and cache.max_memory_bytes == 1024 * 1024
+    cache._remember('a', b'x' * 600)
+    cache._remember('b', b'y' * 600)
+
+    cfg.write_text('privacy:\n  no_internet: true\ntts:\n  cache_memory_mb: 0.001\n', encoding='utf-8')
+    main._config_store.refresh(force=True)
+    assert main._get_tts_cache() is cache
+    assert cache.offline is True and cache.max_memory_bytes == 1048
+    # shrunk to the new bound, newest entry kept
+    assert list(cache._memory) == ['b']
+    assert TestClient(main.app).get('/api/tts/cache').json()['offline'] is True
+
+
+def test_default_offline_config_still_renders_prewarm_phrases(tmp_path, monkeypatch):
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    rendered = []
+
+    def render(self, text, lang):
+        rendered.append(text)
+        return f'mp3:{lang}:{text}'.encode('utf-8')
+
+    monkeypatch.setattr(main._TtsCache, '_render', render)
+    monkeypatch.setattr(main, 'gTTS', main.gTTS or object())
+    monkeypatch.setattr(main, '_tts_cache', None)
+    monkeypatch.setenv('TTS_CACHE_DIR', str(tmp_path / 'tts'))
+    phrases = main.get_config()['tts']['prewarm']
+    # the shipped config keeps the node offline
+    assert main._get_tts_cache().offline is True
+
+    monkeypatch.setattr(main, '_tts_reachable', lambda: False)
+    assert main._tts_prewarm() == 0 and rendered == []
+    monkeypatch.setattr(main, '_tts_reachable', lambda: True)
+    assert main._tts_prewarm() == len(phrases) and rendered == list(phrases)
+
+    client = TestClient(main.app)
+    assert client.get('/api/tts', params={'text': phrases[0]}).status_code == 200
+    # ad-hoc phrases stay cache-only
+    assert client.get('/api/tts', params={'text': 'not configured'}).status_code == 503
+    assert len(rendered) == len(phrases)
+
+
+def test_state_stream_sends_snapshot_then_deltas(monkeypatch):
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    monkeypatch.setattr(main, '_state_broadcaster', main._StateBroadcaster(interval=0.05))
+    main._camera_state['streamcam'] = main.CameraState(url='rtsp://x')
+    try:
+        client = TestClient(main.app)
+        with client.websocket_connect('/ws/state') as ws:
+            first = ws.receive_json()
+            assert first['type'] == 'snapshot'
+            assert first['cameras']['streamcam'] == {'motion': False, 'fall': False, 'age': 'none'}
+            main._camera_state['streamcam'].fall = True
+            delta = ws.receive_json()
+            assert delta['type'] == 'delta' and delta['v'] == first['v'] + 1
+            assert delta['cameras'] == {'streamcam': {'motion': False, 'fall': True, 'age': 'none'}}
+    finally:
+        main._camera_state.pop('streamcam', None)
+    assert main._StateBroadcaster.diff({'a': 1, 'b': 2}, {'a': 1, 'c': 3}) == {'c': 3, 'b': None}
+
+
+def test_timeseries_rollups_and_worker_merge():
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    store = main._TimeSeriesStore()
+    t0 = 1_700_000_040.0  # minute-aligned
+    for i in range(120):
+        store.record('ts', t0 + i * 0.5, {"active": 1.0, "motionRatio": i / 120, "fps": 10.0})
+    store.record('ts', t0 + 59.5, {"fallScore": 0.9})
+    now = t0 + 180
+    fine = store.query('ts', 60, 10, now=now)
+    assert fine["resolutionSec"] == 1 and fine["stepSec"] == 10 and len(fine["t"]) == 6
+    coarse = store.query('ts', 7200, 60, now=now)
+    assert coarse["resolutionSec"] == 60 and len(coarse["t"]) == 120
+    last = coarse["series"]["fallScore"]["max"]
+    assert last[-4] == pytest.approx(0.9) and last[-1] is None
+    assert coarse["series"]["fps"]["mean"][-4] == pytest.approx(10.0)
+    assert coarse["series"]["personConf"]["mean"][-4] is None
+    assert store.query('ts', 30 * 86400, 3600, now=now)["resolutionSec"] == 3600
+    # worker → API: completed seconds are exported once and merge into every tier
+    api = main._TimeSeriesStore()
+    rows = store.export_seconds('ts', until=t0 + 61)
+    assert len(rows) == 60 and store.export_seconds('ts', until=t0 + 61) == []
+    api.merge('ts', rows)
+    assert api.query('ts', 7200, 60, now=now)["series"]["motionRatio"] == coarse["series"]["motionRatio"]
+
+
+def test_timeseries_recycles_idle_cameras_at_the_cap(caplog):
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    store = main._TimeSeriesStore(tiers=((1, 60),), max_cameras=2)
+    now = 1_700_000_000.0
+    store.record('stopped', now, {"active": 1.0})
+    store.record('live', now, {"active": 1.0})
+    with caplog.at_level('WARNING', logger='carenest.enterprise'):
+        store.record('new', now, {"active": 1.0})
+    assert store.query('stopped', 60, 1, now=now) is None
+    assert store.query('new', 60, 1, now=now) is not None
+    assert store.stats()["evicted"] == 1 and 'stopped' in caplog.text
+    # a forgotten camera frees its rings without evicting anyone
+    assert store.drop('live') and not store.drop('live')
+    store.record('another', now, {"active": 1.0})
+    assert store.stats()["evicted"] == 1 and store.query('new', 60, 1, now=now) is not None
+
+
+def test_timeseries_endpoint():
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    client = TestClient(main.app)
+    main._timeseries.record('seriescam', main.time.time(), {"active": 1.0})
+    r = client.get('/api/health-analytics/series', params={'camera': 'seriescam', 'window': '15m', 'step': '1m'})
+    assert r.status_code == 200 and len(r.json()["t"]) == 15
+    assert client.get('/api/health-analytics/series', params={'camera': 'nope'}).status_code == 404
+    assert client.get('/api/health-analytics/series', params={'camera': 'seriescam', 'window': 'x'}).status_code == 400
+
+
+def test_lazy_module_imports_on_first_use():
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    missing = main._LazyModule('carenest_no_such_module')
+    assert not missing.loaded
+    assert not missing and missing.loaded
+    assert 'ModuleNotFoundError' in missing.info()['error']
+    with pytest.raises(AttributeError):
+        missing.anything
+    present = main._LazyModule('json', 'dumps')
+    assert present([1]) == '[1]' and present.info()['ok']
+
+
+def test_background_loops_run_only_inside_lifespan(monkeypatch):
+    import threading
+    main = importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+    monkeypatch.setenv('CAMERA_WARM_START', 'false')
+    monkeypatch.setenv('PREWARM_IMPORTS', 'none')
+
+    def supervisors():
+        return [t for t in threading.enumerate() if t.name == 'camera-supervisor' and t.is_alive()]
+
+    before = len(supervisors())
+    with TestClient(main.app) as client:
+        assert len(supervisors()) == before + 1
+        data = client.get('/api/startup/imports').json()
+        assert data['background']['prewarm'] == []
+        assert [p['phase'] for p in data['phases']] == ['framework imports', 'config and app', 'state and routes']
+        assert set(data['lazy']) == {'cv2', 'mediapipe', 'onnxruntime', 'ultralytics'}
+    deadline = main.time.time() + 5
+    while len(supervisors()) > before and main.time.time() < deadline:
+        main.time.sleep(0.1)
+    assert len(supervisors()) == before
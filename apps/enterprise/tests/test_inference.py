@@ -0,0 +1,118 @@
+import importlib
+import threading
+import pytest
+
+
+def _main():
+    return importlib.import_module('apps.enterprise.main' if importlib.util.find_spec('apps.enterprise.main') else 'main')  # type: ignore
+
+
+def test_batched_inference_groups_concurrent_requests():
+    main = _main()
+    seen_batches = []
+
+    def run(items):
+        seen_batches.append(len(items))
+        return [x * 2 for x in items]
+
+    engine = main._BatchedInference('test', run, max_batch=4, max_wait=0.2)
+    results = {}
+
+    def call(i):
+        results[i] = engine.infer(i)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {0: 0, 1: 2, 2: 4, 3: 6}
+    assert max(seen_batches) > 1
+    assert engine.stats()['items'] == 4
+
+
+def test_fall_clip_buffer_is_ordered_and_reused():
+    np = pytest.importorskip('numpy')
+    pytest.importorskip('cv2')
+    main = _main()
+    clip = main._FallClipBuffer(3, (8, 8))
+    ring = clip._ring
+    for v in (10, 20, 30, 40):
+        clip.push(np.full((16, 16), v, dtype=np.uint8))
+    assert clip.ready()
+    window = clip.clip()
+    assert window.shape == (3, 8, 8) and window.dtype == np.float32
+    assert [round(float(f[0, 0]) * 255) for f in window] == [20, 30, 40]
+    # the window is a view into the preallocated ring, not a fresh array
+    assert window.base is ring and clip._ring is ring
+
+
+def test_failed_engine_load_is_retried_after_backoff(monkeypatch):
+    main = _main()
+    calls = []
+
+    def build(path):
+        calls.append(path)
+        if len(calls) == 1:
+            raise FileNotFoundError(path)
+        return lambda items: [1.0 for _ in items]
+
+    monkeypatch.setattr(main, 'YOLO', object())
+    monkeypatch.setattr(main, '_build_yolo_runner', build)
+    key = ('yolo', 'late-weights.pt')
+    try:
+        assert main._get_inference_engine('yolo', 'late-weights.pt') is None
+        failure = main._inference_failures[key]
+        assert failure["attempts"] == 1 and 'late-weights.pt' in failure["error"]
+        # still backing off: no new load attempt
+        assert main._get_inference_engine('yolo', 'late-weights.pt') is None
+        assert len(calls) == 1
+
+        failure["retryAt"] = 0.0
+        engine = main._get_inference_engine('yolo', 'late-weights.pt')
+        assert engine is not None
+        assert engine.infer('frame') == 1.0
+        assert key not in main._inference_failures
+        assert main._get_inference_engine('yolo', 'late-weights.pt') is engine
+        assert len(calls) == 2
+    finally:
+        main._inference_engines.pop(key, None)
+        main._inference_failures.pop(key, None)
+
+
+def test_slow_engine_load_does_not_hold_the_global_lock(monkeypatch):
+    main = _main()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def build(path):
+        calls.append(path)
+        if path == 'slow.pt':
+            started.set()
+            release.wait(5)
+        return lambda items: [path for _ in items]
+
+    monkeypatch.setattr(main, 'YOLO', object())
+    monkeypatch.setattr(main, '_build_yolo_runner', build)
+    keys = [('yolo', 'slow.pt'), ('yolo', 'fast.pt')]
+    results = {}
+    try:
+        first = threading.Thread(target=lambda: results.update(first=main._get_inference_engine('yolo', 'slow.pt')))
+        first.start()
+        assert started.wait(2)
+        # other models, readers and non-waiting callers are not stuck behind the load
+        assert main._get_inference_engine('yolo', 'fast.pt').infer('x') == 'fast.pt'
+        assert main.inference_stats()["engines"]
+        assert main._get_inference_engine('yolo', 'slow.pt', wait=0) is None
+        second = threading.Thread(target=lambda: results.update(second=main._get_inference_engine('yolo', 'slow.pt')))
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+        assert results["first"] is not None and results["second"] is results["first"]
+        assert calls.count('slow.pt') == 1
+    finally:
+        release.set()
+        for key in keys:
+            main._inference_engines.pop(key, None)
+            main._inference_failures.pop(key, None)
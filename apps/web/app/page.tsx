@@ -103,13 +103,42 @@ function LiveHealth({ initial }: { initial: any }) {
   );
 }
 
+// Camera state pushed by the enterprise box (snapshot, then deltas); EventSource reconnects on its own
+function useCameraStream(React: typeof import('react'), base: string) {
+  const [analytics, setAnalytics] = React.useState<any>(null);
+  React.useEffect(() => {
+    let cameras: Record<string, any> = {};
+    const es = new EventSource(`${base}/api/stream/state`);
+    es.onmessage = (ev: MessageEvent) => {
+      const msg = JSON.parse(ev.data);
+      if (msg.type === 'snapshot') cameras = { ...msg.cameras };
+      else if (msg.type === 'delta') {
+        cameras = { ...cameras };
+        for (const [id, rec] of Object.entries(msg.cameras)) {
+          if (rec === null) delete cameras[id];
+          else cameras[id] = rec;
+        }
+      } else return;
+      const list = Object.entries(cameras).map(([id, rec]: [string, any]) => ({ id, ...rec }));
+      setAnalytics({
+        cameras: list,
+        anyMotion: list.some((c) => c.motion),
+        anyFall: list.some((c) => c.fall),
+        ts: msg.ts,
+      });
+    };
+    return () => es.close();
+  }, [base]);
+  return analytics;
+}
+
 function AnalyticsAndSnapshot() {
   if (typeof window === 'undefined') return null as any;
   const React = require('react') as typeof import('react');
-  const [analytics, setAnalytics] = React.useState<any>(null);
   const [camId, setCamId] = React.useState('cam1');
   const [rtspUrl, setRtspUrl] = React.useState('rtsp://example');
   const base = (process.env.NEXT_PUBLIC_ENTERPRISE_URL || 'http://localhost:5000').replace(/\/$/, '');
+  const analytics = useCameraStream(React, base);
 
   const startCam = async () => {
     await fetch(`${base}/api/camera/start`, {
@@ -118,18 +147,6 @@ function AnalyticsAndSnapshot() {
       body: JSON.stringify({ id: camId, url: rtspUrl })
     }).catch(() => {});
   };
-  const loadAnalytics = async () => {
-    try {
-      const res = await fetch(`${base}/api/health-analytics`, { cache: 'no-store' });
-      setAnalytics(await res.json());
-    } catch {}
-  };
-
-  React.useEffect(() => {
-    const t = setInterval(loadAnalytics, 5000);
-    loadAnalytics();
-    return () => clearInterval(t);
-  }, []);
 
   return (
     <section style={{ marginTop: 24 }}>
@@ -151,8 +168,8 @@ function LiveVideo() {
   const React = require('react') as typeof import('react');
   const [camId, setCamId] = React.useState('cam1');
   const [m3u8, setM3u8] = React.useState<string | null>(null);
-  const [analytics, setAnalytics] = React.useState<any>(null);
   const base = (process.env.NEXT_PUBLIC_ENTERPRISE_URL || 'http://localhost:5000').replace(/\/$/, '');
+  const analytics = useCameraStream(React, base);
 
   const fetchHls = async () => {
     try {
@@ -162,18 +179,6 @@ function LiveVideo() {
     } catch {}
   };
 
-  const loadAnalytics = async () => {
-    try {
-      const res = await fetch(`${base}/api/health-analytics`, { cache: 'no-store' });
-      setAnalytics(await res.json());
-    } catch {}
-  };
-
-  React.useEffect(() => {
-    const t = setInterval(loadAnalytics, 3000);
-    loadAnalytics();
-    return () => clearInterval(t);
-  }, []);
 
   return (
     <section style={{ marginTop: 24 }}>